@@ -1,7 +1,9 @@
 from django.contrib import admin
+from . import search
 from .models import (
     Alert, Report, ContentAnalysis, GeographicData,
-    PlatformAnalytics, ChatMessage, UserSettings, FacebookPost,RegisteredPlatform
+    PlatformAnalytics, ChatMessage, UserSettings, FacebookPost,RegisteredPlatform,
+    AnalysisJob
 )
 
 
@@ -51,8 +53,15 @@ class UserSettingsAdmin(admin.ModelAdmin):
 class FacebookPostAdmin(admin.ModelAdmin):
     list_display = ('post_id', 'owner_username', 'owner_full_name', 'post_type', 'reactions_total_count', 'created_time')
     list_filter = ('post_type', 'text_lang', 'created_at')
-    search_fields = ('post_id', 'owner_username', 'owner_full_name', 'text')
+    search_fields = ('=post_id', '=owner_username')
     readonly_fields = ('created_at', 'updated_at')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Exact id/username lookups, plus the full-text index for the post content
+        matches, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            matches |= search.filter_queryset(queryset, search_term)
+        return matches, may_have_duplicates
     
     fieldsets = (
         ('Basic Information', {
@@ -97,4 +106,10 @@ class FacebookPostAdmin(admin.ModelAdmin):
 class RegisteredPlatformAdmin(admin.ModelAdmin):
     list_display = ('name', 'display_name', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('name', 'display_name')
\ No newline at end of file
+    search_fields = ('name', 'display_name')
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('post', 'status', 'attempts', 'available_at', 'updated_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('post__post_id', 'last_error')
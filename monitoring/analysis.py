@@ -0,0 +1,152 @@
+import logging
+
+from django.db import transaction
+
+from .models import Alert, ContentModelAnalysis
+from .model_client import (
+    analyze_hate, analyze_misinformation, model_url, submit,
+    HATE_ANALYZE_ENDPOINT, MISINFORMATION_ANALYZE_ENDPOINT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisDeferred(Exception):
+    """Every failed model call of a post was refused by an open circuit breaker."""
+
+    def __init__(self, retry_after, errors):
+        super().__init__(f"Analysis deferred for {retry_after:.0f}s: {errors}")
+        self.retry_after = retry_after
+        self.errors = errors
+
+
+# Analyses above this confidence raise an Alert
+ALERT_CONFIDENCE_THRESHOLD = 0.7
+
+# Model analyses run for every ingested post
+ANALYSIS_TYPES = ('hate', 'misinformation')
+
+# analysis_type -> (model call, endpoint)
+ANALYSIS_CALLS = {
+    'hate': (analyze_hate, HATE_ANALYZE_ENDPOINT),
+    'misinformation': (analyze_misinformation, MISINFORMATION_ANALYZE_ENDPOINT),
+}
+
+
+def store_hate_result(post, hate_result):
+    """
+    Persist a hate speech model response for a post and raise an Alert
+    when harmful content is detected with high confidence. A post keeps its
+    first hate analysis: storing another returns the existing one.
+    Returns the ContentModelAnalysis, or None if the response was an error.
+    """
+    if 'error' in hate_result:
+        return None
+
+    with transaction.atomic():
+        hate_analysis, created = ContentModelAnalysis.objects.get_or_create(
+            post=post,
+            analysis_type='hate',
+            defaults=dict(
+                is_harmful=hate_result.get('is_hate_speech', False),
+                confidence=hate_result.get('confidence'),
+                severity=hate_result.get('severity'),
+                category=hate_result.get('category'),
+                explanation=hate_result.get('explanation', ''),
+                detected_keywords=hate_result.get('detected_keywords', []),
+                raw_response=hate_result
+            ),
+        )
+
+        if created and hate_analysis.is_harmful and hate_analysis.confidence and hate_analysis.confidence > ALERT_CONFIDENCE_THRESHOLD:
+            Alert.objects.create(
+                title=f"Hate Speech Detected in Post {post.post_id}",
+                description=f"Hate speech detected with {hate_analysis.confidence:.2f} confidence. Severity: {hate_analysis.severity}.",
+                severity='high' if hate_analysis.severity == 'high' else 'medium',
+                source='Model API - Hate Speech',
+                status='new'
+            )
+    return hate_analysis
+
+
+def store_misinformation_result(post, misinformation_result):
+    """
+    Persist a misinformation model response for a post and raise an Alert
+    when misinformation is detected with high confidence. A post keeps its
+    first misinformation analysis: storing another returns the existing one.
+    Returns the ContentModelAnalysis, or None if the response was an error.
+    """
+    if 'error' in misinformation_result:
+        return None
+
+    with transaction.atomic():
+        misinfo_analysis, created = ContentModelAnalysis.objects.get_or_create(
+            post=post,
+            analysis_type='misinformation',
+            defaults=dict(
+                is_harmful=misinformation_result.get('label') == 'misinformation',
+                confidence=misinformation_result.get('confidence'),
+                severity=misinformation_result.get('severity'),
+                explanation=misinformation_result.get('explanation', ''),
+                raw_response=misinformation_result
+            ),
+        )
+
+        if created and misinfo_analysis.is_harmful and misinfo_analysis.confidence and misinfo_analysis.confidence > ALERT_CONFIDENCE_THRESHOLD:
+            Alert.objects.create(
+                title=f"Misinformation Detected in Post {post.post_id}",
+                description=f"Misinformation detected with {misinfo_analysis.confidence:.2f} confidence. Severity: {misinfo_analysis.severity}.",
+                severity='high' if misinfo_analysis.severity == 'high' else 'medium',
+                source='Model API - Misinformation',
+                status='new'
+            )
+    return misinfo_analysis
+
+
+STORE_RESULT = {
+    'hate': store_hate_result,
+    'misinformation': store_misinformation_result,
+}
+
+
+def request_analyses(content, analysis_types=ANALYSIS_TYPES):
+    """
+    Start the model calls for ``content`` on the shared model API executor, so
+    all of them (and those of other posts) run at the same time.
+    Returns a dict of analysis_type -> Future of the model response.
+    """
+    if not (content or '').strip():
+        return {}
+    futures = {}
+    for analysis_type in analysis_types:
+        call, endpoint = ANALYSIS_CALLS[analysis_type]
+        futures[analysis_type] = submit(model_url(endpoint), call, content)
+    return futures
+
+
+def analyze_post(post, analysis_types=ANALYSIS_TYPES, futures=None):
+    """
+    Send a saved FacebookPost to the hate and/or misinformation model endpoints
+    and store the results as ContentModelAnalysis (and Alert) rows.
+    The calls run concurrently; ``futures`` are calls already started with request_analyses().
+    Returns a dict of analysis_type -> error message for the calls that failed.
+    Raises:
+        AnalysisDeferred: All the failed calls were refused by an open circuit (successful ones are stored).
+    """
+    errors = {}
+    retry_after = []
+    if futures is None:
+        futures = request_analyses(post.text, analysis_types)
+
+    # Results are stored from the calling thread, which owns the database connection
+    for analysis_type, future in futures.items():
+        result = future.result()
+        logger.debug("%s analysis for post %s: %s", analysis_type, post.post_id, result)
+        if STORE_RESULT[analysis_type](post, result) is None:
+            errors[analysis_type] = result['error']
+            if 'retry_after' in result:
+                retry_after.append(result['retry_after'])
+
+    if errors and len(retry_after) == len(errors):
+        raise AnalysisDeferred(max(retry_after), errors)
+    return errors
@@ -0,0 +1,156 @@
+"""
+Cache of model analysis results keyed by a hash of the normalized text.
+
+Reposts and copy-paste campaigns send the same text to the model API again and
+again. Results are kept in two tiers: a small in-process LRU and a shared tier
+in the Django cache (``MODEL_RESULT_CACHE_ALIAS``), so identical texts are only
+analyzed once per model endpoint and model version. The other fields of the
+request (``store_result``, ``user_id``, ``platform``) are part of the key, so
+a request is only answered from the cache when it is the same request.
+Cached responses are handed out as copies: callers are free to modify them.
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    Normalize text so trivial variations (case, unicode forms, spacing) share a cache entry.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    return _WHITESPACE_RE.sub(' ', text).strip().casefold()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry time to live.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class AnalysisResultCache:
+    """
+    Two-tier (in-process LRU + Django cache) store of model responses.
+    Error responses are never cached.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(
+            maxsize=getattr(settings, 'MODEL_RESULT_CACHE_LRU_SIZE', 10000),
+            ttl=getattr(settings, 'MODEL_RESULT_CACHE_TTL', 86400),
+        )
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'sets': 0}
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'MODEL_RESULT_CACHE_ENABLED', True)
+
+    @property
+    def shared(self):
+        return caches[getattr(settings, 'MODEL_RESULT_CACHE_ALIAS', 'default')]
+
+    def make_key(self, endpoint, text, params=None):
+        """Key of ``text`` sent to ``endpoint`` with the other payload fields ``params``."""
+        digest = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+        version = getattr(settings, 'MODEL_VERSION', 'v1')
+        endpoint_digest = hashlib.md5(endpoint.encode('utf-8')).hexdigest()[:12]
+        key = f"model-result:{version}:{endpoint_digest}:{digest}"
+        if params:
+            params_json = json.dumps(params, sort_keys=True, default=str)
+            key += ':' + hashlib.md5(params_json.encode('utf-8')).hexdigest()[:12]
+        return key
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, endpoint, text, params=None):
+        """Return a copy of the cached response for ``text`` (and ``params``) at ``endpoint``, or None."""
+        if not self.enabled:
+            return None
+        key = self.make_key(endpoint, text, params)
+        result = self.local.get(key)
+        if result is not None:
+            self._count('local_hits')
+            return copy.deepcopy(result)
+        result = self.shared.get(key)
+        if result is not None:
+            self.local.set(key, copy.deepcopy(result))
+            self._count('shared_hits')
+            return result
+        self._count('misses')
+        return None
+
+    def set(self, endpoint, text, result, params=None):
+        if not self.enabled or not isinstance(result, dict) or 'error' in result:
+            return
+        key = self.make_key(endpoint, text, params)
+        self.local.set(key, copy.deepcopy(result))
+        self.shared.set(key, result, timeout=getattr(settings, 'MODEL_RESULT_CACHE_TTL', 86400))
+        self._count('sets')
+
+    def stats(self):
+        """Hit/miss counters for this process."""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        hits = counters['local_hits'] + counters['shared_hits']
+        counters['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        counters['local_size'] = len(self.local)
+        counters['local_max_size'] = self.local.maxsize
+        return counters
+
+    def clear(self):
+        """Clear the in-process tier and reset the counters."""
+        self.local.clear()
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+result_cache = AnalysisResultCache()
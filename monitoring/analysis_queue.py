@@ -0,0 +1,175 @@
+"""
+Database-backed queue of model analysis jobs.
+
+Ingestion only enqueues post IDs; the run_analysis_workers management command
+claims pending AnalysisJob rows, calls the model endpoints and stores the
+ContentModelAnalysis and Alert rows. Failed calls are retried with backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .analysis import ANALYSIS_TYPES, AnalysisDeferred, analyze_post, request_analyses
+from .circuit_breaker import breaker_for_url
+from .model_client import HATE_ANALYZE_ENDPOINT, model_url
+from .models import AnalysisJob, ContentModelAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Jobs a worker will still process
+UNFINISHED_STATUSES = ('pending', 'running')
+
+
+def _max_attempts():
+    return getattr(settings, 'ANALYSIS_QUEUE_MAX_ATTEMPTS', 5)
+
+
+def _retry_delay(attempts):
+    """Exponential backoff between retries of a failed job."""
+    base = getattr(settings, 'ANALYSIS_QUEUE_RETRY_DELAY_SECONDS', 30)
+    return timedelta(seconds=base * (2 ** (attempts - 1)))
+
+
+def _lease():
+    """How long a claimed job may run before another worker can reclaim it."""
+    return timedelta(seconds=getattr(settings, 'ANALYSIS_QUEUE_LEASE_SECONDS', 300))
+
+
+def model_breaker():
+    """Circuit breaker of the model API host."""
+    return breaker_for_url(model_url(HATE_ANALYZE_ENDPOINT))
+
+
+def enqueue_posts(post_ids, available_at=None):
+    """
+    Queue the given FacebookPost primary keys for model analysis. Posts
+    already queued (a pending or running job) are skipped.
+    Returns the number of jobs created.
+    """
+    available_at = available_at or timezone.now()
+    post_ids = list(dict.fromkeys(post_ids))
+    queued = set(
+        AnalysisJob.objects.filter(post_id__in=post_ids, status__in=UNFINISHED_STATUSES)
+        .values_list('post_id', flat=True)
+    )
+    jobs = [
+        AnalysisJob(post_id=post_id, available_at=available_at)
+        for post_id in post_ids if post_id not in queued
+    ]
+    AnalysisJob.objects.bulk_create(jobs)
+    return len(jobs)
+
+
+def claim_jobs(limit):
+    """
+    Atomically claim up to ``limit`` due jobs for the calling worker.
+    Jobs left running past their lease by a crashed worker are claimed again.
+    """
+    now = timezone.now()
+    due = (
+        Q(status='pending', available_at__lte=now) |
+        Q(status='running', locked_at__lt=now - _lease())
+    )
+    with transaction.atomic():
+        queryset = AnalysisJob.objects.filter(due).order_by('available_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        job_ids = list(queryset.values_list('id', flat=True)[:limit])
+        if not job_ids:
+            return []
+        # Re-check the due condition so that, on databases without SKIP LOCKED,
+        # a job claimed concurrently by another worker is not claimed twice
+        AnalysisJob.objects.filter(due, id__in=job_ids).update(
+            status='running', locked_at=now, updated_at=now
+        )
+    return list(
+        AnalysisJob.objects.filter(id__in=job_ids, status='running', locked_at=now)
+        .select_related('post')
+    )
+
+
+def pending_analysis_types(job):
+    """
+    Analyses still missing for the job's post: those already stored are
+    skipped, so retries never duplicate rows.
+    """
+    done_types = set(
+        ContentModelAnalysis.objects.filter(post_id=job.post_id)
+        .values_list('analysis_type', flat=True)
+    )
+    return [t for t in ANALYSIS_TYPES if t not in done_types]
+
+
+def process_job(job, futures=None):
+    """
+    Run the analyses still missing for the job's post and record the outcome.
+    ``futures`` are the job's model calls if already started (see run_once()).
+    """
+    pending_types = pending_analysis_types(job) if futures is None else list(futures)
+
+    retry_after = 0
+    try:
+        errors = analyze_post(job.post, pending_types, futures) if pending_types else {}
+    except AnalysisDeferred as e:
+        errors, retry_after = e.errors, e.retry_after
+    except Exception as e:
+        errors = {'exception': str(e)}
+
+    job.locked_at = None
+    if errors and not retry_after:
+        retry_after = model_breaker().retry_after()
+    if retry_after:
+        # The model API is down: wait for the circuit instead of using up attempts
+        job.status = 'pending'
+        job.last_error = str(errors)
+        job.available_at = timezone.now() + timedelta(seconds=retry_after)
+        job.save(update_fields=['status', 'locked_at', 'last_error', 'available_at', 'updated_at'])
+        return job.status
+
+    job.attempts += 1
+    if not errors:
+        job.status = 'done'
+        job.last_error = ''
+    elif job.attempts >= _max_attempts():
+        job.status = 'failed'
+        job.last_error = str(errors)
+        logger.error("Analysis job %s for post %s failed: %s", job.id, job.post_id, errors)
+    else:
+        job.status = 'pending'
+        job.last_error = str(errors)
+        job.available_at = timezone.now() + _retry_delay(job.attempts)
+        logger.warning("Analysis job %s for post %s will be retried: %s", job.id, job.post_id, errors)
+    job.save(update_fields=['status', 'attempts', 'locked_at', 'last_error', 'available_at', 'updated_at'])
+    return job.status
+
+
+def run_once(limit):
+    """
+    Claim and process one batch of jobs. Returns the number of jobs processed.
+    No jobs are claimed while the model API circuit is open.
+    """
+    if model_breaker().retry_after():
+        return 0
+    jobs = claim_jobs(limit)
+    # Start the model calls of the whole batch at once, then store the results job by job
+    started = []
+    post_ids = set()
+    for job in jobs:
+        if job.post_id in post_ids:
+            # Another job of the batch analyzes this post: nothing is left for this one
+            started.append((job, {}))
+            continue
+        post_ids.add(job.post_id)
+        try:
+            futures = request_analyses(job.post.text, pending_analysis_types(job))
+        except Exception as e:
+            logger.error("Could not start analysis job %s: %s", job.id, e)
+            futures = None
+        started.append((job, futures))
+    for job, futures in started:
+        process_job(job, futures)
+    return len(jobs)
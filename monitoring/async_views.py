@@ -0,0 +1,164 @@
+"""
+Native async API views for the I/O-bound proxy endpoints (model API and LLM calls).
+
+DRF views are synchronous, so a request to a slow upstream holds a worker for
+its whole latency. The views built here are plain async Django views: under an
+ASGI server (see sui_ru_main/asgi.py) a worker keeps hundreds of upstream calls
+in flight. Authentication, permissions and request parsing still go through
+DRF (DEFAULT_AUTHENTICATION_CLASSES, permission classes, JSON/form parsers),
+and handlers return DRF Responses, rendered as JSON.
+
+Schema generators (drf_yasg, DRF schemas) only list APIView subclasses, so
+each async view carries an APIView stand-in as ``view.cls``: the endpoints,
+their docstrings and any @swagger_auto_schema stay in the API docs.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, permissions, status
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+PARSER_CLASSES = (JSONParser, FormParser, MultiPartParser)
+
+
+def _schema_view(name, doc, handlers, permission_classes, attrs=None):
+    """
+    APIView subclass standing in for an async view in generated schemas. It
+    is never dispatched: it only exposes the handlers (and their
+    @swagger_auto_schema overrides) to the schema generator.
+    """
+    return type(name, (APIView,), {
+        '__doc__': doc,
+        **(attrs or {}),
+        **handlers,
+        'permission_classes': tuple(permission_classes),
+    })
+
+
+def _check_request(request, permission_classes, view):
+    """Authenticate, check permissions and parse the body (may hit the database)."""
+    for permission in permission_classes:
+        if not permission().has_permission(request, view):
+            if request.authenticators and not request.successful_authenticator:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied()
+    request.data  # parse while still in a sync thread
+
+
+def _error_response(request, exc):
+    response = Response({'detail': exc.detail}, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticators = request.authenticators
+        header = authenticators[0].authenticate_header(request) if authenticators else None
+        if header:
+            response['WWW-Authenticate'] = header
+        else:
+            response.status_code = status.HTTP_403_FORBIDDEN
+    return response
+
+
+def _render(request, response):
+    if isinstance(response, Response):
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = JSONRenderer.media_type
+        response.renderer_context = {'request': request}
+    return response
+
+
+async def _handle(handler, request, permission_classes, view, args, kwargs):
+    request = Request(
+        request,
+        parsers=[parser() for parser in PARSER_CLASSES],
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        await sync_to_async(_check_request)(request, permission_classes, view)
+        response = await handler(request, *args, **kwargs)
+    except exceptions.APIException as exc:
+        response = _error_response(request, exc)
+    return _render(request, response)
+
+
+def async_api_view(http_method_names=('POST',), permission_classes=(permissions.AllowAny,)):
+    """
+    Decorator turning ``async def view(request)`` into an async API view, the
+    async counterpart of @api_view + @permission_classes. ``request`` is a DRF
+    Request (``request.data``, ``request.user``).
+    """
+    def decorator(func):
+        @csrf_exempt
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                response = Response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                    headers={'Allow': ', '.join(http_method_names)},
+                )
+                return _render(request, response)
+            return await _handle(func, request, permission_classes, None, args, kwargs)
+
+        view.cls = _schema_view(
+            func.__name__, func.__doc__,
+            {method.lower(): func for method in http_method_names}, permission_classes,
+        )
+        view.initkwargs = {}
+        return view
+    return decorator
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of APIView: define ``async def post(self, request)`` etc.
+    """
+    permission_classes = (permissions.AllowAny,)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = csrf_exempt(super().as_view(**initkwargs))
+        handlers = {
+            method: getattr(cls, method)
+            for method in cls.http_method_names
+            if method != 'options' and hasattr(cls, method)
+        }
+        view.cls = _schema_view(
+            cls.__name__, cls.__doc__, handlers, cls.permission_classes,
+            {'serializer_class': getattr(cls, 'serializer_class', None)},
+        )
+        view.initkwargs = initkwargs
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+        return await _handle(handler, request, self.permission_classes, self, args, kwargs)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        response = Response(
+            {'detail': f'Method "{request.method}" not allowed.'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED,
+            headers={'Allow': ', '.join(self._allowed_methods())},
+        )
+        return _render(request, response)
+
+
+async def gather_with_timeout(calls, timeout):
+    """
+    Run the coroutines of ``calls`` ({name: coroutine}) concurrently.
+    Returns {name: result or exception}; calls still running after ``timeout``
+    seconds are cancelled and get an asyncio.TimeoutError.
+    """
+    results = await asyncio.gather(
+        *(asyncio.wait_for(call, timeout) for call in calls.values()),
+        return_exceptions=True,
+    )
+    return dict(zip(calls, results))
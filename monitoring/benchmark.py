@@ -0,0 +1,133 @@
+"""
+Benchmarks of the dashboard and report endpoints (see the bench command).
+
+Endpoints are called through the DRF test client, so the whole request path
+(URL resolution, authentication, views, serialization) runs without a server.
+Each endpoint is timed over repeated calls for its p50/p95 latency, then
+called once more with query capture and tracemalloc on, for its SQL query
+count and peak Python memory (both would skew the timings). Results are plain
+dicts, saved as JSON and compared against a stored baseline.
+"""
+import math
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+# name, HTTP method, URL name, query parameters (GET) or JSON body (POST)
+Endpoint = namedtuple('Endpoint', 'name method url_name data')
+
+ENDPOINTS = (
+    Endpoint('kpis', 'get', 'dashboard_kpis', {}),
+    Endpoint('threat_trends_daily', 'get', 'dashboard_threat_trends', {'timeframe': '30d', 'interval': 'day'}),
+    Endpoint('threat_trends_hourly', 'get', 'dashboard_threat_trends', {'timeframe': '7d', 'interval': 'hour'}),
+    Endpoint('platform_breakdown', 'get', 'dashboard_platform_breakdown', {'timeframe': '30d'}),
+    Endpoint('recent_alerts', 'get', 'dashboard_recent_alerts', {'limit': 50}),
+    Endpoint('dashboard_reports_monthly', 'post', 'dashboard-reports', {'report_type': 'monthly'}),
+    Endpoint('dashboard_reports_filtered', 'post', 'dashboard-reports', {
+        'report_type': 'monthly',
+        'filters': {
+            'platforms': ['facebook', 'twitter'],
+            'severity_levels': ['high', 'critical'],
+            'content_types': ['hate_speech', 'misinformation'],
+        },
+    }),
+)
+
+# metric -> smallest increase counted as a regression, on top of the relative
+# tolerance (timer and allocator noise); None: any increase is one
+METRICS = {
+    'p50_ms': 1.0,
+    'p95_ms': 2.0,
+    'queries': None,
+    'peak_memory_kib': 64,
+}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def _call(client, endpoint):
+    url = reverse(endpoint.url_name)
+    if endpoint.method == 'get':
+        response = client.get(url, endpoint.data)
+    else:
+        response = client.post(url, endpoint.data, format='json')
+    if response.status_code >= 400:
+        raise RuntimeError(f"{endpoint.name} returned HTTP {response.status_code}: {response.content[:200]!r}")
+    return response
+
+
+def measure(client, endpoint, iterations=20, warmup=2):
+    """
+    Benchmark one endpoint.
+    Args:
+        client (APIClient): Authenticated test client.
+        endpoint (Endpoint): Endpoint to call.
+        iterations (int, optional): Timed calls.
+        warmup (int, optional): Untimed calls first (connection setup, caches of the process).
+    Returns:
+        dict: p50_ms, p95_ms, queries and peak_memory_kib.
+    Raises:
+        RuntimeError: The endpoint returned an error.
+    """
+    for _ in range(warmup):
+        _call(client, endpoint)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        _call(client, endpoint)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        try:
+            _call(client, endpoint)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': len(queries),
+        'peak_memory_kib': round(peak / 1024),
+    }
+
+
+def run(user, endpoints=ENDPOINTS, iterations=20, warmup=2):
+    """Benchmark ``endpoints`` as ``user``; returns {endpoint name: measure() result}."""
+    client = APIClient()
+    client.force_authenticate(user)
+    return {endpoint.name: measure(client, endpoint, iterations, warmup) for endpoint in endpoints}
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Regressions of ``results`` against ``baseline`` (both {scale: {endpoint: metrics}}).
+    Latency and memory regress when more than ``tolerance`` (a fraction) and the
+    METRICS noise floor above the baseline, query counts when above it at all.
+    Returns:
+        list: (scale, endpoint, metric, baseline value, current value) tuples.
+    """
+    regressions = []
+    for scale, endpoints in results.items():
+        for name, metrics in endpoints.items():
+            reference = baseline.get(scale, {}).get(name)
+            if not reference:
+                continue
+            for metric, floor in METRICS.items():
+                if metric not in reference:
+                    continue
+                limit = reference[metric]
+                if floor is not None:
+                    limit = max(limit * (1 + tolerance), limit + floor)
+                if metrics[metric] > limit:
+                    regressions.append((scale, name, metric, reference[metric], metrics[metric]))
+    return regressions
@@ -0,0 +1,245 @@
+"""
+Circuit breakers around the external model API and LLM providers.
+
+Each upstream (a model API host, OpenAI, Azure OpenAI, Gemini) has one
+breaker per process:
+
+* closed: calls go through; CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive
+  failures (connection errors, timeouts, 5xx and 429 responses) open it.
+  Rejected requests (other 4xx) and unusable answers (e.g. a Gemini answer
+  blocked by its safety filters) are not failures: the upstream is up.
+* open: calls fail at once with CircuitOpenError, instead of every request
+  waiting out the upstream timeout, for CIRCUIT_BREAKER_RECOVERY_TIMEOUT seconds.
+* half-open: CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS trial calls go through; a
+  success closes the circuit, a failure opens it again.
+
+A call cancelled before it finished (asyncio.CancelledError, e.g. a request
+timeout or a client disconnect) counts as a failure: the upstream did not
+answer in time, and a cancelled trial call must not keep its trial slot.
+
+Breaker states are reported by the health endpoint (monitoring.views.health).
+"""
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit
+
+import httpx
+import openai
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.RequestException, httpx.HTTPError):
+    """
+    Raised instead of calling an upstream whose circuit is open. It is both a
+    requests and an httpx error, so callers handling transport errors handle it too.
+    """
+
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+
+
+# Errors raised when the upstream could not be reached or did not answer in time
+TRANSPORT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    ConnectionError,
+    TimeoutError,
+)
+
+# gRPC statuses (google.api_core errors) meaning the upstream is unhealthy
+UPSTREAM_GRPC_STATUSES = frozenset([
+    'UNAVAILABLE', 'DEADLINE_EXCEEDED', 'RESOURCE_EXHAUSTED', 'INTERNAL', 'UNKNOWN', 'DATA_LOSS',
+])
+
+
+def _status_code(exc):
+    """HTTP status of an upstream error (requests, httpx, openai, google.api_core), if any."""
+    response = getattr(exc, 'response', None)
+    for status_code in (
+        getattr(exc, 'status_code', None),
+        getattr(response, 'status_code', None),
+        # google.api_core errors carry the HTTP status as ``code``
+        getattr(exc, 'code', None),
+    ):
+        if isinstance(status_code, int):
+            return status_code
+    return None
+
+
+def is_upstream_failure(exc):
+    """
+    Whether ``exc`` means the upstream is unhealthy: a transport error, a
+    timeout, a 5xx or 429 status. Rejected requests and errors reading an
+    answer the upstream did send are not.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status_code = _status_code(exc)
+    if status_code is not None:
+        return status_code >= 500 or status_code == 429
+    grpc_status = getattr(exc, 'grpc_status_code', None)
+    if grpc_status is not None:
+        return getattr(grpc_status, 'name', str(grpc_status)) in UPSTREAM_GRPC_STATUSES
+    return isinstance(exc, TRANSPORT_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open circuit breaker.
+    Args:
+        name (str): Upstream name, reported by the health endpoint.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        recovery_timeout (float): Seconds the circuit stays open before a trial call.
+        half_open_max_calls (int): Trial calls allowed at once while half-open.
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_calls = 0
+        self._lock = threading.Lock()
+
+    def _current_state(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def retry_after(self):
+        """Seconds until the circuit lets a trial call through (0 unless open)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(self.recovery_timeout - (self.clock() - self._opened_at), 0.0)
+
+    def before_call(self):
+        """
+        Reserve a call.
+        Raises:
+            CircuitOpenError: The circuit is open, or half-open with its trial calls in flight.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return
+            remaining = self.recovery_timeout - (self.clock() - self._opened_at)
+        raise CircuitOpenError(self.name, max(remaining, 1.0))
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("Circuit %s opened after %s failures", self.name, self._failures)
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    def _record(self, exc):
+        if exc is None:
+            self.record_success()
+        elif not isinstance(exc, Exception) or is_upstream_failure(exc):
+            # Cancelled (asyncio.CancelledError) or interrupted calls did not finish
+            self.record_failure()
+        else:
+            self.record_success()
+
+    @contextmanager
+    def guard(self):
+        """Run the body as a call to the upstream: ``with breaker.guard(): ...``"""
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+
+    @asynccontextmanager
+    async def aguard(self):
+        """Async guard(): ``async with breaker.aguard(): ...``"""
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+
+    def snapshot(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'retry_after': (
+                    round(max(self.recovery_timeout - (self.clock() - self._opened_at), 0.0), 1)
+                    if state == OPEN else 0
+                ),
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """The process-wide breaker of upstream ``name``, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=getattr(settings, 'CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5),
+                    recovery_timeout=getattr(settings, 'CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 30),
+                    half_open_max_calls=getattr(settings, 'CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS', 1),
+                )
+    return breaker
+
+
+def breaker_for_url(url):
+    """The breaker of the host serving ``url``."""
+    return get_breaker(urlsplit(url).netloc or url)
+
+
+def breaker_states():
+    """name -> snapshot of every breaker created in this process."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -2,9 +2,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Avg, Q, Count
+from django.db.models import Avg, Count, Q, Sum
+from collections import Counter, defaultdict
 from datetime import timedelta
-from monitoring.models import FacebookPost, Alert, ContentAnalysis, RegisteredPlatform, ContentModelAnalysis
+from monitoring.models import FacebookPost, Alert, ContentAnalysis, RegisteredPlatform, MetricRollup, normalize_platform
 
 class DashboardKPIView(APIView):
     """
@@ -30,24 +31,23 @@ class DashboardKPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_content = FacebookPost.objects.count()
-        active_threats = Alert.objects.filter(status__in=['new', 'in_progress']).count()
+        # Post and active threat totals come from the hourly rollups, not the raw tables
+        totals = dict(
+            MetricRollup.objects.filter(metric__in=['posts', 'active_alerts'])
+            .values('metric')
+            .annotate(total=Sum('value'))
+            .values_list('metric', 'total')
+        )
+        total_content = totals.get('posts') or 0
+        active_threats = totals.get('active_alerts') or 0
         # Use ContentAnalysis.confidence_score for accuracy, convert to percentage
         accuracy_qs = ContentAnalysis.objects.exclude(confidence_score=None)
         accuracy = accuracy_qs.aggregate(Avg('confidence_score'))['confidence_score__avg']
         accuracy = round((accuracy or 0) * 100, 2)
         platforms = RegisteredPlatform.objects.count()
-        last_post = FacebookPost.objects.order_by('-updated_at').first()
-        last_alert = Alert.objects.order_by('-updated_at').first()
-        last_update = None
-        if last_post and last_alert:
-            last_update = max(last_post.updated_at, last_alert.updated_at)
-        elif last_post:
-            last_update = last_post.updated_at
-        elif last_alert:
-            last_update = last_alert.updated_at
-        else:
-            last_update = timezone.now()
+        last_post = FacebookPost.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+        last_alert = Alert.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+        last_update = max(filter(None, [last_post, last_alert]), default=None) or timezone.now()
         return Response({
             "totalContent": total_content,
             "activeThreats": active_threats,
@@ -102,48 +102,47 @@ class ThreatTrendsView(APIView):
         if interval == 'hour':
             time_format = '%Y-%m-%dT%H:00:00Z'
             delta = timedelta(hours=1)
+            first_bucket = start_time.replace(minute=0, second=0, microsecond=0)
         else:
             time_format = '%Y-%m-%d'
             delta = timedelta(days=1)
+            first_bucket = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
 
         # Prepare time buckets
         buckets = []
-        t = start_time.replace(minute=0, second=0, microsecond=0)
+        t = first_bucket
         while t < now:
             buckets.append(t)
             t += delta
 
-        # Helper for filtering by platform/region
-        def alert_filter():
-            q = Q(created_at__gte=start_time, created_at__lt=now)
-            if platform:
-                q &= Q(source__iexact=platform)
-            if region:
-                q &= Q(location__icontains=region)
-            return q
-        def analysis_filter(atype):
-            q = Q(created_at__gte=start_time, created_at__lt=now, analysis_type=atype)
-            if platform:
-                q &= Q(post__platform__iexact=platform)
-            return q
+        # Read hourly rollups; alerts are filtered by platform/region, analyses by platform
+        q = Q(hour__gte=start_time.replace(minute=0, second=0, microsecond=0), hour__lt=now)
+        if platform:
+            q &= Q(platform=normalize_platform(platform))
+        alert_q = Q(metric='alerts')
+        if region:
+            alert_q &= Q(region__icontains=region)
+        rows = (
+            MetricRollup.objects.filter(q & (alert_q | Q(metric__in=['misinformation', 'hate'])))
+            .values('hour', 'metric')
+            .annotate(total=Sum('value'))
+            .order_by()
+        )
 
-        # Query all relevant data in range
-        alerts = Alert.objects.filter(alert_filter())
-        misinfo = ContentModelAnalysis.objects.filter(analysis_filter('misinformation'))
-        hate = ContentModelAnalysis.objects.filter(analysis_filter('hate'))
+        # Fold hours into the requested buckets, keyed by bucket label
+        counts = defaultdict(Counter)
+        for row in rows:
+            counts[row['hour'].strftime(time_format)][row['metric']] += row['total']
 
-        # Build time-bucketed results
+        # Merge into zero-filled time buckets
         results = []
         for b in buckets:
-            next_b = b + delta
-            threats_count = alerts.filter(created_at__gte=b, created_at__lt=next_b).count()
-            misinfo_count = misinfo.filter(created_at__gte=b, created_at__lt=next_b).count()
-            hate_count = hate.filter(created_at__gte=b, created_at__lt=next_b).count()
+            bucket_counts = counts.get(b.strftime(time_format), Counter())
             results.append({
                 'time': b.strftime(time_format),
-                'threats': threats_count,
-                'misinformation': misinfo_count,
-                'hate_speech': hate_count
+                'threats': bucket_counts['alerts'],
+                'misinformation': bucket_counts['misinformation'],
+                'hate_speech': bucket_counts['hate']
             })
         return Response(results)
 
@@ -177,9 +176,6 @@ class PlatformBreakdownView(APIView):
     }
 
     def get(self, request):
-        from django.utils import timezone
-        from datetime import timedelta
-        from monitoring.models import Alert, RegisteredPlatform
         timeframe = request.GET.get('timeframe', '7d')
         region = request.GET.get('region')
         now = timezone.now()
@@ -189,18 +185,19 @@ class PlatformBreakdownView(APIView):
         else:
             days = int(timeframe[:-1]) if timeframe.endswith('d') else 7
             start_time = now - timedelta(days=days)
+        # One grouped query over the indexed, normalized platform key
+        q = Alert.objects.filter(created_at__gte=start_time, created_at__lt=now)
+        if region:
+            q = q.filter(location__icontains=region)
+        counts = dict(q.values('platform_key').annotate(total=Count('id')).order_by().values_list('platform_key', 'total'))
         # Get all registered platforms
         platforms = RegisteredPlatform.objects.all()
         results = []
         for platform in platforms:
-            q = Alert.objects.filter(source__iexact=platform.name, created_at__gte=start_time, created_at__lt=now)
-            if region:
-                q = q.filter(location__icontains=region)
-            count = q.count()
             color = self.PLATFORM_COLORS.get(platform.name.lower(), None)
             results.append({
                 'name': platform.display_name or platform.name,
-                'threats': count,
+                'threats': counts.get(normalize_platform(platform.name), 0),
                 'color': color
             })
         return Response(results)
@@ -246,7 +243,7 @@ class RecentAlertsView(APIView):
         if severity:
             q = q.filter(severity__iexact=severity)
         if platform:
-            q = q.filter(source__iexact=platform)
+            q = q.filter(platform_key=normalize_platform(platform))
         if region:
             q = q.filter(location__icontains=region)
         q = q.order_by('-created_at')[:limit]
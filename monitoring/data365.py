@@ -0,0 +1,288 @@
+"""
+Streaming fetcher for the Data365 Facebook feed.
+
+Pages of the feed are requested through a RateLimiter holding one token bucket
+per configured limit (API_RATE_LIMIT_PER_MINUTE and API_RATE_LIMIT_PER_HOUR),
+so a long sync is paced to the quota instead of bursting into 429s. Posts are
+written with monitoring.ingestion in batches, and progress is persisted in a
+FeedCursor: an interrupted run resumes from its page cursor, and a completed
+run records the newest post timestamp so the next run stops once it reaches
+posts it has already seen.
+
+FixtureFeedClient serves the same interface from a JSON file (recorded pages
+or a Data365-format posts file), for offline runs and tests.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import data365_config as conf
+from .ingestion import DEFAULT_BATCH_SIZE, ingest_posts
+from .models import FeedCursor
+
+logger = logging.getLogger(__name__)
+
+FEED_SOURCE = 'data365:facebook'
+
+# Wait used when a 429 response has no usable Retry-After header
+DEFAULT_THROTTLE_DELAY = 60
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate`` tokens per second, holding at most ``capacity``.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens=1):
+        """Seconds until ``tokens`` are available."""
+        self._refill()
+        if self.tokens >= tokens - 1e-9:  # float rounding must not leave a never-ending tiny wait
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def take(self, tokens=1):
+        self._refill()
+        self.tokens -= tokens
+
+    def drain(self, seconds):
+        """Empty the bucket and stop refilling it for ``seconds`` (after a throttling response)."""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class RateLimiter:
+    """
+    Takes a token from every bucket, blocking until they are all available.
+    Limits are per process: run a single fetcher per API key.
+    """
+
+    def __init__(self, buckets, sleep=time.sleep):
+        self.buckets = buckets
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, per_minute=None, per_hour=None, burst=None, clock=time.monotonic, sleep=time.sleep):
+        per_minute = per_minute or conf.API_RATE_LIMIT_PER_MINUTE
+        per_hour = per_hour or conf.API_RATE_LIMIT_PER_HOUR
+        burst = burst or conf.API_RATE_LIMIT_BURST
+        return cls(
+            [TokenBucket(per_minute / 60.0, burst, clock), TokenBucket(per_hour / 3600.0, burst, clock)],
+            sleep=sleep,
+        )
+
+    def acquire(self):
+        # Reserve a token now (buckets may go negative) and wait for it outside
+        # the lock, so that callers queue behind each other's reservations
+        # instead of behind each other's sleep
+        with self._lock:
+            wait = max(bucket.wait_time() for bucket in self.buckets)
+            for bucket in self.buckets:
+                bucket.take()
+        if wait > 0:
+            self.sleep(wait)
+
+    def throttled(self, seconds):
+        with self._lock:
+            for bucket in self.buckets:
+                bucket.drain(seconds)
+
+
+def parse_page(payload):
+    """
+    Split a Data365 response into (posts, next_cursor); next_cursor is None on the last page.
+    """
+    data = payload.get('data') or {}
+    if isinstance(data, list):
+        items, page_info = data, payload.get('page_info') or {}
+    else:
+        items, page_info = data.get('items') or [], data.get('page_info') or {}
+    next_cursor = page_info.get('cursor') if page_info.get('has_next_page', True) else None
+    return items, next_cursor or None
+
+
+class FeedClient:
+    """Base class of the feed clients: fetch_page() plus a paging generator."""
+
+    def fetch_page(self, cursor=None):
+        raise NotImplementedError
+
+    def iter_pages(self, cursor=None):
+        """Yield (posts, next_cursor) for each page, starting at ``cursor``."""
+        while True:
+            posts, next_cursor = self.fetch_page(cursor)
+            yield posts, next_cursor
+            if not next_cursor:
+                return
+            cursor = next_cursor
+
+    def iter_posts(self, cursor=None):
+        for posts, _ in self.iter_pages(cursor):
+            yield from posts
+
+
+class Data365Client(FeedClient):
+    """
+    Rate-limited client of the Data365 posts feed.
+    Args:
+        base_url (str, optional): API base URL (default: DATA365_API_BASE_URL).
+        api_key (str, optional): Access token (default: DATA365_API_KEY).
+        limiter (RateLimiter, optional): Shared limiter (default: from the configured limits).
+        record (list, optional): Every decoded response is appended to it (see FixtureFeedClient).
+    """
+
+    def __init__(self, base_url=None, api_key=None, endpoint=None, country=None, page_size=None,
+                 limiter=None, session=None, timeout=None, max_throttle_retries=5, record=None):
+        self.url = (base_url or conf.DATA365_API_BASE_URL).rstrip('/') + (endpoint or conf.FACEBOOK_DATA365_ENDPOINT)
+        self.api_key = conf.DATA365_API_KEY if api_key is None else api_key
+        self.country = country or conf.FACEBOOK_COUNTRY_FILTER
+        self.page_size = page_size or conf.DATA365_PAGE_SIZE
+        self.limiter = limiter or RateLimiter.from_config()
+        self.session = session or self._build_session()
+        self.timeout = timeout or conf.DATA365_TIMEOUT
+        self.max_throttle_retries = max_throttle_retries
+        self.record = record
+
+    @staticmethod
+    def _build_session():
+        # Connection errors and 5xx are retried here; 429s go through the limiter
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(max_retries=retry))
+        session.mount('https://', HTTPAdapter(max_retries=retry))
+        return session
+
+    def fetch_page(self, cursor=None):
+        params = {'access_token': self.api_key, 'country': self.country, 'max_page_size': self.page_size}
+        if cursor:
+            params['cursor'] = cursor
+        for _ in range(self.max_throttle_retries + 1):
+            self.limiter.acquire()
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+            if response.status_code == 429:
+                delay = _retry_after(response)
+                logger.warning("Data365 throttled the feed request, pausing %ss", delay)
+                self.limiter.throttled(delay)
+                continue
+            response.raise_for_status()
+            payload = response.json()
+            if self.record is not None:
+                self.record.append(payload)
+            return parse_page(payload)
+        raise requests.HTTPError(f"Data365 kept throttling after {self.max_throttle_retries} retries")
+
+
+def _retry_after(response):
+    try:
+        return max(float(response.headers.get('Retry-After', DEFAULT_THROTTLE_DELAY)), 1.0)
+    except ValueError:
+        return DEFAULT_THROTTLE_DELAY
+
+
+class FixtureFeedClient(FeedClient):
+    """
+    Offline feed served from a JSON file: either recorded responses
+    ({"pages": [...]}, as written by `fetch_data365_posts --record`) or a
+    Data365-format posts file ({"cameroon_posts": [...]}) split into pages.
+    """
+
+    def __init__(self, path, page_size=None):
+        with open(path, 'r', encoding='utf-8') as file:
+            content = json.load(file)
+        if 'pages' in content:
+            self.pages = [parse_page(page)[0] for page in content['pages']]
+        else:
+            posts = content['cameroon_posts']
+            size = page_size or conf.DATA365_PAGE_SIZE
+            self.pages = [posts[start:start + size] for start in range(0, len(posts), size)] or [[]]
+
+    def fetch_page(self, cursor=None):
+        index = int(cursor or 0)
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        return self.pages[index], next_cursor
+
+
+def sync_feed(client, source=FEED_SOURCE, batch_size=DEFAULT_BATCH_SIZE, max_pages=None, analyze=True, force=False):
+    """
+    Page through the feed (newest posts first) and ingest it in batches until
+    reaching posts older than the last completed run, the end of the feed, or
+    ``max_pages``. The page cursor is saved after every ingested batch, so an
+    interrupted or page-limited run resumes where it stopped.
+    Args:
+        client (FeedClient): Feed to read.
+        source (str, optional): FeedCursor key.
+        batch_size (int, optional): Posts per ingestion batch (flushed at page boundaries).
+        max_pages (int, optional): Stop after this many pages (the run is resumed next time).
+        analyze (bool, optional): Queue created posts for model analysis.
+        force (bool, optional): Sync even if the last run completed less than CACHE_DURATION_MINUTES ago.
+    Returns:
+        dict: pages, fetched, created, updated, completed and skipped.
+    """
+    state, _ = FeedCursor.objects.get_or_create(source=source)
+    summary = {'pages': 0, 'fetched': 0, 'created': 0, 'updated': 0, 'completed': False, 'skipped': False}
+    fresh_until = state.completed_at and state.completed_at + timedelta(minutes=conf.CACHE_DURATION_MINUTES)
+    if not force and not state.cursor and fresh_until and timezone.now() < fresh_until:
+        summary['skipped'] = True
+        return summary
+
+    resuming = bool(state.cursor)
+    run_high_water_mark = state.run_high_water_mark if resuming else 0
+    batch = []
+
+    def flush(next_cursor):
+        if batch:
+            result = ingest_posts(batch, batch_size=batch_size, analyze=analyze)
+            summary['created'] += result['created']
+            summary['updated'] += result['updated']
+            batch.clear()
+        state.cursor = next_cursor or ''
+        state.run_high_water_mark = run_high_water_mark
+        state.save(update_fields=['cursor', 'run_high_water_mark', 'updated_at'])
+
+    reached_seen_posts = False
+    next_cursor = None
+    for posts, next_cursor in client.iter_pages(state.cursor or None):
+        summary['pages'] += 1
+        for post in posts:
+            post_timestamp = int(post.get('timestamp') or 0)
+            if post_timestamp < state.high_water_mark:
+                reached_seen_posts = True
+                continue
+            run_high_water_mark = max(run_high_water_mark, post_timestamp)
+            batch.append(post)
+            summary['fetched'] += 1
+        done = reached_seen_posts or not next_cursor
+        if done or len(batch) >= batch_size or (max_pages and summary['pages'] >= max_pages):
+            flush(None if done else next_cursor)
+        if done or (max_pages and summary['pages'] >= max_pages):
+            break
+
+    if reached_seen_posts or not next_cursor:
+        state.high_water_mark = max(state.high_water_mark, run_high_water_mark)
+        state.run_high_water_mark = 0
+        state.cursor = ''
+        state.completed_at = timezone.now()
+        state.save()
+        summary['completed'] = True
+    logger.info("Feed %s sync: %s", source, summary)
+    return summary
@@ -1,26 +1,32 @@
 # Data365 API Configuration
-# This file will contain the configuration for the actual Data365 API integration
+# Configuration for the Data365 API integration (see monitoring.data365)
+
+from decouple import config
 
 # API Settings
-DATA365_API_BASE_URL = 'https://api.data365.com'  # Replace with actual Data365 API URL
-DATA365_API_KEY = ''  # Will be set from environment variable
+DATA365_API_BASE_URL = config('DATA365_API_BASE_URL', default='https://api.data365.com')
+DATA365_API_KEY = config('DATA365_API_KEY', default='')
 DATA365_API_VERSION = 'v1'
+DATA365_TIMEOUT = config('DATA365_TIMEOUT', default=30, cast=float)
+DATA365_PAGE_SIZE = config('DATA365_PAGE_SIZE', default=100, cast=int)
 
 # Facebook API specific settings
 FACEBOOK_DATA365_ENDPOINT = '/facebook/posts'
 FACEBOOK_COUNTRY_FILTER = 'cameroon'  # Country filter for posts
 
-# Rate limiting
-API_RATE_LIMIT_PER_MINUTE = 60
-API_RATE_LIMIT_PER_HOUR = 1000
+# Rate limiting (enforced by the token buckets of monitoring.data365.RateLimiter)
+API_RATE_LIMIT_PER_MINUTE = config('DATA365_RATE_LIMIT_PER_MINUTE', default=60, cast=int)
+API_RATE_LIMIT_PER_HOUR = config('DATA365_RATE_LIMIT_PER_HOUR', default=1000, cast=int)
+API_RATE_LIMIT_BURST = config('DATA365_RATE_LIMIT_BURST', default=1, cast=int)  # requests that may go back to back
 
 # Caching settings
 CACHE_FACEBOOK_POSTS = True
-CACHE_DURATION_MINUTES = 15
+CACHE_DURATION_MINUTES = 15  # minimum time between two completed feed syncs
 
 # Development settings (temporary)
 USE_JSON_DATA_SOURCE = True  # Set to False when using real API
-JSON_DATA_FILE = 'facebook_data.json'
+# File in monitoring/data (or absolute path); .ndjson/.jsonl files are memory-mapped (see monitoring.post_data)
+JSON_DATA_FILE = config('DATA365_JSON_DATA_FILE', default='facebook_data.json')
 
 # When ready to switch to real API:
 # 1. Set USE_JSON_DATA_SOURCE = False
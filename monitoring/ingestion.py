@@ -0,0 +1,184 @@
+"""
+Batch ingestion of Facebook posts received from Data365 (or the JSON data source).
+
+Posts are written in batches: one ``IN`` lookup per batch finds the posts we
+already have, new posts are inserted with a single ``bulk_create`` and the
+engagement counters of existing posts are refreshed with a single ``bulk_update``.
+New posts are queued for model analysis (see ``analysis_queue``) rather than
+analyzed inline, so ingestion never waits on the model API.
+"""
+import logging
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .analysis_queue import enqueue_posts
+from .models import FacebookPost
+from .rollups import record_posts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# Data365 field name -> default value, for every field copied onto FacebookPost
+POST_FIELD_DEFAULTS = {
+    'created_time': '',
+    'timestamp': 0,
+    'post_type': '',
+    'text': '',
+    'text_lang': '',
+    'text_tagged_users': [],
+    'text_tags': [],
+    'attached_link': '',
+    'attached_link_description': '',
+    'attached_image_url': '',
+    'attached_image_url_s3': '',
+    'attached_image_content': '',
+    'attached_medias_id': [],
+    'attached_medias_preview_url': [],
+    'attached_medias_preview_url_s3': [],
+    'attached_medias_preview_content': [],
+    'attached_post_id': '',
+    'attached_video_preview_url': '',
+    'attached_video_preview_url_s3': '',
+    'attached_video_url': '',
+    'post_screenshot': '',
+    'reactions_like_count': 0,
+    'reactions_love_count': 0,
+    'reactions_haha_count': 0,
+    'reactions_wow_count': 0,
+    'reactions_sad_count': 0,
+    'reactions_angry_count': 0,
+    'reactions_support_count': 0,
+    'reactions_total_count': 0,
+    'comments_count': 0,
+    'shares_count': 0,
+    'video_view_count': 0,
+    'video_duration': 0,
+    'overlay_text': '',
+    'fact_checks': [],
+    'owner_id': '',
+    'owner_username': '',
+    'owner_full_name': '',
+    'group_id': '',
+    'recommends': False,
+    'tagged_location_id': '',
+    'post_location_id': '',
+}
+
+# Counters refreshed on posts that are already stored
+ENGAGEMENT_FIELDS = [
+    'reactions_like_count',
+    'reactions_love_count',
+    'reactions_haha_count',
+    'reactions_wow_count',
+    'reactions_sad_count',
+    'reactions_angry_count',
+    'reactions_support_count',
+    'reactions_total_count',
+    'comments_count',
+    'shares_count',
+    'video_view_count',
+]
+
+
+def build_facebook_post(post_data):
+    """
+    Build an unsaved FacebookPost from a post dict in Data365 format.
+    """
+    fields = {
+        name: post_data.get(name, default)
+        for name, default in POST_FIELD_DEFAULTS.items()
+    }
+    return FacebookPost(post_id=post_data.get('id', ''), **fields)
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ingest_batch(batch):
+    """
+    Write one batch of post dicts. Returns (created_posts, updated_count).
+    """
+    # Dedupe within the batch; the last occurrence of a post_id wins
+    posts_by_id = {}
+    for post_data in batch:
+        post_id = post_data.get('id')
+        if post_id:
+            posts_by_id[post_id] = post_data
+
+    if not posts_by_id:
+        return [], 0
+
+    existing = FacebookPost.objects.filter(
+        post_id__in=list(posts_by_id)
+    ).only('id', 'post_id', *ENGAGEMENT_FIELDS).in_bulk(field_name='post_id')
+
+    now = timezone.now()
+    to_update = []
+    for post_id, post in existing.items():
+        post_data = posts_by_id[post_id]
+        for name in ENGAGEMENT_FIELDS:
+            setattr(post, name, post_data.get(name, POST_FIELD_DEFAULTS[name]))
+        # bulk_update() does not apply auto_now
+        post.updated_at = now
+        to_update.append(post)
+
+    to_create = [
+        build_facebook_post(post_data)
+        for post_id, post_data in posts_by_id.items()
+        if post_id not in existing
+    ]
+
+    with transaction.atomic():
+        if to_update:
+            FacebookPost.objects.bulk_update(to_update, ENGAGEMENT_FIELDS + ['updated_at'])
+        if to_create:
+            FacebookPost.objects.bulk_create(to_create, ignore_conflicts=True)
+
+    created_posts = []
+    if to_create:
+        # ignore_conflicts=True leaves primary keys unset, so reload the new rows
+        created_posts = list(FacebookPost.objects.filter(
+            post_id__in=[post.post_id for post in to_create],
+            created_at__gte=now,
+        ))
+        # bulk_create() does not send post_save, so update the dashboard rollups here
+        record_posts(created_posts)
+
+    return created_posts, len(to_update)
+
+
+def ingest_posts(posts_data, batch_size=DEFAULT_BATCH_SIZE, analyze=True):
+    """
+    Save an iterable of Data365 post dicts to the database in batches.
+
+    Args:
+        posts_data (iterable): Post dicts in Data365 format (keyed by 'id').
+        batch_size (int): Number of posts written per batch.
+        analyze (bool): Whether newly created posts are queued for model analysis.
+
+    Returns:
+        dict: {'created': int, 'updated': int, 'created_posts': list[FacebookPost]}
+    """
+    summary = {'created': 0, 'updated': 0, 'created_posts': []}
+
+    for batch in _chunked(posts_data, batch_size):
+        created_posts, updated_count = _ingest_batch(batch)
+        summary['created'] += len(created_posts)
+        summary['updated'] += updated_count
+        summary['created_posts'].extend(created_posts)
+
+        if analyze and created_posts:
+            # Analysis runs in the run_analysis_workers command, not inline
+            enqueue_posts([post.pk for post in created_posts])
+
+    logger.info("Ingested posts: %s created, %s updated", summary['created'], summary['updated'])
+    return summary
@@ -0,0 +1,197 @@
+"""
+Ingestion throughput benchmark (see the bench_ingestion command).
+
+Synthetic Data365 post dicts go through the production path: ingest_posts()
+writes the FacebookPost rows and queues their AnalysisJob rows, then worker
+threads drain the queue with run_once() like run_analysis_workers does,
+calling both model endpoints and writing the ContentModelAnalysis and Alert
+rows. The model API is a local ModelAPIStub with a configurable latency,
+jitter and error rate, so no network access is needed.
+
+The run is repeated for several caps on the model calls in flight (the
+MODEL_API_MAX_CONCURRENCY, MODEL_API_ENDPOINT_CONCURRENCY and
+MODEL_API_POOL_SIZE settings), each against a fresh stub, so that its circuit
+breaker starts closed. Results are plain dicts, one per concurrency level.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from . import model_client
+from .analysis_queue import UNFINISHED_STATUSES, run_once
+from .ingestion import POST_FIELD_DEFAULTS, ingest_posts
+from .model_api_stub import ModelAPIStub
+from .models import Alert, AnalysisJob, ContentModelAnalysis
+from .synthetic_posts import PostGenerator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16, 32, 64)
+
+# Seconds a worker waits when no job is due (retries and open circuits)
+POLL_INTERVAL = 0.05
+
+# Share of the best throughput a concurrency level must reach to be suggested
+SUGGESTED_THROUGHPUT_SHARE = 0.9
+
+
+def post_dicts(count, seed):
+    """``count`` synthetic posts of the last day, as Data365 post dicts."""
+    end = timezone.now()
+    generator = PostGenerator(seed, end - timedelta(days=1), end, owners=max(count // 200, 50))
+    posts = []
+    for _ in range(count):
+        post, _, _ = generator.next_post()
+        posts.append({'id': post.post_id, **{name: getattr(post, name) for name in POST_FIELD_DEFAULTS}})
+    return posts
+
+
+def drain(workers, batch_size, timeout):
+    """
+    Process queued analysis jobs on ``workers`` threads until none is left
+    unfinished or ``timeout`` seconds have passed.
+    Returns:
+        list: Errors raised by run_once() (e.g. a locked SQLite database).
+    """
+    deadline = time.monotonic() + timeout
+    errors = []
+
+    def work():
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    if run_once(batch_size):
+                        continue
+                    if not AnalysisJob.objects.filter(status__in=UNFINISHED_STATUSES).exists():
+                        return
+                except Exception as e:
+                    errors.append(e)
+                time.sleep(POLL_INTERVAL)
+        finally:
+            # Each thread has its own database connection
+            connection.close()
+
+    threads = [
+        threading.Thread(target=work, name=f'bench-worker-{i}', daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def _counts():
+    jobs = dict(AnalysisJob.objects.values_list('status').annotate(count=Count('id')))
+    return {
+        'done': jobs.get('done', 0),
+        'failed': jobs.get('failed', 0),
+        'analyses': ContentModelAnalysis.objects.count(),
+        'alerts': Alert.objects.count(),
+    }
+
+
+def measure(concurrency, posts, workers=4, batch_size=10, timeout=300, latency=0.2, jitter=0.0,
+            error_rate=0.0, read_timeout=None, seed=0):
+    """
+    Ingest and analyze ``posts`` with at most ``concurrency`` model calls in flight.
+    Args:
+        concurrency (int): Cap on the model calls in flight.
+        posts (list): Data365 post dicts not stored yet.
+        workers (int, optional): Analysis worker threads.
+        batch_size (int, optional): Jobs each worker claims at a time.
+        timeout (float, optional): Seconds after which the jobs still queued are given up.
+        latency, jitter, error_rate (float, optional): ModelAPIStub behavior.
+        read_timeout (float, optional): MODEL_API_READ_TIMEOUT (default: the setting).
+        seed (int, optional): Seed of the stub's latency and error draws.
+    Returns:
+        dict: Throughput (posts_per_s, model_calls_per_s), timings and outcome counts.
+    """
+    before = _counts()
+    overrides = {
+        'MODEL_API_MAX_CONCURRENCY': concurrency,
+        'MODEL_API_ENDPOINT_CONCURRENCY': concurrency,
+        'MODEL_API_POOL_SIZE': concurrency,
+        'MODEL_RESULT_CACHE_ENABLED': False,
+        'ANALYSIS_QUEUE_RETRY_DELAY_SECONDS': 0,
+    }
+    if read_timeout is not None:
+        overrides['MODEL_API_READ_TIMEOUT'] = read_timeout
+
+    stub = ModelAPIStub(latency=latency, jitter=jitter, error_rate=error_rate, seed=seed)
+    with stub, override_settings(MODEL_API_BASE_URL=stub.url, **overrides):
+        # Rebuild the shared session and executor with this level's limits
+        model_client.reset()
+        try:
+            started = time.perf_counter()
+            summary = ingest_posts(posts)
+            ingest_seconds = time.perf_counter() - started
+            errors = drain(workers, batch_size, timeout)
+            elapsed = time.perf_counter() - started
+        finally:
+            model_client.reset()
+    stats = stub.stats()
+
+    # Jobs left over at the timeout must not be processed by the next level
+    unfinished = AnalysisJob.objects.filter(status__in=UNFINISHED_STATUSES)
+    unfinished_count = unfinished.count()
+    unfinished.delete()
+    after = _counts()
+    if errors:
+        logger.warning("%s analysis worker errors at concurrency %s, e.g. %s", len(errors), concurrency, errors[0])
+
+    done = after['done'] - before['done']
+    return {
+        'concurrency': concurrency,
+        'posts': summary['created'],
+        'posts_per_s': round(done / elapsed, 1),
+        'model_calls_per_s': round(stats['requests'] / elapsed, 1),
+        'ingest_s': round(ingest_seconds, 3),
+        'elapsed_s': round(elapsed, 3),
+        'max_in_flight': stats['max_in_flight'],
+        'model_calls': stats['requests'],
+        'model_errors': stats['errors'],
+        'jobs_done': done,
+        'jobs_failed': after['failed'] - before['failed'],
+        'jobs_unfinished': unfinished_count,
+        'analyses': after['analyses'] - before['analyses'],
+        'alerts': after['alerts'] - before['alerts'],
+        'worker_errors': len(errors),
+    }
+
+
+def run(count, concurrency_levels=DEFAULT_CONCURRENCY, seed=0, **options):
+    """
+    measure() each concurrency level with ``count`` new posts.
+    Returns:
+        list: measure() results, in the order of ``concurrency_levels``.
+    """
+    results = []
+    for index, concurrency in enumerate(concurrency_levels):
+        # Another post seed per level, so post ids do not collide
+        posts = post_dicts(count, seed=(seed + index) % 10 ** 4)
+        logger.info("Benchmarking ingestion of %s posts at concurrency %s", count, concurrency)
+        results.append(measure(concurrency, posts, seed=seed + index, **options))
+    return results
+
+
+def suggested_concurrency(results):
+    """
+    Lowest concurrency level reaching SUGGESTED_THROUGHPUT_SHARE of the best
+    throughput, without unfinished jobs; None if no level qualifies.
+    """
+    complete = [result for result in results if not result['jobs_unfinished']]
+    if not complete:
+        return None
+    best = max(result['posts_per_s'] for result in complete)
+    return min(
+        result['concurrency'] for result in complete
+        if result['posts_per_s'] >= best * SUGGESTED_THROUGHPUT_SHARE
+    )
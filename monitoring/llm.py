@@ -0,0 +1,199 @@
+"""
+LLM providers behind the Cameroon assistant endpoints (gemini_ask, openai_ask, azure_openai_ask).
+
+Clients are built once and reused, so connections to the provider stay
+pooled. On an event loop serving many requests (under ASGI, see
+model_client.mark_long_lived_loop()) the providers' async clients are used,
+one per loop, so calls in flight are not capped by a thread pool. Under WSGI
+every async view runs on a new event loop, where a loop-bound client could
+never be reused: there the process-wide sync clients are called on worker
+threads instead.
+Answers are cached by normalized question in an in-process LRU with a time
+to live (LLM_RESPONSE_CACHE_SIZE, LLM_RESPONSE_CACHE_TTL), so repeated and
+bot questions to these public endpoints cost no tokens. Calls go through the
+providers' circuit breakers.
+"""
+import asyncio
+import threading
+import weakref
+
+import google.generativeai as genai
+import openai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .analysis_cache import LRUCache, normalize_text
+from .circuit_breaker import get_breaker
+from .model_client import is_long_lived_loop
+
+CAMEROON_SYSTEM_PROMPT = (
+    "You are an assistant that only provides information related to Cameroon. "
+    "If the question is not about Cameroon, politely refuse to answer. "
+    "If the question is ambiguous, ask the user to clarify how it relates to Cameroon. "
+    "Never provide information about other countries, regions, or topics unless it is directly connected to Cameroon. "
+    "Always keep answers concise, factual, and relevant to Cameroon."
+)
+
+GEMINI_MODEL = 'gemini-1.5-pro-latest'
+
+answer_cache = LRUCache(
+    maxsize=getattr(settings, 'LLM_RESPONSE_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'LLM_RESPONSE_CACHE_TTL', 3600),
+)
+
+# provider -> sync client
+_clients = {}
+# long-lived event loop -> {provider: async client}
+_async_clients = weakref.WeakKeyDictionary()
+_gemini_model = None
+_lock = threading.Lock()
+
+
+def _timeout():
+    return getattr(settings, 'LLM_API_TIMEOUT', 30)
+
+
+def _client(provider, build):
+    client = _clients.get(provider)
+    if client is None:
+        with _lock:
+            client = _clients.get(provider)
+            if client is None:
+                client = _clients[provider] = build()
+    return client
+
+
+def _loop_client(provider, build):
+    """Async client of ``provider`` for the running (long-lived) event loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if provider not in clients:
+        clients[provider] = build()
+    return clients[provider]
+
+
+def openai_client():
+    return _client('openai', lambda: openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=_timeout(),
+    ))
+
+
+def async_openai_client():
+    return _loop_client('openai', lambda: openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=_timeout(),
+    ))
+
+
+def _azure_options():
+    return {
+        'api_key': settings.AZURE_OPENAI_API_KEY,
+        'api_version': getattr(settings, 'AZURE_OPENAI_API_VERSION', '2024-02-15-preview'),
+        'azure_endpoint': settings.AZURE_OPENAI_ENDPOINT,
+        'timeout': _timeout(),
+    }
+
+
+def azure_openai_client():
+    return _client('azure-openai', lambda: openai.AzureOpenAI(**_azure_options()))
+
+
+def async_azure_openai_client():
+    return _loop_client('azure-openai', lambda: openai.AsyncAzureOpenAI(**_azure_options()))
+
+
+def gemini_model():
+    global _gemini_model
+    if _gemini_model is None:
+        with _lock:
+            if _gemini_model is None:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+    return _gemini_model
+
+
+def _cache_key(provider, model, question):
+    return f"{provider}:{model}:{normalize_text(question)}"
+
+
+async def _cached(provider, model, question, ask, aask, read=None):
+    """
+    Answer from the cache, or through the provider's circuit breaker from
+    ``aask()`` (a coroutine, on long-lived event loops) or ``ask()`` (a
+    blocking call, run on a worker thread).
+    ``read(response)`` extracts the answer outside the breaker: an answer the
+    provider refused to give (e.g. blocked by safety filters) is not an outage.
+    """
+    enabled = getattr(settings, 'LLM_RESPONSE_CACHE_ENABLED', True)
+    key = _cache_key(provider, model, question)
+    if enabled:
+        answer = answer_cache.get(key)
+        if answer is not None:
+            return answer
+    async with get_breaker(provider).aguard():
+        if is_long_lived_loop():
+            answer = await aask()
+        else:
+            answer = await sync_to_async(ask, thread_sensitive=False)()
+    if read is not None:
+        answer = read(answer)
+    if enabled and answer:
+        answer_cache.set(key, answer)
+    return answer
+
+
+def _chat_messages(question):
+    return [
+        {"role": "system", "content": CAMEROON_SYSTEM_PROMPT},
+        {"role": "user", "content": question},
+    ]
+
+
+def _chat_completion(client, model, question):
+    response = client.chat.completions.create(
+        model=model, messages=_chat_messages(question), temperature=0.7, max_tokens=512,
+    )
+    return response.choices[0].message.content
+
+
+async def _async_chat_completion(client, model, question):
+    response = await client.chat.completions.create(
+        model=model, messages=_chat_messages(question), temperature=0.7, max_tokens=512,
+    )
+    return response.choices[0].message.content
+
+
+async def ask_openai(question):
+    model = getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')
+    return await _cached(
+        'openai', model, question,
+        lambda: _chat_completion(openai_client(), model, question),
+        lambda: _async_chat_completion(async_openai_client(), model, question),
+    )
+
+
+async def ask_azure_openai(question):
+    deployment = settings.AZURE_OPENAI_DEPLOYMENT
+    return await _cached(
+        'azure-openai', deployment, question,
+        lambda: _chat_completion(azure_openai_client(), deployment, question),
+        lambda: _async_chat_completion(async_azure_openai_client(), deployment, question),
+    )
+
+
+def _gemini_text(response):
+    return response.text if hasattr(response, 'text') else str(response)
+
+
+async def ask_gemini(question):
+    prompt = f"{CAMEROON_SYSTEM_PROMPT}\n\nUser question: {question}"
+
+    def ask():
+        return gemini_model().generate_content(prompt, request_options={'timeout': _timeout()})
+
+    def aask():
+        # The async Gemini client is bound to the first loop using it: only one
+        # long-lived loop per process uses it (the ASGI worker's)
+        return gemini_model().generate_content_async(prompt, request_options={'timeout': _timeout()})
+
+    return await _cached('gemini', GEMINI_MODEL, question, ask, aask, read=_gemini_text)
@@ -1,24 +1,80 @@
 # This management commands will analyze all media posts in the database using the model endpoints
 # and print/save the results. This is a good place for batch or scheduled analysis.
+# Posts are streamed from the database and sent to the model API in batches.
+# With --save, only the analyses a post does not have yet are run and stored, so re-runs
+# never duplicate rows, and posts whose analysis failed (e.g. model API down) are queued
+# for the analysis workers.
 
 from django.core.management.base import BaseCommand
+from monitoring.analysis import ANALYSIS_TYPES, STORE_RESULT
+from monitoring.analysis_queue import enqueue_posts
+from monitoring.models import ContentModelAnalysis
 from monitoring.models import FacebookPost  # In future, replace with a generic MediaPost model
-from monitoring.model_client import analyze_hate, analyze_misinformation
+from monitoring.model_client import analyze_hate_batch, analyze_misinformation_batch
+
 
 class Command(BaseCommand):
     help = 'Analyze media posts for hate and misinformation using the model endpoints.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=256,
+            help='Number of posts sent to the model API per batch (default: 256)',
+        )
+        parser.add_argument(
+            '--save',
+            action='store_true',
+            help='Store the missing results as ContentModelAnalysis rows (and Alerts) instead of only printing them',
+        )
+
     def handle(self, *args, **options):
-        posts = FacebookPost.objects.all()  # Replace with MediaPost.objects.all() when available
+        posts = FacebookPost.objects.exclude(text='')  # Replace with MediaPost.objects.all() when available
         self.stdout.write(f"Analyzing {posts.count()} media posts...")
-        for post in posts:
-            content = post.text or ''
-            if not content.strip():
+
+        batch = []
+        for post in posts.only('id', 'post_id', 'text').iterator(chunk_size=options['batch_size']):
+            if not post.text.strip():
                 continue
-            hate_result = analyze_hate(content)
-            misinformation_result = analyze_misinformation(content)
-            self.stdout.write(f"Post ID: {post.post_id}")
-            self.stdout.write(f"  Hate Analysis: {hate_result}")
-            self.stdout.write(f"  Misinformation Analysis: {misinformation_result}")
-            # Optionally, save results to the database or take further action here
+            batch.append(post)
+            if len(batch) >= options['batch_size']:
+                self.analyze_batch(batch, options['save'])
+                batch = []
+        if batch:
+            self.analyze_batch(batch, options['save'])
+
         self.stdout.write(self.style.SUCCESS('Analysis complete.'))
+
+    def analyze_batch(self, posts, save):
+        done = set()
+        if save:
+            # Analyses already stored, by this command or the analysis workers
+            done = set(
+                ContentModelAnalysis.objects.filter(post_id__in=[post.pk for post in posts])
+                .values_list('post_id', 'analysis_type')
+            )
+        results = {}
+        for analysis_type, analyze in (('hate', analyze_hate_batch), ('misinformation', analyze_misinformation_batch)):
+            missing = [post for post in posts if (post.pk, analysis_type) not in done]
+            if missing:
+                for post, result in zip(missing, analyze([post.text for post in missing])):
+                    results[post.pk, analysis_type] = result
+
+        failed = []
+        for post in posts:
+            self.stdout.write(f"Post ID: {post.post_id}")
+            for analysis_type in ANALYSIS_TYPES:
+                result = results.get((post.pk, analysis_type))
+                if result is None:
+                    self.stdout.write(f"  {analysis_type.capitalize()} Analysis: already stored")
+                    continue
+                self.stdout.write(f"  {analysis_type.capitalize()} Analysis: {result}")
+                if save and STORE_RESULT[analysis_type](post, result) is None:
+                    failed.append(post.pk)
+        if failed:
+            # The workers only run the analyses still missing for each post; posts
+            # already queued by an earlier run are not queued again
+            queued = enqueue_posts(failed)
+            if queued:
+                self.stdout.write(f"  Queued {queued} posts with failed analyses for the analysis workers")
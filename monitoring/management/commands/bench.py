@@ -0,0 +1,193 @@
+# This management command benchmarks the dashboard and report endpoints at several
+# data scales. It runs in a separate test database, seeded with synthetic posts,
+# analyses, alerts (generate_facebook_posts) and suspicious content reports (loaddata)
+# up to each scale in turn, and reports p50/p95 latency, query count and peak memory
+# per endpoint, compared against a baseline JSON file. See monitoring.benchmark.
+
+import json
+import platform
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from monitoring import benchmark
+from monitoring.models import FacebookPost
+from monitoring.synthetic_posts import SEED_SPACE, generate_posts
+from reportsuspeciouscontent.mock_data import generate_reports
+from reportsuspeciouscontent.models import SuspiciousContentReport
+
+DEFAULT_SCALES = [10_000, 100_000]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the dashboard and report endpoints at several data scales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            type=int,
+            nargs='+',
+            default=DEFAULT_SCALES,
+            help='Posts and reports to seed before each run, e.g. 10_000 100_000 1_000_000 '
+                 '(default: 10_000 100_000)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Timed calls per endpoint (default: 20)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=2,
+            help='Untimed calls per endpoint before timing (default: 2)',
+        )
+        parser.add_argument(
+            '--endpoints',
+            nargs='+',
+            choices=[endpoint.name for endpoint in benchmark.ENDPOINTS],
+            help='Only benchmark these endpoints (default: all)',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Baseline JSON file to compare the results with',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Relative latency/memory increase over the baseline counted as a regression (default: 0.2)',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error when a regression is found',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file (use it as the next --baseline)',
+        )
+        parser.add_argument(
+            '--cached',
+            action='store_true',
+            help='Keep the dashboard report cache on (default: off, every call computes the report)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed of the seeded data (default: 0)',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the seeded test database, and reuse it, between runs',
+        )
+
+    def handle(self, *args, **options):
+        scales = sorted(set(options['scales']))
+        if scales[0] < 1 or options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--scales and --iterations must be >= 1, --warmup >= 0')
+        baseline = {}
+        if options['baseline']:
+            try:
+                with open(options['baseline'], 'r', encoding='utf-8') as file:
+                    baseline = json.load(file)['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {e}")
+        endpoints = [
+            endpoint for endpoint in benchmark.ENDPOINTS
+            if not options['endpoints'] or endpoint.name in options['endpoints']
+        ]
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        keepdb = options['keepdb']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            with override_settings(REPORT_CACHE_ENABLED=options['cached']):
+                results = self.run_scales(scales, endpoints, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+            teardown_test_environment()
+
+        regressions = benchmark.compare(results, baseline, options['tolerance'])
+        self.write_report(results, baseline, regressions)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': {
+                        'created_at': timezone.now().isoformat(),
+                        'database': connection.vendor,
+                        'python': platform.python_version(),
+                        'iterations': options['iterations'],
+                        'cached': options['cached'],
+                    },
+                    'results': results,
+                }, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+
+    def seed(self, scale, seed):
+        """Top the posts and reports up to ``scale`` rows each."""
+        posts = FacebookPost.objects.count()
+        if posts < scale:
+            self.stdout.write(f"Seeding {scale - posts:,} posts...")
+            # A new seed per top-up, so post ids do not collide with the earlier ones
+            top_up_seed = random.Random(f'{seed}-{posts}').randrange(SEED_SPACE)
+            try:
+                generate_posts(scale - posts, seed=top_up_seed)
+            except ValueError as e:
+                raise CommandError(str(e))
+        reports = SuspiciousContentReport.objects.count()
+        if reports < scale:
+            self.stdout.write(f"Seeding {scale - reports:,} suspicious content reports...")
+            generate_reports(scale - reports, seed=seed + reports)
+
+    def run_scales(self, scales, endpoints, options):
+        user, _ = User.objects.get_or_create(
+            username='bench', defaults={'email': 'bench@example.com', 'is_staff': True},
+        )
+        results = {}
+        for scale in scales:
+            self.seed(scale, options['seed'])
+            self.stdout.write(f"Benchmarking at {scale:,} rows...")
+            try:
+                results[str(scale)] = benchmark.run(user, endpoints, options['iterations'], options['warmup'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+        return results
+
+    def write_report(self, results, baseline, regressions):
+        regressed = {(scale, name, metric) for scale, name, metric, _, _ in regressions}
+        for scale, endpoints in results.items():
+            self.stdout.write(f"\n{int(scale):,} rows")
+            self.stdout.write(
+                f"{'endpoint':<28}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'peak KiB':>10}  vs baseline p95"
+            )
+            for name, metrics in endpoints.items():
+                reference = baseline.get(scale, {}).get(name)
+                change = ''
+                if reference and reference.get('p95_ms'):
+                    change = f"{(metrics['p95_ms'] / reference['p95_ms'] - 1) * 100:+.0f}%"
+                line = (
+                    f"{name:<28}{metrics['p50_ms']:>10.1f}{metrics['p95_ms']:>10.1f}"
+                    f"{metrics['queries']:>9}{metrics['peak_memory_kib']:>10}  {change}"
+                )
+                if any((scale, name, metric) in regressed for metric in benchmark.METRICS):
+                    line = self.style.ERROR(line)
+                self.stdout.write(line)
+
+        if not baseline:
+            return
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("\nNo regressions against the baseline."))
+            return
+        self.stdout.write(self.style.ERROR(f"\n{len(regressions)} regression(s):"))
+        for scale, name, metric, reference, current in regressions:
+            self.stdout.write(f"  {int(scale):,} rows {name} {metric}: {reference} -> {current}")
@@ -0,0 +1,166 @@
+# This management command benchmarks the ingestion pipeline end to end: synthetic
+# posts are ingested (ingest_posts), analyzed by analysis worker threads against a
+# local stand-in of the model API, and stored as ContentModelAnalysis and Alert rows.
+# It runs in a separate test database and reports posts per second at each cap on
+# the model calls in flight. See monitoring.ingestion_benchmark.
+
+import json
+import os
+import platform
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from monitoring import ingestion_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark posts per second through ingestion and model analysis against a local model API stub.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=500,
+            help='Posts ingested at each concurrency level (default: 500)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=list(ingestion_benchmark.DEFAULT_CONCURRENCY),
+            help='Caps on the model calls in flight to benchmark (default: 1 2 4 8 16 32 64)',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Mean response time of the model API stub in seconds (default: 0.2)',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.05,
+            help='Standard deviation of the stub response time in seconds (default: 0.05)',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Share of stub responses that are HTTP 503 errors, e.g. 0.05 (default: 0)',
+        )
+        parser.add_argument(
+            '--read-timeout',
+            type=float,
+            help=f'Read timeout of the model calls in seconds (default: {settings.MODEL_API_READ_TIMEOUT})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Analysis worker threads, as in run_analysis_workers (default: 4)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Jobs each worker claims at a time, as in run_analysis_workers (default: 10)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=300,
+            help='Seconds after which the jobs still queued at a level are given up (default: 300)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed of the posts and of the stub latency and errors (default: 0)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file',
+        )
+
+    def handle(self, *args, **options):
+        levels = sorted(set(options['concurrency']))
+        if options['posts'] < 1 or levels[0] < 1 or options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--posts, --concurrency, --workers and --batch-size must be >= 1')
+        if not 0 <= options['error_rate'] <= 1 or options['latency'] < 0 or options['jitter'] < 0:
+            raise CommandError('--error-rate must be between 0 and 1, --latency and --jitter >= 0')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        test_settings = connection.settings_dict['TEST']
+        if connection.vendor == 'sqlite' and not test_settings['NAME']:
+            # Threads sharing an in-memory SQLite database lock whole tables; use a file,
+            # and let the worker threads wait for each other's writes
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_ingestion.sqlite3')
+            connection.settings_dict['OPTIONS'].setdefault('timeout', 30)
+            connection.settings_dict['OPTIONS'].setdefault('transaction_mode', 'IMMEDIATE')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = ingestion_benchmark.run(
+                options['posts'],
+                levels,
+                seed=options['seed'],
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                timeout=options['timeout'],
+                latency=options['latency'],
+                jitter=options['jitter'],
+                error_rate=options['error_rate'],
+                read_timeout=options['read_timeout'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.write_report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': {
+                        'created_at': timezone.now().isoformat(),
+                        'database': connection.vendor,
+                        'python': platform.python_version(),
+                        'posts': options['posts'],
+                        'workers': options['workers'],
+                        'batch_size': options['batch_size'],
+                        'latency': options['latency'],
+                        'jitter': options['jitter'],
+                        'error_rate': options['error_rate'],
+                        'read_timeout': options['read_timeout'] or settings.MODEL_API_READ_TIMEOUT,
+                    },
+                    'results': results,
+                }, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def write_report(self, results):
+        self.stdout.write(
+            f"{'concurrency':>11}{'posts/s':>10}{'calls/s':>10}{'in flight':>11}"
+            f"{'ingest s':>10}{'total s':>9}{'done':>7}{'failed':>8}{'unfinished':>12}{'503s':>7}"
+        )
+        for result in results:
+            line = (
+                f"{result['concurrency']:>11}{result['posts_per_s']:>10.1f}{result['model_calls_per_s']:>10.1f}"
+                f"{result['max_in_flight']:>11}{result['ingest_s']:>10.2f}{result['elapsed_s']:>9.2f}"
+                f"{result['jobs_done']:>7}{result['jobs_failed']:>8}{result['jobs_unfinished']:>12}"
+                f"{result['model_errors']:>7}"
+            )
+            if result['jobs_failed'] or result['jobs_unfinished'] or result['worker_errors']:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+
+        suggested = ingestion_benchmark.suggested_concurrency(results)
+        if suggested is None:
+            self.stdout.write(self.style.ERROR("\nNo level analyzed every post before --timeout."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{suggested} model calls in flight reach {ingestion_benchmark.SUGGESTED_THROUGHPUT_SHARE:.0%} "
+            f"of the best throughput (MODEL_API_MAX_CONCURRENCY)."
+        ))
@@ -0,0 +1,89 @@
+# This management command pages through the Data365 Facebook feed within the configured
+# rate limits and ingests the posts in batches. Progress is kept in a FeedCursor, so runs
+# resume where the previous one stopped. Schedule it (e.g. from cron) to keep posts fresh.
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.data365 import FEED_SOURCE, Data365Client, FixtureFeedClient, sync_feed
+from monitoring.ingestion import DEFAULT_BATCH_SIZE
+from monitoring.models import FeedCursor
+
+
+class Command(BaseCommand):
+    help = 'Fetch posts from the Data365 feed and ingest them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Number of posts written per batch (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            help='Stop after this many pages; the next run resumes from there',
+        )
+        parser.add_argument(
+            '--no-analyze',
+            action='store_true',
+            help='Do not queue newly created posts for model analysis',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Sync even if the last sync completed less than CACHE_DURATION_MINUTES ago',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Forget the saved cursor and high-water mark and read the whole feed again',
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Data365 API base URL (default: DATA365_API_BASE_URL), e.g. a local stub server',
+        )
+        parser.add_argument(
+            '--fixture',
+            help='Read the feed from a JSON file (recorded pages or a "cameroon_posts" file) instead of the API',
+        )
+        parser.add_argument(
+            '--record',
+            help='Write the API responses of this run to a JSON file usable with --fixture',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            FeedCursor.objects.filter(source=FEED_SOURCE).delete()
+
+        recorded = [] if options['record'] else None
+        if options['fixture']:
+            try:
+                client = FixtureFeedClient(options['fixture'])
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Could not read the feed fixture {options['fixture']}: {e}")
+        else:
+            client = Data365Client(base_url=options['base_url'], record=recorded)
+
+        try:
+            summary = sync_feed(
+                client,
+                batch_size=options['batch_size'],
+                max_pages=options['max_pages'],
+                analyze=not options['no_analyze'],
+                force=options['force'],
+            )
+        finally:
+            if recorded:
+                with open(options['record'], 'w', encoding='utf-8') as file:
+                    json.dump({'pages': recorded}, file)
+
+        if summary['skipped']:
+            self.stdout.write("Feed synced recently; use --force to sync again.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Fetched {summary['fetched']} posts from {summary['pages']} pages: "
+            f"{summary['created']} created, {summary['updated']} updated"
+            f"{'' if summary['completed'] else ' (stopped early, will resume)'}."
+        ))
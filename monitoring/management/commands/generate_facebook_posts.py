@@ -0,0 +1,87 @@
+# This management command fills FacebookPost, ContentModelAnalysis and Alert with
+# synthetic, Data365-like posts for scale tests of the dashboards and the ingestion
+# pipeline. The same --seed, --count, --days and --end always give the same rows;
+# see monitoring.synthetic_posts.
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from monitoring.management.progress import ProgressReporter
+from monitoring.synthetic_posts import DEFAULT_CHUNK_SIZE, SEED_SPACE, generate_posts, unused_seed
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic Facebook posts with their model analyses and alerts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1000,
+            help='Number of posts to generate, e.g. 1_000_000 (default: 1000)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Number of days the posts are spread across (default: 30)',
+        )
+        parser.add_argument(
+            '--end',
+            help='ISO 8601 date/time of the newest posts (default: now)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help=f'Random seed in [0, {SEED_SPACE}), to generate the same posts again in another database '
+                 '(default: a random seed not used in this database yet)',
+        )
+        parser.add_argument(
+            '--owners',
+            type=int,
+            help='Number of distinct post owners (default: one per 200 posts, at least 50)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Posts written per transaction (default: {DEFAULT_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--no-analyses',
+            action='store_true',
+            help='Only generate posts, without model analyses and alerts',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        if count < 0 or options['days'] < 1 or options['chunk_size'] < 1 or (options['owners'] or 1) < 1:
+            raise CommandError('--count must be >= 0, --days, --chunk-size and --owners >= 1')
+        end = None
+        if options['end']:
+            try:
+                end = datetime.fromisoformat(options['end'].replace('Z', '+00:00'))
+            except ValueError:
+                raise CommandError(f"Invalid --end value: {options['end']}")
+            if timezone.is_naive(end):
+                end = timezone.make_aware(end)
+        seed = options['seed'] if options['seed'] is not None else unused_seed()
+
+        self.stdout.write(f"Generating {count:,} posts (seed {seed})...")
+        try:
+            summary = generate_posts(
+                count,
+                days=options['days'],
+                seed=seed,
+                end=end,
+                owners=options['owners'],
+                chunk_size=options['chunk_size'],
+                analyses=not options['no_analyses'],
+                progress=ProgressReporter(self.stdout, 'posts'),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['posts']:,} posts, {summary['analyses']:,} analyses and {summary['alerts']:,} alerts."
+        ))
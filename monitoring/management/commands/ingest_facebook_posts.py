@@ -0,0 +1,46 @@
+# This management command loads Facebook posts in Data365 format from a JSON or
+# newline-delimited JSON file and writes them to the database through the batch
+# ingestion pipeline.
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.ingestion import ingest_posts, DEFAULT_BATCH_SIZE
+from monitoring.post_data import data_file_path, open_post_file
+
+
+class Command(BaseCommand):
+    help = 'Ingest Facebook posts from a Data365-format JSON file in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=data_file_path(),
+            help='Path to a JSON file with a "cameroon_posts" list, or an .ndjson/.jsonl file '
+                 'with one post per line (default: the configured data file)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Number of posts written per batch (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--no-analyze',
+            action='store_true',
+            help='Do not queue newly created posts for model analysis',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            posts = open_post_file(options['file'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise CommandError(f"Could not read posts from {options['file']}: {e}")
+
+        self.stdout.write(f"Ingesting {len(posts)} posts...")
+        summary = ingest_posts(
+            posts,
+            batch_size=options['batch_size'],
+            analyze=not options['no_analyze'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingestion complete: {summary['created']} created, {summary['updated']} updated."
+        ))
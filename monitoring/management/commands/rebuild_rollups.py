@@ -0,0 +1,33 @@
+# This management command recomputes the hourly MetricRollup counters read by the
+# dashboard endpoints from the raw Alert, ContentModelAnalysis and FacebookPost tables.
+# Use it for backfills and after bulk writes that bypass the rollup signals.
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from monitoring.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly dashboard metric rollups from the raw tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild hours from this ISO 8601 date/time onwards (default: rebuild everything)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.fromisoformat(options['since'].replace('Z', '+00:00'))
+            except ValueError:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        self.stdout.write(f"Rebuilding rollups{f' since {since.isoformat()}' if since else ''}...")
+        count = rebuild(since)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} rollup rows."))
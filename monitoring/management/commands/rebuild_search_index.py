@@ -0,0 +1,18 @@
+# This management command (re)creates and refills the full-text search indexes of
+# FacebookPost and SuspiciousContentReport (see monitoring.search). On SQLite, run it
+# after migrations that alter those tables: Django rebuilds the table and drops the
+# FTS sync triggers.
+
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+from monitoring.search import SEARCH_TARGETS, backend, install
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes.'
+
+    def handle(self, *args, **options):
+        for model in SEARCH_TARGETS:
+            install(connections[router.db_for_write(model)], model)
+            self.stdout.write(f"{model._meta.db_table}: {backend(model)} search")
+        self.stdout.write(self.style.SUCCESS('Search indexes rebuilt.'))
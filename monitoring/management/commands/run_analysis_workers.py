@@ -0,0 +1,85 @@
+# This management command drains the AnalysisJob queue: each worker thread claims
+# pending jobs, sends the post text to the model endpoints and stores the
+# ContentModelAnalysis and Alert rows. Run it alongside the web server.
+
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from monitoring.analysis_queue import run_once
+
+
+class Command(BaseCommand):
+    help = 'Run worker threads that process queued model analysis jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of concurrent worker threads (default: 4)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Number of jobs each worker claims at a time (default: 10)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait before polling again when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+        threads = [
+            threading.Thread(target=self.worker_loop, args=(options,), name=f'analysis-worker-{i}', daemon=True)
+            for i in range(options['workers'])
+        ]
+        self.stdout.write(f"Starting {len(threads)} analysis workers...")
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current jobs...")
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {self.processed} analysis jobs."))
+
+    def worker_loop(self, options):
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                try:
+                    count = run_once(options['batch_size'])
+                except Exception as e:
+                    # e.g. a lost connection or a locked SQLite database; keep the worker alive
+                    self.stderr.write(f"Error processing analysis jobs: {e}")
+                    self.stop_event.wait(options['poll_interval'])
+                    continue
+                with self.lock:
+                    self.processed += count
+                if count:
+                    continue
+                if options['once']:
+                    return
+                self.stop_event.wait(options['poll_interval'])
+        finally:
+            # Each thread has its own database connection
+            connection.close()
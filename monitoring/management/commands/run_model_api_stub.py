@@ -0,0 +1,63 @@
+# This management command serves a local stand-in of the model API (/hate/analyze,
+# /misinformation/analyze and their /batch routes) for offline development and load
+# tests. Point MODEL_API_BASE_URL at the printed URL. See monitoring.model_api_stub.
+
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.model_api_stub import ModelAPIStub
+
+
+class Command(BaseCommand):
+    help = 'Serve a local model API stub with configurable latency, jitter and error rate.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8100, help='Port to listen on (default: 8100)')
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Mean response time in seconds (default: 0.2)',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.05,
+            help='Standard deviation of the response time in seconds (default: 0.05)',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Share of responses that are HTTP 503 errors, e.g. 0.05 (default: 0)',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed of the latency and errors')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['error_rate'] <= 1 or options['latency'] < 0 or options['jitter'] < 0:
+            raise CommandError('--error-rate must be between 0 and 1, --latency and --jitter >= 0')
+        try:
+            stub = ModelAPIStub(
+                options['host'],
+                options['port'],
+                latency=options['latency'],
+                jitter=options['jitter'],
+                error_rate=options['error_rate'],
+                seed=options['seed'],
+            )
+        except OSError as e:
+            raise CommandError(f"Could not listen on {options['host']}:{options['port']}: {e}")
+
+        with stub:
+            self.stdout.write(self.style.SUCCESS(f"Model API stub listening on {stub.url}"))
+            self.stdout.write(f"Set MODEL_API_BASE_URL={stub.url} to use it. Press Ctrl+C to stop.")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+        stats = stub.stats()
+        self.stdout.write(
+            f"Served {stats['requests']} requests ({stats['errors']} errors, "
+            f"up to {stats['max_in_flight']} in flight)."
+        )
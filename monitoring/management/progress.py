@@ -0,0 +1,27 @@
+"""
+Progress output of the bulk data generator commands (generate_facebook_posts, loaddata).
+"""
+
+
+class ProgressReporter:
+    """
+    ``progress(written, total, elapsed_seconds)`` callback of the bulk generators:
+    writes "written/total <noun> (rate/s)" to ``stdout`` at most every
+    ``interval`` seconds, and once when done.
+    Args:
+        stdout (OutputWrapper): The command's stdout.
+        noun (str): What is counted, e.g. 'posts'.
+        interval (float, optional): Seconds between two lines.
+    """
+
+    def __init__(self, stdout, noun, interval=1.0):
+        self.stdout = stdout
+        self.noun = noun
+        self.interval = interval
+        self.last_report = 0.0
+
+    def __call__(self, written, total, elapsed):
+        if written == total or elapsed - self.last_report >= self.interval:
+            self.last_report = elapsed
+            rate = written / elapsed if elapsed else 0
+            self.stdout.write(f"{written:,}/{total:,} {self.noun} ({rate:,.0f}/s)")
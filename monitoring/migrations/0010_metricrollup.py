@@ -0,0 +1,91 @@
+# Generated by Django 5.2.3 on 2026-10-17 18:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import Lower, Trim, TruncHour
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Populate the rollups from the existing rows (same as `manage.py rebuild_rollups`).
+    A frozen copy of rollups.rebuild(), which must not import live code;
+    monitoring.tests checks that both still compute the same rows.
+    """
+    Alert = apps.get_model('monitoring', 'Alert')
+    ContentModelAnalysis = apps.get_model('monitoring', 'ContentModelAnalysis')
+    FacebookPost = apps.get_model('monitoring', 'FacebookPost')
+    MetricRollup = apps.get_model('monitoring', 'MetricRollup')
+
+    rows = []
+    alert_stats = (
+        Alert.objects.annotate(bucket=TruncHour('created_at'), platform_name=Lower(Trim('source')))
+        .values('bucket', 'platform_name', 'location')
+        .annotate(alerts=Count('id'), active_alerts=Count('id', filter=Q(status__in=['new', 'in_progress'])))
+        .order_by()
+    )
+    for row in alert_stats:
+        for metric in ('alerts', 'active_alerts'):
+            if row[metric]:
+                rows.append(MetricRollup(hour=row['bucket'], platform=row['platform_name'],
+                                         region=row['location'] or '', metric=metric, value=row[metric]))
+    analysis_stats = (
+        ContentModelAnalysis.objects.filter(analysis_type__in=['hate', 'misinformation'])
+        .annotate(bucket=TruncHour('created_at'), platform_name=Lower(Trim('post__platform')))
+        .values('bucket', 'platform_name', 'analysis_type')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in analysis_stats:
+        rows.append(MetricRollup(hour=row['bucket'], platform=row['platform_name'], region='',
+                                 metric=row['analysis_type'], value=row['total']))
+    post_stats = (
+        FacebookPost.objects.annotate(bucket=TruncHour('created_at'), platform_name=Lower(Trim('platform')))
+        .values('bucket', 'platform_name')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in post_stats:
+        rows.append(MetricRollup(hour=row['bucket'], platform=row['platform_name'], region='',
+                                 metric='posts', value=row['total']))
+    MetricRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0009_analysisjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('platform', models.CharField(blank=True, max_length=100)),
+                ('region', models.CharField(blank=True, max_length=200)),
+                ('metric', models.CharField(choices=[('posts', 'Posts'), ('alerts', 'Alerts'), ('active_alerts', 'Active Alerts'), ('hate', 'Hate Speech Analyses'), ('misinformation', 'Misinformation Analyses')], max_length=50)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['updated_at'], name='monitoring__updated_4c481f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facebookpost',
+            index=models.Index(fields=['updated_at'], name='monitoring__updated_01e32a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metricrollup',
+            index=models.Index(fields=['metric', 'hour'], name='monitoring__metric_59742a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='metricrollup',
+            constraint=models.UniqueConstraint(fields=('hour', 'platform', 'region', 'metric'), name='unique_metric_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
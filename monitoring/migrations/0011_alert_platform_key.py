@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-17 18:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def backfill_platform_key(apps, schema_editor):
+    """Set platform_key for the existing alerts in a single UPDATE."""
+    Alert = apps.get_model('monitoring', 'Alert')
+    Alert.objects.update(platform_key=Lower(Trim('source')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0010_metricrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='platform_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_platform_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['platform_key', 'created_at'], name='monitoring__platfor_edf7af_idx'),
+        ),
+    ]
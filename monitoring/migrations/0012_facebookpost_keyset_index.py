@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-17 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0011_alert_platform_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='facebookpost',
+            index=models.Index(fields=['-timestamp', '-id'], name='fbpost_timestamp_id_desc'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Full-text search indexes (see monitoring.search): GIN expression indexes on
+# PostgreSQL, FTS5 tables with sync triggers on SQLite, nothing elsewhere.
+# The DDL is a frozen copy of monitoring.search.install() as of this migration;
+# `manage.py rebuild_search_index` recreates the indexes with the current code.
+
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIGS = ('english', 'french')
+
+# table -> (indexed text columns, FTS5 table)
+SEARCH_TABLES = {
+    'monitoring_facebookpost': (('text', 'overlay_text', 'attached_image_content'), 'monitoring_facebookpost_fts'),
+    'suspicious_content_reports': (('description',), 'suspicious_content_reports_fts'),
+}
+
+
+def document_sql(columns):
+    return " || ' ' || ".join(f"""coalesce("{column}", '')""" for column in columns)
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for table, (columns, fts_table) in SEARCH_TABLES.items():
+            if connection.vendor == 'postgresql':
+                concurrently = 'CONCURRENTLY ' if not connection.in_atomic_block else ''
+                for config in SEARCH_CONFIGS:
+                    cursor.execute(
+                        f"CREATE INDEX {concurrently}IF NOT EXISTS {table}_search_{config} ON {table} "
+                        f"USING gin (to_tsvector('{config}'::regconfig, {document_sql(columns)}))"
+                    )
+            elif connection.vendor == 'sqlite':
+                column_list = ', '.join(columns)
+                new_values = ', '.join(f'new.{column}' for column in columns)
+                old_values = ', '.join(f'old.{column}' for column in columns)
+                try:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({column_list}, "
+                        f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+                    )
+                except OperationalError as e:
+                    logger.warning("SQLite without FTS5 (%s), search on %s falls back to icontains", e, table)
+                    continue
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                    f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+                )
+                cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for table, (columns, fts_table) in SEARCH_TABLES.items():
+            if connection.vendor == 'postgresql':
+                for config in SEARCH_CONFIGS:
+                    cursor.execute(f"DROP INDEX IF EXISTS {table}_search_{config}")
+            elif connection.vendor == 'sqlite':
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('monitoring', '0012_facebookpost_keyset_index'),
+        ('reportsuspeciouscontent', '0003_keywordcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
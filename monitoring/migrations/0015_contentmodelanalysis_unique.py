@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-17 19:53
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_analyses(apps, schema_editor):
+    """
+    Keep the first analysis of each type per post. Model signals do not run
+    here: run `manage.py rebuild_rollups` afterwards if rows were removed.
+    """
+    ContentModelAnalysis = apps.get_model('monitoring', 'ContentModelAnalysis')
+    duplicates = (
+        ContentModelAnalysis.objects.values('post_id', 'analysis_type')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        ContentModelAnalysis.objects.filter(
+            post_id=row['post_id'], analysis_type=row['analysis_type'],
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0014_feedcursor'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_analyses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='contentmodelanalysis',
+            constraint=models.UniqueConstraint(fields=('post', 'analysis_type'), name='unique_post_analysis_type'),
+        ),
+    ]
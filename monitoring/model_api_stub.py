@@ -0,0 +1,206 @@
+"""
+Local stand-in for the model API, for benchmarks and offline development
+(see the bench_ingestion and run_model_api_stub commands).
+
+Serves the routes monitoring.model_client calls, /hate/analyze,
+/hate-speech/analyze, /misinformation/analyze and the /batch routes, with a
+configurable latency (normally distributed with ``jitter`` as standard
+deviation) and a share of 503 errors. Verdicts are derived from the text, so
+the same text always gets the same answer: texts naming a targeted group are
+hate speech, texts with typical misinformation wording are misinformation.
+"""
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+HATE_TERMS = ('anglophones', 'francophones', 'bamileke', 'separatists')
+MISINFORMATION_TERMS = (
+    'urgent', 'breaking', 'secret', 'miracle', 'microchip', 'leaked', 'poison', 'empoisonnée',
+    'on nous ment', "won't tell you", 'cures', 'partagez', 'share this', 'share am',
+)
+
+HATE_ROUTES = ('/hate/analyze', '/hate-speech/analyze')
+MISINFORMATION_ROUTES = ('/misinformation/analyze',)
+BATCH_SUFFIX = '/batch'
+
+
+def _score(text, salt):
+    """Stable pseudo-random number in [0, 1) for ``text``."""
+    digest = hashlib.sha256(f"{salt}:{text}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32
+
+
+def _severity(score):
+    return 'high' if score > 0.66 else 'medium' if score > 0.33 else 'low'
+
+
+def hate_result(text):
+    lowered = (text or '').lower()
+    terms = [term for term in HATE_TERMS if term in lowered]
+    score = _score(text, 'hate')
+    return {
+        'is_hate_speech': bool(terms),
+        'confidence': round(0.7 + 0.29 * score if terms else 0.5 + 0.3 * score, 4),
+        'severity': _severity(score) if terms else 'low',
+        'category': 'ethnic' if terms else None,
+        'explanation': "Targets a group." if terms else "No hate speech detected.",
+        'detected_keywords': terms,
+    }
+
+
+def misinformation_result(text):
+    lowered = (text or '').lower()
+    flagged = any(term in lowered for term in MISINFORMATION_TERMS)
+    score = _score(text, 'misinformation')
+    return {
+        'label': 'misinformation' if flagged else 'reliable',
+        'confidence': round(0.7 + 0.29 * score if flagged else 0.5 + 0.3 * score, 4),
+        'severity': _severity(score) if flagged else 'low',
+        'explanation': "Unverified alarming claim." if flagged else "No false claims detected.",
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Connections queue up at high concurrency instead of being refused
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a slow response (read timeouts) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class ModelAPIStub:
+    """
+    Model API server on a local port, running in a background thread.
+    Args:
+        host (str, optional): Interface to listen on.
+        port (int, optional): Port; 0 picks a free one (see ``url``).
+        latency (float, optional): Mean response time in seconds.
+        jitter (float, optional): Standard deviation of the response time in seconds.
+        error_rate (float, optional): Share of requests answered with HTTP 503.
+        seed (int, optional): Seed of the latency and error draws.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.1, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self.server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        del stats['in_flight']
+        return stats
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='model-api-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _draw(self):
+        """(delay in seconds, whether to fail) of one request."""
+        with self._lock:
+            delay = max(self.random.gauss(self.latency, self.jitter), 0.0) if self.jitter else self.latency
+            return delay, self.random.random() < self.error_rate
+
+    def _begin(self):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['in_flight'] += 1
+            self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self._stats['in_flight'])
+
+    def _end(self, failed):
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            if failed:
+                self._stats['errors'] += 1
+
+    def respond(self, path, body):
+        """(status, response body) of a request to ``path``."""
+        batch = path.endswith(BATCH_SUFFIX)
+        route = path[:-len(BATCH_SUFFIX)] if batch else path
+        if route in HATE_ROUTES:
+            analyze = hate_result
+        elif route in MISINFORMATION_ROUTES:
+            analyze = misinformation_result
+        else:
+            return 404, {'detail': 'Not found'}
+        if batch:
+            return 200, {'results': [analyze(text) for text in body.get('texts', [])]}
+        return 200, analyze(body.get('text', ''))
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                stub._begin()
+                failed = False
+                status, payload = 500, {'detail': 'Internal stub error'}
+                try:
+                    try:
+                        length = int(self.headers.get('Content-Length') or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        status, payload = 400, {'detail': 'Invalid Content-Length'}
+                        self.close_connection = True  # the body cannot be skipped
+                    else:
+                        try:
+                            body = json.loads(self.rfile.read(length) or b'{}')
+                        except ValueError:
+                            status, payload = 400, {'detail': 'Invalid JSON'}
+                        else:
+                            delay, failed = stub._draw()
+                            time.sleep(delay)
+                            if failed:
+                                status, payload = 503, {'detail': 'Injected error'}
+                            else:
+                                status, payload = stub.respond(self.path, body)
+                except Exception:
+                    logger.exception("model API stub: error handling POST %s", self.path)
+                finally:
+                    stub._end(failed)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug("model API stub: " + format, *args)
+
+        return Handler
+
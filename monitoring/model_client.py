@@ -1,8 +1,337 @@
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .analysis_cache import result_cache
+from .circuit_breaker import CircuitOpenError, breaker_for_url
 
-MODEL_BASE_URL = "https://model.sui-ru.com"
+logger = logging.getLogger(__name__)
+
+MODEL_BASE_URL = getattr(settings, 'MODEL_API_BASE_URL', "https://model.sui-ru.com")
 HATE_ANALYZE_ENDPOINT = "/hate/analyze"
 MISINFORMATION_ANALYZE_ENDPOINT = "/misinformation/analyze"
+HATE_SPEECH_ANALYZE_ENDPOINT = "/hate-speech/analyze"
+HATE_ANALYZE_BATCH_ENDPOINT = "/hate/analyze/batch"
+MISINFORMATION_ANALYZE_BATCH_ENDPOINT = "/misinformation/analyze/batch"
+
+# Retry idempotent analysis calls on these upstream errors
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# Statuses meaning the server has no batch route
+BATCH_UNSUPPORTED_STATUS_CODES = (404, 405, 501)
+
+_session = None
+_session_lock = threading.Lock()
+
+_executor = None
+_endpoint_dispatchers = {}
+
+# Event loop -> httpx.AsyncClient (clients cannot be shared between loops)
+_async_clients = weakref.WeakKeyDictionary()
+
+# Event loops serving many requests (the ASGI server's), see mark_long_lived_loop()
+_long_lived_loops = weakref.WeakSet()
+
+# Batch endpoint -> False once the server has told us it does not support it
+_batch_route_supported = {}
+
+
+def _build_session():
+    """
+    Build a requests.Session with a pooled, keep-alive connection adapter
+    that retries connection errors and 5xx responses (not read timeouts) with backoff.
+    """
+    pool_size = getattr(settings, 'MODEL_API_POOL_SIZE', 20)
+    retry = Retry(
+        total=getattr(settings, 'MODEL_API_MAX_RETRIES', 3),
+        # A read timeout already cost a full MODEL_API_READ_TIMEOUT: fail rather
+        # than multiply it, and let the caller (or the analysis queue) retry
+        read=0,
+        backoff_factor=getattr(settings, 'MODEL_API_BACKOFF_FACTOR', 0.5),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+
+def get_session():
+    """
+    Return the process-wide model API session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_executor():
+    """
+    Return the process-wide executor of model API calls, creating it on first use.
+    Its size (MODEL_API_MAX_CONCURRENCY) caps the calls in flight across the process.
+    """
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'MODEL_API_MAX_CONCURRENCY', 16),
+                    thread_name_prefix='model-api',
+                )
+    return _executor
+
+
+class _EndpointDispatcher:
+    """
+    Hands the calls to one endpoint to the shared executor, at most ``limit``
+    at a time. The other calls wait in a queue, not on an executor thread, so
+    a saturated endpoint never holds up the calls to the others.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.queue = deque()
+        self.lock = threading.Lock()
+
+    def submit(self, fn, args, kwargs):
+        future = Future()
+        with self.lock:
+            if self.in_flight >= self.limit:
+                self.queue.append((future, fn, args, kwargs))
+                return future
+            self.in_flight += 1
+        self._start(future, fn, args, kwargs)
+        return future
+
+    def _start(self, future, fn, args, kwargs):
+        try:
+            get_executor().submit(self._run, future, fn, args, kwargs)
+        except RuntimeError as e:
+            # The executor was shut down by reset() in the meantime
+            if future.set_running_or_notify_cancel():
+                future.set_exception(e)
+            self._next()
+
+    def _run(self, future, fn, args, kwargs):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            self._next()
+
+    def _next(self):
+        """Start the next queued call, if any, in the slot of a finished one."""
+        with self.lock:
+            if not self.queue:
+                self.in_flight -= 1
+                return
+            queued = self.queue.popleft()
+        self._start(*queued)
+
+
+def _endpoint_dispatcher(url):
+    dispatcher = _endpoint_dispatchers.get(url)
+    if dispatcher is None:
+        with _session_lock:
+            dispatcher = _endpoint_dispatchers.setdefault(
+                url, _EndpointDispatcher(getattr(settings, 'MODEL_API_ENDPOINT_CONCURRENCY', 8))
+            )
+    return dispatcher
+
+
+def submit(url, fn, *args, **kwargs):
+    """
+    Run ``fn(*args, **kwargs)``, a call to the model endpoint ``url``, on the
+    shared executor, with at most MODEL_API_ENDPOINT_CONCURRENCY calls to
+    ``url`` in flight; further calls are queued until one finishes. Tasks
+    must not wait on other submitted tasks.
+    Returns:
+        concurrent.futures.Future
+    """
+    return _endpoint_dispatcher(url).submit(fn, args, kwargs)
+
+
+def reset():
+    """
+    Shut down the executor and close the session, so that the next calls
+    rebuild them from the current settings (MODEL_API_MAX_CONCURRENCY,
+    MODEL_API_ENDPOINT_CONCURRENCY, MODEL_API_POOL_SIZE). Calls already
+    submitted still complete.
+    """
+    global _executor, _session
+    with _session_lock:
+        executor, session = _executor, _session
+        _executor = _session = None
+        _endpoint_dispatchers.clear()
+    if executor is not None:
+        executor.shutdown(wait=True)
+    if session is not None:
+        session.close()
+
+
+def default_timeout():
+    """(connect, read) timeout used for model API calls."""
+    return (
+        getattr(settings, 'MODEL_API_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'MODEL_API_READ_TIMEOUT', 10),
+    )
+
+
+def model_url(endpoint, base_url=None):
+    """Build the full URL of a model API endpoint (on MODEL_API_BASE_URL by default)."""
+    return (base_url or getattr(settings, 'MODEL_API_BASE_URL', MODEL_BASE_URL)).rstrip('/') + endpoint
+
+
+def post_json(url, payload, timeout=None):
+    """
+    POST a JSON payload through the shared session and return the decoded response.
+    Args:
+        url (str): Full endpoint URL.
+        payload (dict): JSON body.
+        timeout (float or tuple, optional): Read timeout, or (connect, read) tuple.
+    Returns:
+        dict: The decoded JSON response.
+    Raises:
+        requests.RequestException: On connection errors, timeouts and error statuses,
+            and (CircuitOpenError) without calling the host while its circuit is open.
+    """
+    if timeout is None:
+        timeout = default_timeout()
+    elif not isinstance(timeout, tuple):
+        timeout = (default_timeout()[0], timeout)
+    with breaker_for_url(url).guard():
+        response = get_session().post(url, json=payload, timeout=timeout)
+        response.raise_for_status()
+    return response.json()
+
+
+def _split_payload(payload):
+    """(text, the other fields) of an analysis payload: both are part of the cache key."""
+    params = {name: value for name, value in payload.items() if name != "text"}
+    return payload.get("text", ""), params
+
+
+def analyze_text(url, payload, timeout=None):
+    """
+    POST an analysis payload ({"text": ...}) to ``url``, answering from the
+    result cache when the same normalized text was already analyzed there
+    with the same other payload fields.
+    Raises:
+        requests.RequestException: On connection errors, timeouts and error statuses.
+    """
+    text, params = _split_payload(payload)
+    result = result_cache.get(url, text, params)
+    if result is not None:
+        return result
+    result = post_json(url, payload, timeout=timeout)
+    result_cache.set(url, text, result, params)
+    return result
+
+
+def mark_long_lived_loop():
+    """
+    Record the running event loop as one serving many requests, so async model
+    calls on it use a pooled httpx.AsyncClient (see sui_ru_main.asgi).
+    """
+    _long_lived_loops.add(asyncio.get_running_loop())
+
+
+def is_long_lived_loop():
+    """Whether the running event loop was marked with mark_long_lived_loop()."""
+    return asyncio.get_running_loop() in _long_lived_loops
+
+
+def get_async_client():
+    """
+    Return the model API httpx.AsyncClient of the running event loop, creating
+    it on first use. Up to MODEL_API_ASYNC_MAX_CONNECTIONS requests are in
+    flight at once; further requests wait for a connection. Only for loops
+    marked with mark_long_lived_loop().
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connect_timeout, read_timeout = default_timeout()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=getattr(settings, 'MODEL_API_ASYNC_MAX_CONNECTIONS', 200),
+                max_keepalive_connections=getattr(settings, 'MODEL_API_POOL_SIZE', 20),
+            ),
+            headers={'Content-Type': 'application/json'},
+            transport=httpx.AsyncHTTPTransport(retries=getattr(settings, 'MODEL_API_MAX_RETRIES', 3)),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def async_post_json(url, payload, timeout=None):
+    """
+    Async post_json(): 5xx responses are retried with the same backoff as the sync session.
+    On an event loop that lives for one request only (async views under WSGI),
+    a client bound to it could never be reused, so the call goes through the
+    pooled sync session on the shared executor instead.
+    Raises:
+        httpx.HTTPError, requests.RequestException: On connection errors, timeouts
+            and error statuses, and (CircuitOpenError) without calling the host
+            while its circuit is open.
+    """
+    if not is_long_lived_loop():
+        return await asyncio.wrap_future(submit(url, post_json, url, payload, timeout))
+    if timeout is not None and not isinstance(timeout, tuple):
+        timeout = (default_timeout()[0], timeout)
+    request_timeout = httpx.Timeout(timeout[1], connect=timeout[0]) if timeout else httpx.USE_CLIENT_DEFAULT
+    retries = getattr(settings, 'MODEL_API_MAX_RETRIES', 3)
+    backoff = getattr(settings, 'MODEL_API_BACKOFF_FACTOR', 0.5)
+    client = get_async_client()
+    async with breaker_for_url(url).aguard():
+        for attempt in range(retries + 1):
+            response = await client.post(url, json=payload, timeout=request_timeout)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                break
+            await asyncio.sleep(backoff * (2 ** attempt))
+        response.raise_for_status()
+    return response.json()
+
+
+async def async_analyze_text(url, payload, timeout=None):
+    """
+    Async analyze_text(), sharing its result cache.
+    Raises:
+        httpx.HTTPError, requests.RequestException: On connection errors, timeouts
+            and error statuses.
+    """
+    text, params = _split_payload(payload)
+    result = await sync_to_async(result_cache.get)(url, text, params)
+    if result is not None:
+        return result
+    result = await async_post_json(url, payload, timeout=timeout)
+    await sync_to_async(result_cache.set)(url, text, result, params)
+    return result
+
 
 def analyze_hate(content, user_id=None, platform=None, store_result=True):
     """
@@ -13,7 +342,7 @@ def analyze_hate(content, user_id=None, platform=None, store_result=True):
         platform (str, optional): The platform name.
         store_result (bool, optional): Whether to store the result.
     Returns:
-        dict: The model's response or error info.
+        dict: The model's response or error info ("retry_after" is set while the circuit is open).
     """
     payload = {
         "text": content,
@@ -23,15 +352,11 @@ def analyze_hate(content, user_id=None, platform=None, store_result=True):
         payload["user_id"] = user_id
     if platform:
         payload["platform"] = platform
-    print(f"[analyze_hate] Sending payload: {payload}")  # Debug print
+    logger.debug("[analyze_hate] Sending payload: %s", payload)
     try:
-        response = requests.post(
-            MODEL_BASE_URL + HATE_ANALYZE_ENDPOINT,
-            json=payload,
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
+        return analyze_text(model_url(HATE_ANALYZE_ENDPOINT), payload)
+    except CircuitOpenError as e:
+        return {"error": str(e), "retry_after": e.retry_after}
     except Exception as e:
         return {"error": str(e)}
 
@@ -41,19 +366,135 @@ def analyze_misinformation(content):
     Args:
         content (str): The text/content to analyze.
     Returns:
-        dict: The model's response or error info.
+        dict: The model's response or error info ("retry_after" is set while the circuit is open).
     """
     payload = {
         "text": content
     }
-    print(f"[analyze_misinformation] Sending payload: {payload}")  # Debug print
+    logger.debug("[analyze_misinformation] Sending payload: %s", payload)
     try:
-        response = requests.post(
-            MODEL_BASE_URL + MISINFORMATION_ANALYZE_ENDPOINT,
-            json=payload,
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
+        return analyze_text(model_url(MISINFORMATION_ANALYZE_ENDPOINT), payload)
+    except CircuitOpenError as e:
+        return {"error": str(e), "retry_after": e.retry_after}
     except Exception as e:
         return {"error": str(e)}
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _post_batch(batch_endpoint, chunk, extra_payload):
+    """
+    Send one chunk of texts to a batch route.
+    Returns the list of results aligned to ``chunk``, or None if the server
+    has no batch route (the caller then falls back to single calls).
+    """
+    payload = {"texts": chunk, **extra_payload}
+    try:
+        response = post_json(model_url(batch_endpoint), payload)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in BATCH_UNSUPPORTED_STATUS_CODES:
+            logger.info("Batch route %s not supported, using single calls", batch_endpoint)
+            _batch_route_supported[batch_endpoint] = False
+            return None
+        return [{"error": str(e)} for _ in chunk]
+    except Exception as e:
+        return [{"error": str(e)} for _ in chunk]
+
+    results = response.get("results") if isinstance(response, dict) else response
+    if not isinstance(results, list) or len(results) != len(chunk):
+        logger.warning("Batch route %s returned a malformed response, using single calls", batch_endpoint)
+        return None
+    return results
+
+
+def _analyze_batch(texts, endpoint, batch_endpoint, extra_payload, batch_size, concurrency):
+    """
+    Analyze ``texts`` in chunks of ``batch_size``, one request per chunk when the
+    server supports ``batch_endpoint``, otherwise with at most ``concurrency``
+    single calls to ``endpoint`` in flight. Cached texts and duplicates within
+    ``texts`` are only sent once. Results are aligned to ``texts``.
+    """
+    texts = list(texts)
+    batch_size = batch_size or getattr(settings, 'MODEL_API_BATCH_SIZE', 32)
+    concurrency = concurrency or getattr(settings, 'MODEL_API_BATCH_CONCURRENCY', 8)
+    url = model_url(endpoint)
+
+    results = [None] * len(texts)
+    pending = {}  # cache key -> indexes of the texts sharing it
+    for index, text in enumerate(texts):
+        cached = result_cache.get(url, text, extra_payload)
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.setdefault(result_cache.make_key(url, text, extra_payload), []).append(index)
+    if not pending:
+        return results
+
+    def single_call(text):
+        try:
+            return post_json(url, {"text": text, **extra_payload})
+        except Exception as e:
+            return {"error": str(e)}
+
+    unique_texts = [texts[indexes[0]] for indexes in pending.values()]
+    fetched = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for chunk in _chunks(unique_texts, batch_size):
+            chunk_results = None
+            if _batch_route_supported.get(batch_endpoint, True):
+                chunk_results = _post_batch(batch_endpoint, chunk, extra_payload)
+            if chunk_results is None:
+                chunk_results = list(executor.map(single_call, chunk))
+            fetched.extend(chunk_results)
+
+    for indexes, text, result in zip(pending.values(), unique_texts, fetched):
+        result_cache.set(url, text, result, extra_payload)
+        for index in indexes:
+            results[index] = result
+    return results
+
+
+def analyze_hate_batch(texts, store_result=True, batch_size=None, concurrency=None):
+    """
+    Sends many texts to the hate analysis model.
+    Args:
+        texts (iterable of str): The texts to analyze.
+        store_result (bool, optional): Whether to store the results.
+        batch_size (int, optional): Texts per request (default: MODEL_API_BATCH_SIZE).
+        concurrency (int, optional): Max single calls in flight when the server has
+            no batch route (default: MODEL_API_BATCH_CONCURRENCY).
+    Returns:
+        list of dict: One response or error info per input text, in input order.
+    """
+    return _analyze_batch(
+        texts,
+        HATE_ANALYZE_ENDPOINT,
+        HATE_ANALYZE_BATCH_ENDPOINT,
+        {"store_result": store_result},
+        batch_size,
+        concurrency,
+    )
+
+
+def analyze_misinformation_batch(texts, batch_size=None, concurrency=None):
+    """
+    Sends many texts to the misinformation analysis model.
+    Args:
+        texts (iterable of str): The texts to analyze.
+        batch_size (int, optional): Texts per request (default: MODEL_API_BATCH_SIZE).
+        concurrency (int, optional): Max single calls in flight when the server has
+            no batch route (default: MODEL_API_BATCH_CONCURRENCY).
+    Returns:
+        list of dict: One response or error info per input text, in input order.
+    """
+    return _analyze_batch(
+        texts,
+        MISINFORMATION_ANALYZE_ENDPOINT,
+        MISINFORMATION_ANALYZE_BATCH_ENDPOINT,
+        {},
+        batch_size,
+        concurrency,
+    )
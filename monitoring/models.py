@@ -4,6 +4,12 @@ from django.utils import timezone
 
 User._meta.get_field('email')._unique = True
 
+def normalize_platform(name):
+    """
+    Platform/source names are matched case-insensitively; they are indexed lowercase and stripped.
+    """
+    return (name or '').strip().lower()
+
 class Alert(models.Model):
     SEVERITY_CHOICES = [
         ('low', 'Low'),
@@ -24,10 +30,24 @@ class Alert(models.Model):
     severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     source = models.CharField(max_length=100)
+    platform_key = models.CharField(max_length=100, blank=True, editable=False)  # normalize_platform(source)
     location = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['platform_key', 'created_at']),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.platform_key = normalize_platform(self.source)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'source' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'platform_key'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.title} - {self.severity}"
@@ -156,6 +176,10 @@ class FacebookPost(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['-timestamp', '-id'], name='fbpost_timestamp_id_desc'),
+        ]
     
     def __str__(self):
         return f"{self.owner_username} - {self.post_id}"
@@ -181,6 +205,9 @@ class ContentModelAnalysis(models.Model):
             models.Index(fields=['analysis_type']),
             models.Index(fields=['is_harmful']),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'analysis_type'], name='unique_post_analysis_type'),
+        ]
     
     def __str__(self):
         return f"{self.analysis_type} analysis for post {self.post.post_id}"
@@ -194,3 +221,79 @@ class RegisteredPlatform(models.Model):
     def __str__(self):
         return self.display_name or self.name
 
+
+class AnalysisJob(models.Model):
+    """
+    Queued model analysis for a FacebookPost, drained by the run_analysis_workers command
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    post = models.ForeignKey(FacebookPost, on_delete=models.CASCADE, related_name='analysis_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # not picked up before this time
+    locked_at = models.DateTimeField(null=True, blank=True)  # when a worker claimed the job
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['available_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"Analysis job for post {self.post_id} - {self.status}"
+
+class MetricRollup(models.Model):
+    """
+    Hourly pre-aggregated counters read by the dashboard endpoints.
+    Kept current by monitoring.rollups as posts, alerts and analyses are written;
+    rebuild with `python manage.py rebuild_rollups`.
+    """
+    METRIC_CHOICES = [
+        ('posts', 'Posts'),
+        ('alerts', 'Alerts'),
+        ('active_alerts', 'Active Alerts'),
+        ('hate', 'Hate Speech Analyses'),
+        ('misinformation', 'Misinformation Analyses'),
+    ]
+
+    hour = models.DateTimeField()  # start of the hour bucket
+    platform = models.CharField(max_length=100, blank=True)  # normalized (lowercase) platform/source
+    region = models.CharField(max_length=200, blank=True)
+    metric = models.CharField(max_length=50, choices=METRIC_CHOICES)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'platform', 'region', 'metric'], name='unique_metric_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.hour:%Y-%m-%d %H:00} {self.platform} {self.region}: {self.value}"
+
+
+class FeedCursor(models.Model):
+    """
+    Resume point of an external post feed (e.g. Data365), kept between fetch runs
+    """
+    source = models.CharField(max_length=100, unique=True)
+    cursor = models.TextField(blank=True)  # page cursor of an interrupted run
+    high_water_mark = models.BigIntegerField(default=0)  # newest post timestamp of the last completed run
+    run_high_water_mark = models.BigIntegerField(default=0)  # newest post timestamp seen by the current run
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.high_water_mark}"
@@ -0,0 +1,212 @@
+"""
+Keyset (cursor) pagination for large, append-heavy tables.
+
+Pages are selected with a WHERE clause on the last row seen instead of an
+OFFSET, so with a matching composite index every page costs the same as the
+first one. Totals are only computed on request (``?count=exact`` or
+``?count=estimated``); estimated counts come from the Postgres planner.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError as BadRequest
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+def estimated_count(queryset):
+    """
+    Row count estimated by the query planner, without running COUNT(*).
+    Falls back to an exact count on backends without planner estimates (SQLite).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering``, whose last field must be unique.
+    """
+    ordering = ('-id',)
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    default_count = None  # None, 'exact' or 'estimated'
+    offset_query_param = None  # legacy ?offset= support, for endpoints that used to take one
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (ValueError, binascii.Error, UnicodeEncodeError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        return position
+
+    def get_offset(self, request):
+        """
+        The legacy ?offset= of a request without a cursor, or None. Offset pages
+        cost O(offset); they return a next_cursor so clients can switch over.
+        """
+        if not self.offset_query_param or self.cursor_query_param in request.query_params:
+            return None
+        value = request.query_params.get(self.offset_query_param)
+        if value in (None, ''):
+            return None
+        try:
+            offset = int(value)
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise BadRequest({self.offset_query_param: (
+                f"Must be a non-negative integer; prefer ?{self.cursor_query_param}= from next_cursor"
+            )})
+        return offset
+
+    def clean_position(self, model, position):
+        """
+        The cursor values converted by their model fields; a decodable cursor
+        with values of the wrong type is as invalid as an undecodable one.
+        """
+        cleaned = []
+        for field_name, value in zip(self.ordering, position):
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound('Invalid cursor')
+            try:
+                field = model._meta.get_field(field_name.lstrip('-'))
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (ValidationError, FieldDoesNotExist, TypeError, ValueError, OverflowError):
+                raise NotFound('Invalid cursor')
+            cleaned.append(value)
+        return cleaned
+
+    def position_of(self, obj):
+        # Datetimes keep their microseconds (clean_position() parses the string back)
+        return [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value
+            for value in (getattr(obj, field.lstrip('-')) for field in self.ordering)
+        ]
+
+    def after(self, position):
+        """
+        Rows strictly after ``position``: (a, b) < (x, y) expanded to
+        a < x OR (a = x AND b < y) for descending fields.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = f'{name}__lt' if field.startswith('-') else f'{name}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, self.default_count)
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimated':
+            return estimated_count(queryset)
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        offset = self.get_offset(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            position = self.clean_position(queryset.model, position)
+        self.total_count = self.get_count(queryset, request)
+
+        queryset = queryset.order_by(*self.ordering)
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred:
+            # .only() querysets must still load the cursor fields
+            queryset = queryset.only(*loaded, *(field.lstrip('-') for field in self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        elif offset:
+            queryset = queryset[offset:]
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(self.position_of(rows[-1])) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        }
+        if self.total_count is not None:
+            payload['count'] = self.total_count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+class FacebookPostPagination(KeysetPagination):
+    """Newest posts first; id breaks ties between posts with the same timestamp."""
+    ordering = ('-timestamp', '-id')
+
+
+class ReportPagination(KeysetPagination):
+    """Newest suspicious content reports first (date_reported index); id breaks ties."""
+    ordering = ('-date_reported', '-id')
+    page_size = 50
+    max_page_size = 500
+
+
+class SavedPostsPagination(FacebookPostPagination):
+    """facebook_saved_posts keeps its old limits and ?offset= and always reports a (cheap) total."""
+    page_size = 10
+    max_page_size = 50
+    default_count = 'estimated'
+    offset_query_param = 'offset'
@@ -0,0 +1,340 @@
+"""
+Post sources of the Facebook API views: the local dataset (monitoring/data)
+or the Data365 feed, behind the PostSource interface. Every backend keeps a
+post id index and a sampling array, so lookups are dict hits and random
+samples cost O(k) whichever backend is active (see post_source()).
+
+Two dataset file formats are supported, picked by extension:
+
+* ``.json``: Data365 format, ``{"cameroon_posts": [...]}``. The file is
+  parsed once per process and kept, with a post id index, until its mtime or
+  size changes.
+* ``.ndjson`` / ``.jsonl``: one post per line, for datasets too large to parse
+  on a request. The file is memory-mapped and indexed by line offsets and post
+  id, so a lookup or a random sample only decodes the lines it returns.
+  Convert a JSON file with ``jq -c '.cameroon_posts[]' in.json > out.ndjson``.
+
+Posts are returned as copies: callers are free to modify them.
+"""
+import abc
+import copy
+import json
+import logging
+import mmap
+import os
+import random
+import re
+import threading
+import time
+from array import array
+
+import requests
+
+from . import data365_config as conf
+from .data365 import Data365Client
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Candidate post ids of an NDJSON line: every "id" key, nested ones included,
+# so matches are confirmed on the decoded post
+_ID_RE = re.compile(rb'"id"\s*:\s*(?:"((?:[^"\\]|\\.)*)"|(-?\d+))')
+
+
+def _id_key(quoted, numeric):
+    """The decoded id of an _ID_RE match: string ids may hold escapes (\\/, \\uXXXX)."""
+    if numeric:
+        return numeric.decode('ascii')
+    try:
+        return json.loads(b'"' + quoted + b'"')
+    except ValueError:
+        return quoted.decode('utf-8', 'replace')
+
+
+class PostSource(abc.ABC):
+    """
+    Interface of the post backends: len(), iteration, get() by post id and sample().
+    """
+
+    @abc.abstractmethod
+    def __len__(self):
+        pass
+
+    @abc.abstractmethod
+    def __iter__(self):
+        pass
+
+    @abc.abstractmethod
+    def get(self, post_id):
+        """The post with id ``post_id``, or None."""
+
+    @abc.abstractmethod
+    def sample(self, k):
+        """Up to ``k`` distinct random posts."""
+
+
+class JSONPostFile(PostSource):
+    """Posts of a Data365-format JSON file, parsed once."""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            self.posts = json.load(file)['cameroon_posts']
+        self.by_id = {str(post.get('id')): post for post in self.posts}
+
+    def __len__(self):
+        return len(self.posts)
+
+    def get(self, post_id):
+        post = self.by_id.get(str(post_id))
+        return copy.deepcopy(post) if post is not None else None
+
+    def sample(self, k):
+        return copy.deepcopy(random.sample(self.posts, min(k, len(self.posts))))
+
+    def __iter__(self):
+        for post in self.posts:
+            yield copy.deepcopy(post)
+
+    def close(self):
+        pass
+
+
+class NDJSONPostFile(PostSource):
+    """
+    Posts of a newline-delimited JSON file, read through a memory map.
+    Building the index scans the file once for line boundaries and ids; posts
+    are only decoded when returned.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._map = b''
+        self.starts = array('q')
+        self.ends = array('q')
+        self.by_id = {}
+        self._index()
+
+    def _index(self):
+        data = self._map
+        size = len(data)
+        position = 0
+        while position < size:
+            end = data.find(b'\n', position)
+            if end < 0:
+                end = size
+            line = data[position:end]
+            if line.strip():
+                number = len(self.starts)
+                self.starts.append(position)
+                self.ends.append(end)
+                for quoted, numeric in _ID_RE.findall(line):
+                    self.by_id.setdefault(_id_key(quoted, numeric), []).append(number)
+            position = end + 1
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line(self, number):
+        """Decode the post on (non-empty) line ``number``."""
+        return json.loads(self._map[self.starts[number]:self.ends[number]])
+
+    def get(self, post_id):
+        post_id = str(post_id)
+        for number in self.by_id.get(post_id, ()):
+            post = self.line(number)
+            if str(post.get('id')) == post_id:
+                return post
+        return None
+
+    def sample(self, k):
+        """Up to ``k`` distinct random posts; only the sampled lines are decoded."""
+        numbers = random.sample(range(len(self)), min(k, len(self)))
+        return [self.line(number) for number in numbers]
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.line(number)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+_lock = threading.Lock()
+_loaded = {}  # path -> ((mtime_ns, size), post file)
+
+
+def data_file_path(name=None):
+    """Path of a dataset file; relative names are looked up in monitoring/data."""
+    return os.path.join(DATA_DIR, name or conf.JSON_DATA_FILE)
+
+
+def open_post_file(path):
+    if path.lower().endswith(NDJSON_EXTENSIONS):
+        return NDJSONPostFile(path)
+    return JSONPostFile(path)
+
+
+def post_file(name=None):
+    """
+    The loaded dataset, reloaded when the file changes on disk.
+    Args:
+        name (str, optional): File name or path (default: JSON_DATA_FILE).
+    Returns:
+        JSONPostFile or NDJSONPostFile, or None if the file does not exist.
+    Raises:
+        ValueError: The file is not a valid dataset.
+    """
+    path = data_file_path(name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    with _lock:
+        cached = _loaded.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        try:
+            loaded = open_post_file(path)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{path} is not a Data365 posts file: {e}")
+        _loaded[path] = (signature, loaded)
+        logger.info("Loaded %s posts from %s", len(loaded), path)
+    # The replaced file is closed by garbage collection once no request still uses it
+    return loaded
+
+
+class FilePostSource(PostSource):
+    """The JSON or NDJSON dataset file, reopened when it changes on disk (see post_file())."""
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def current(self):
+        """The loaded file, or None if it is missing or unreadable."""
+        try:
+            return post_file(self.name)
+        except (OSError, ValueError) as e:
+            logger.error("Error loading Facebook data: %s", e)
+            return None
+
+    def __len__(self):
+        posts = self.current()
+        return len(posts) if posts is not None else 0
+
+    def __iter__(self):
+        return iter(self.current() or ())
+
+    def get(self, post_id):
+        posts = self.current()
+        return posts.get(post_id) if posts is not None else None
+
+    def sample(self, k):
+        posts = self.current()
+        return posts.sample(k) if posts is not None else []
+
+
+class Data365PostSource(PostSource):
+    """
+    Newest page of the Data365 feed, indexed like the files and kept for
+    CACHE_DURATION_MINUTES (refetched on every use if CACHE_FACEBOOK_POSTS is off).
+    One caller at a time refetches an expired page; the others keep being
+    served the previous page meanwhile, instead of waiting on the fetch.
+    Before the first page is fetched they wait for it, for at most
+    ``wait_timeout`` seconds, then get an empty page.
+    Args:
+        client (Data365Client, optional): Feed client (default: one with the configured limits).
+        ttl (float, optional): Seconds a fetched page is served for.
+        wait_timeout (float, optional): Seconds to wait for the first page (default: the client's timeout).
+    """
+    # Wait before fetching again after a failed request
+    RETRY_SECONDS = 60
+
+    def __init__(self, client=None, ttl=None, wait_timeout=None, clock=time.monotonic):
+        self.client = client or Data365Client()
+        if ttl is None:
+            ttl = conf.CACHE_DURATION_MINUTES * 60 if conf.CACHE_FACEBOOK_POSTS else 0
+        self.ttl = ttl
+        if wait_timeout is None:
+            wait_timeout = getattr(self.client, 'timeout', None) or conf.DATA365_TIMEOUT
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+        # (posts, post id index), replaced as a whole so readers never see a mix
+        self._current = ([], {})
+        self._expires = None
+        self._refreshing = False
+        self._fetched = threading.Event()
+        self._lock = threading.Lock()
+
+    def _page(self):
+        with self._lock:
+            refresh = not self._refreshing and (self._expires is None or self.clock() >= self._expires)
+            if refresh:
+                self._refreshing = True
+        if refresh:
+            self._refresh()
+        elif not self._fetched.wait(self.wait_timeout):
+            # The first fetch is stalled (rate limiter, slow upstream): do not hold up the request
+            logger.warning("No Data365 page after %ss, serving an empty one", self.wait_timeout)
+        return self._current
+
+    def _refresh(self):
+        expires = None
+        try:
+            posts, _ = self.client.fetch_page()
+        except requests.RequestException as e:
+            # Keep serving the previous page rather than retrying on every request
+            logger.error("Error fetching Data365 posts: %s", e)
+            expires = self.clock() + min(self.ttl, self.RETRY_SECONDS)
+        else:
+            self._current = (posts, {str(post.get('id')): post for post in posts})
+            expires = self.clock() + self.ttl
+        finally:
+            with self._lock:
+                self._expires = expires
+                self._refreshing = False
+            self._fetched.set()
+
+    def __len__(self):
+        return len(self._page()[0])
+
+    def __iter__(self):
+        posts, _ = self._page()
+        for post in posts:
+            yield copy.deepcopy(post)
+
+    def get(self, post_id):
+        post = self._page()[1].get(str(post_id))
+        return copy.deepcopy(post) if post is not None else None
+
+    def sample(self, k):
+        posts, _ = self._page()
+        return copy.deepcopy(random.sample(posts, min(k, len(posts))))
+
+
+_source = None
+
+
+def post_source():
+    """
+    The process-wide PostSource: the dataset file while USE_JSON_DATA_SOURCE
+    is set, the Data365 feed (sharing one rate limiter) otherwise.
+    """
+    global _source
+    if _source is None:
+        with _lock:
+            if _source is None:
+                _source = FilePostSource() if conf.USE_JSON_DATA_SOURCE else Data365PostSource()
+    return _source
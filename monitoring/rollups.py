@@ -0,0 +1,242 @@
+"""
+Incremental maintenance of the hourly MetricRollup table.
+
+Every Alert, ContentModelAnalysis and FacebookPost write adds (or removes) its
+contribution to the (hour, platform, region, metric) counter it belongs to, so
+the dashboard endpoints can read a few hundred rollup rows instead of scanning
+the raw tables. Writes that bypass model signals (bulk_create, queryset.update)
+must call the record_* helpers themselves; rebuild() recomputes from scratch.
+
+Inside a transaction, contributions are summed and applied when it commits
+(and dropped if it rolls back), so deleting many posts with their analyses
+costs one UPDATE per rollup row rather than one per object. Analyses whose
+post is not loaded (cascade deletes) are resolved to their platform then, in
+one query, or from the posts deleted in the same transaction.
+"""
+import threading
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Lower, Trim, TruncHour
+
+from .models import Alert, ContentModelAnalysis, FacebookPost, MetricRollup, normalize_platform
+
+ACTIVE_ALERT_STATUSES = ('new', 'in_progress')
+ANALYSIS_METRICS = ('hate', 'misinformation')
+
+
+def hour_bucket(when):
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def increment(metric, hour, platform='', region='', amount=1):
+    """
+    Add ``amount`` (which may be negative) to one rollup counter.
+    """
+    key = {'hour': hour, 'platform': platform, 'region': region, 'metric': metric}
+    if MetricRollup.objects.filter(**key).update(value=F('value') + amount):
+        return
+    try:
+        with transaction.atomic():
+            MetricRollup.objects.create(value=amount, **key)
+    except IntegrityError:
+        # Created concurrently by another writer
+        MetricRollup.objects.filter(**key).update(value=F('value') + amount)
+
+
+def apply_counts(counts):
+    """
+    Apply a Counter of (metric, hour, platform, region) -> amount.
+    """
+    for (metric, hour, platform, region), amount in counts.items():
+        if amount:
+            increment(metric, hour, platform, region, amount)
+
+
+def _post_counts_by_platform(post_counts, platforms):
+    """
+    Turn (metric, hour, post_id) -> amount counts into rollup counts, looking
+    up the platforms missing from ``platforms`` (post_id -> platform).
+    Posts that no longer exist are skipped (rebuild() recounts them).
+    """
+    missing = {post_id for _, _, post_id in post_counts} - set(platforms)
+    if missing:
+        platforms = {**platforms, **dict(FacebookPost.objects.filter(pk__in=missing).values_list('pk', 'platform'))}
+    counts = Counter()
+    for (metric, hour, post_id), amount in post_counts.items():
+        if post_id in platforms:
+            counts[(metric, hour, normalize_platform(platforms[post_id]), '')] += amount
+    return counts
+
+
+class _Batch:
+    """Rollup contributions of one transaction (or savepoint), applied when it commits."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.savepoint_ids = list(connection.savepoint_ids)
+        self.counts = Counter()
+        # (metric, hour, post_id) -> amount, of analyses whose post was not loaded
+        self.post_counts = Counter()
+        # post_id -> platform, of the posts deleted in the transaction
+        self.platforms = {}
+
+    def is_pending(self, connection):
+        """Whether more contributions can join: same savepoint, not discarded by a rollback."""
+        return (
+            connection is self.connection
+            and connection.savepoint_ids == self.savepoint_ids
+            and any(entry[1] == self.apply for entry in connection.run_on_commit)
+        )
+
+    def apply(self):
+        counts = Counter(self.counts)
+        counts.update(_post_counts_by_platform(self.post_counts, self.platforms))
+        with transaction.atomic():
+            apply_counts(counts)
+
+
+_local = threading.local()
+
+
+def _current_batch():
+    """The batch of the running transaction, or None in autocommit mode."""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    batch = getattr(_local, 'batch', None)
+    if batch is None or not batch.is_pending(connection):
+        batch = _local.batch = _Batch(connection)
+        # The data is committed by then: a failed rollup update is logged, not raised
+        transaction.on_commit(batch.apply, robust=True)
+    return batch
+
+
+def add_counts(counts, post_counts=None):
+    """
+    Apply rollup counts, and (metric, hour, post_id) -> amount ``post_counts``,
+    when the running transaction commits (at once outside a transaction).
+    """
+    batch = _current_batch()
+    if batch is None:
+        counts = Counter(counts)
+        if post_counts:
+            counts.update(_post_counts_by_platform(post_counts, {}))
+        apply_counts(counts)
+        return
+    batch.counts.update(counts)
+    if post_counts:
+        batch.post_counts.update(post_counts)
+
+
+def remember_deleted_posts(posts):
+    """
+    Keep the platform of posts about to be deleted, for their analyses deleted
+    with them (whose rollups are only applied after the posts are gone).
+    """
+    batch = _current_batch()
+    if batch is not None:
+        batch.platforms.update((post.pk, post.platform) for post in posts)
+
+
+def alert_contributions(hour, source, location, status):
+    """The rollup keys an alert with these attributes counts towards."""
+    platform = normalize_platform(source)
+    region = location or ''
+    keys = [('alerts', hour_bucket(hour), platform, region)]
+    if status in ACTIVE_ALERT_STATUSES:
+        keys.append(('active_alerts', hour_bucket(hour), platform, region))
+    return keys
+
+
+def record_alerts(alerts, sign=1):
+    counts = Counter()
+    for alert in alerts:
+        for key in alert_contributions(alert.created_at, alert.source, alert.location, alert.status):
+            counts[key] += sign
+    add_counts(counts)
+
+
+def record_analyses(analyses, sign=1):
+    counts = Counter()
+    post_counts = Counter()
+    for analysis in analyses:
+        if analysis.analysis_type not in ANALYSIS_METRICS:
+            continue
+        hour = hour_bucket(analysis.created_at)
+        if ContentModelAnalysis.post.is_cached(analysis):
+            counts[(analysis.analysis_type, hour, normalize_platform(analysis.post.platform), '')] += sign
+        else:
+            post_counts[(analysis.analysis_type, hour, analysis.post_id)] += sign
+    add_counts(counts, post_counts)
+
+
+def record_posts(posts, sign=1):
+    counts = Counter()
+    for post in posts:
+        counts[('posts', hour_bucket(post.created_at), normalize_platform(post.platform), '')] += sign
+    add_counts(counts)
+
+
+def rebuild(since=None):
+    """
+    Recompute the rollup rows from the raw tables, for hours >= ``since``
+    (all hours if None). Returns the number of rollup rows written.
+    Migration 0010 holds a copy of this (monitoring.tests keeps them in step).
+    """
+    since = hour_bucket(since) if since else None
+    time_filter = Q(created_at__gte=since) if since else Q()
+
+    rows = []
+    alert_stats = (
+        Alert.objects.filter(time_filter)
+        .annotate(bucket=TruncHour('created_at'))
+        .values('bucket', 'platform_key', 'location')
+        .annotate(
+            alerts=Count('id'),
+            active_alerts=Count('id', filter=Q(status__in=ACTIVE_ALERT_STATUSES)),
+        )
+        .order_by()
+    )
+    for row in alert_stats:
+        for metric in ('alerts', 'active_alerts'):
+            if row[metric]:
+                rows.append(MetricRollup(
+                    hour=row['bucket'], platform=row['platform_key'], region=row['location'] or '',
+                    metric=metric, value=row[metric],
+                ))
+
+    analysis_stats = (
+        ContentModelAnalysis.objects.filter(time_filter, analysis_type__in=ANALYSIS_METRICS)
+        .annotate(bucket=TruncHour('created_at'), platform_name=Lower(Trim('post__platform')))
+        .values('bucket', 'platform_name', 'analysis_type')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in analysis_stats:
+        rows.append(MetricRollup(
+            hour=row['bucket'], platform=row['platform_name'], region='',
+            metric=row['analysis_type'], value=row['total'],
+        ))
+
+    post_stats = (
+        FacebookPost.objects.filter(time_filter)
+        .annotate(bucket=TruncHour('created_at'), platform_name=Lower(Trim('platform')))
+        .values('bucket', 'platform_name')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in post_stats:
+        rows.append(MetricRollup(
+            hour=row['bucket'], platform=row['platform_name'], region='',
+            metric='posts', value=row['total'],
+        ))
+
+    with transaction.atomic():
+        stale = MetricRollup.objects.all()
+        if since:
+            stale = stale.filter(hour__gte=since)
+        stale.delete()
+        MetricRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
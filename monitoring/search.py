@@ -0,0 +1,229 @@
+"""
+Full-text search over FacebookPost content and SuspiciousContentReport descriptions.
+
+Three backends, picked per database connection:
+
+* PostgreSQL: expression GIN indexes over ``to_tsvector`` with the English
+  and French configurations (content is bilingual), queried with
+  ``websearch_to_tsquery`` and ranked with ``ts_rank``.
+* SQLite: external-content FTS5 tables kept in sync by triggers, ranked with bm25.
+* Anything else (or SQLite without FTS5): ``icontains`` scans, unranked.
+
+The indexes, FTS tables and triggers are created by the vendor-conditional
+migration monitoring 0013 (a frozen copy of install()) and by install() from
+`manage.py rebuild_search_index`; the indexed SQL expressions and the
+queried ones come from the same functions.
+
+Ranks (ts_rank, bm25) are only comparable within one source: results of
+several sources are merged on relative_ranks().
+"""
+import logging
+
+from django.db import OperationalError, connections, router
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from reportsuspeciouscontent.models import SuspiciousContentReport
+
+from .models import FacebookPost
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIGS = ('english', 'french')
+
+# Deepest result the search endpoint pages to
+MAX_RESULTS = 1000
+
+# model -> (indexed text columns, FTS5 table)
+SEARCH_TARGETS = {
+    FacebookPost: (('text', 'overlay_text', 'attached_image_content'), 'monitoring_facebookpost_fts'),
+    SuspiciousContentReport: (('description',), 'suspicious_content_reports_fts'),
+}
+
+_fts_tables = {}  # (db alias, table) -> exists
+
+
+def document_sql(columns):
+    """The concatenated, NULL-safe document that is indexed for ``columns``."""
+    return " || ' ' || ".join(f"""coalesce("{column}", '')""" for column in columns)
+
+
+def vector_sql(config, columns):
+    return f"to_tsvector('{config}'::regconfig, {document_sql(columns)})"
+
+
+def gin_index_name(model, config):
+    return f"{model._meta.db_table}_search_{config}"
+
+
+def install(connection, model):
+    """
+    Create (if missing) and fill the search index of ``model``: GIN expression
+    indexes on PostgreSQL, an FTS5 table with sync triggers on SQLite.
+    Nothing is created on other databases.
+    """
+    columns, fts_table = SEARCH_TARGETS[model]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for config in SEARCH_CONFIGS:
+                # CONCURRENTLY needs autocommit: the migration is non-atomic
+                concurrently = 'CONCURRENTLY ' if not connection.in_atomic_block else ''
+                cursor.execute(
+                    f"CREATE INDEX {concurrently}IF NOT EXISTS {gin_index_name(model, config)} "
+                    f"ON {table} USING gin ({vector_sql(config, columns)})"
+                )
+        elif connection.vendor == 'sqlite':
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({column_list}, "
+                    f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+                )
+            except OperationalError as e:
+                logger.warning("SQLite without FTS5 (%s), search on %s falls back to icontains", e, table)
+                return
+            # Django rebuilds SQLite tables on ALTER, which drops triggers: always recreate them
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+            cursor.execute(
+                f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    _fts_tables.clear()
+
+
+def uninstall(connection, model):
+    """Drop the search index of ``model``."""
+    _, fts_table = SEARCH_TARGETS[model]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for config in SEARCH_CONFIGS:
+                cursor.execute(f"DROP INDEX IF EXISTS {gin_index_name(model, config)}")
+        elif connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+    _fts_tables.clear()
+
+
+def fts5_query(query):
+    """
+    Quote every term of a user query so FTS5 operators and punctuation are
+    matched literally; terms are ANDed.
+    """
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term.strip('"'))
+
+
+def backend(model):
+    """'postgres', 'fts5' or 'basic' for the database ``model`` is read from."""
+    alias = router.db_for_read(model)
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite':
+        table = SEARCH_TARGETS[model][1]
+        key = (alias, table)
+        if key not in _fts_tables:
+            _fts_tables[key] = table in connection.introspection.table_names()
+            if not _fts_tables[key]:
+                logger.warning("FTS5 table %s missing, search falls back to icontains", table)
+        if _fts_tables[key]:
+            return 'fts5'
+    return 'basic'
+
+
+def filter_queryset(queryset, query):
+    """Restrict ``queryset`` to rows matching ``query``."""
+    model = queryset.model
+    columns, fts_table = SEARCH_TARGETS[model]
+    engine = backend(model)
+    if engine == 'postgres':
+        match = ' OR '.join(
+            f"{vector_sql(config, columns)} @@ websearch_to_tsquery('{config}'::regconfig, %s)"
+            for config in SEARCH_CONFIGS
+        )
+        return queryset.filter(RawSQL(match, [query] * len(SEARCH_CONFIGS), output_field=BooleanField()))
+    if engine == 'fts5':
+        match = fts5_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s", [match]))
+    condition = Q()
+    for column in columns:
+        condition |= Q(**{f'{column}__icontains': query})
+    return queryset.filter(condition)
+
+
+def ranked_ids(model, query, limit, offset=0):
+    """
+    (pk, rank) pairs of the best matches for ``query``, best first; higher ranks are better.
+    """
+    columns, fts_table = SEARCH_TARGETS[model]
+    engine = backend(model)
+    if engine == 'fts5':
+        match = fts5_query(query)
+        if not match:
+            return []
+        sql = (
+            f"SELECT rowid, -bm25({fts_table}) FROM {fts_table} WHERE {fts_table} MATCH %s "
+            f"ORDER BY bm25({fts_table}), rowid DESC LIMIT %s OFFSET %s"
+        )
+        with connections[router.db_for_read(model)].cursor() as cursor:
+            cursor.execute(sql, [match, limit, offset])
+            return [(pk, rank) for pk, rank in cursor.fetchall()]
+
+    queryset = filter_queryset(model.objects.all(), query)
+    if engine == 'postgres':
+        rank = ' + '.join(
+            f"ts_rank({vector_sql(config, columns)}, websearch_to_tsquery('{config}'::regconfig, %s))"
+            for config in SEARCH_CONFIGS
+        )
+        queryset = queryset.annotate(
+            search_rank=RawSQL(rank, [query] * len(SEARCH_CONFIGS), output_field=FloatField())
+        ).order_by('-search_rank', '-pk')
+        return list(queryset.values_list('pk', 'search_rank')[offset:offset + limit])
+    return [(pk, 0.0) for pk in queryset.order_by('-pk').values_list('pk', flat=True)[offset:offset + limit]]
+
+
+def relative_ranks(pairs):
+    """
+    (item, rank) pairs with ranks scaled by the best rank among them, to 0-1.
+    The best match of each source is its first result, whatever the page, so
+    merging sources on relative ranks interleaves them consistently.
+    """
+    best = max((rank for _, rank in pairs), default=0)
+    return [(item, rank / best if best > 0 else 0.0) for item, rank in pairs]
+
+
+def search(model, query, limit, offset=0, only=None):
+    """
+    The best matches for ``query`` as (instance, rank) pairs, best first.
+    Args:
+        model: FacebookPost or SuspiciousContentReport.
+        query (str): Free-text query.
+        limit (int): Maximum number of results.
+        offset (int, optional): Number of best matches to skip.
+        only (iterable of str, optional): Fields to load.
+    Returns:
+        list of (instance, float) tuples.
+    """
+    pairs = ranked_ids(model, query, limit, offset)
+    queryset = model.objects.all()
+    if only:
+        queryset = queryset.only(*only)
+    instances = queryset.in_bulk([pk for pk, _ in pairs])
+    return [(instances[pk], rank) for pk, rank in pairs if pk in instances]
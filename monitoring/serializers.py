@@ -75,10 +75,62 @@ class UserSettingsSerializer(serializers.ModelSerializer):
         model = UserSettings
         fields = '__all__'
 
-class FacebookPostSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets: pass ``fields=[...]`` and/or
+    ``exclude=[...]`` to keep only some fields. Without ``fields`` the
+    serializer keeps ``default_fields`` (every field when None).
+    """
+    default_fields = None
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = fields if fields is not None else self.default_fields
+        if keep is not None and keep != '__all__':
+            for name in set(self.fields) - set(keep):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def fieldset_from_request(cls, request):
+        """
+        Field names selected by ``?fields=a,b`` and ``?exclude=c``; unknown names are ignored.
+        """
+        available = list(cls(fields='__all__').fields)
+        requested = request.query_params.get('fields')
+        if requested:
+            wanted = {name.strip() for name in requested.split(',')}
+            selected = [name for name in available if name in wanted]
+        elif cls.default_fields is not None:
+            selected = [name for name in available if name in cls.default_fields]
+        else:
+            selected = available
+        excluded = {name.strip() for name in request.query_params.get('exclude', '').split(',')}
+        return [name for name in selected if name not in excluded] or ['id']
+
+    @classmethod
+    def restrict_queryset(cls, queryset, fields):
+        """Load only the columns backing ``fields``."""
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        return queryset.only(*[name for name in fields if name in columns])
+
+class FacebookPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = FacebookPost
         fields = '__all__'
+
+class FacebookPostListSerializer(FacebookPostSerializer):
+    """
+    Compact post representation for the feed/list endpoints: no media arrays,
+    tagged users or attached image content. Any field can still be requested with ?fields=.
+    """
+    default_fields = (
+        'id', 'post_id', 'created_time', 'timestamp', 'post_type', 'text', 'text_lang',
+        'attached_link', 'attached_image_url', 'post_screenshot',
+        'reactions_total_count', 'comments_count', 'shares_count', 'video_view_count',
+        'owner_id', 'owner_username', 'owner_full_name', 'platform', 'created_at',
+    )
         
 class FacebookAPIResponseSerializer(serializers.Serializer):
     """
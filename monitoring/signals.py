@@ -0,0 +1,76 @@
+"""
+Signal handlers keeping the MetricRollup table in step with Alert,
+ContentModelAnalysis and FacebookPost writes.
+"""
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import rollups
+from .models import Alert, ContentModelAnalysis, FacebookPost
+
+
+@receiver(pre_save, sender=Alert)
+def remember_alert_rollup_keys(sender, instance, raw=False, **kwargs):
+    """Load the stored attributes of an alert being updated, to move its rollup contribution."""
+    instance._previous_rollup_keys = None
+    if raw or instance.pk is None:
+        return
+    previous = Alert.objects.filter(pk=instance.pk).values('created_at', 'source', 'location', 'status').first()
+    if previous:
+        instance._previous_rollup_keys = rollups.alert_contributions(
+            previous['created_at'], previous['source'], previous['location'], previous['status']
+        )
+
+
+@receiver(post_save, sender=Alert)
+def update_alert_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.record_alerts([instance])
+        return
+    previous_keys = getattr(instance, '_previous_rollup_keys', None)
+    if previous_keys is None:
+        return
+    current_keys = rollups.alert_contributions(instance.created_at, instance.source, instance.location, instance.status)
+    if previous_keys != current_keys:
+        counts = Counter()
+        for key in previous_keys:
+            counts[key] -= 1
+        for key in current_keys:
+            counts[key] += 1
+        rollups.add_counts(counts)
+
+
+@receiver(post_delete, sender=Alert)
+def remove_alert_rollups(sender, instance, **kwargs):
+    rollups.record_alerts([instance], sign=-1)
+
+
+@receiver(post_save, sender=ContentModelAnalysis)
+def update_analysis_rollups(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record_analyses([instance])
+
+
+@receiver(post_delete, sender=ContentModelAnalysis)
+def remove_analysis_rollups(sender, instance, **kwargs):
+    rollups.record_analyses([instance], sign=-1)
+
+
+@receiver(post_save, sender=FacebookPost)
+def update_post_rollups(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record_posts([instance])
+
+
+@receiver(pre_delete, sender=FacebookPost)
+def remember_deleted_post_platform(sender, instance, **kwargs):
+    rollups.remember_deleted_posts([instance])
+
+
+@receiver(post_delete, sender=FacebookPost)
+def remove_post_rollups(sender, instance, **kwargs):
+    rollups.record_posts([instance], sign=-1)
@@ -0,0 +1,509 @@
+"""
+Synthetic FacebookPost data for scale tests (see the generate_facebook_posts command).
+
+Posts look like the Data365 feed: bilingual (French, English, some Pidgin)
+Cameroon-style text with hashtags, photo/video/link attachments, heavy-tailed
+reaction, comment and share counts, active owners posting more than the rest,
+and an evening-heavy daily rhythm. Part of the posts are reposts (shares of a
+recent post) or copy-paste duplicates by other owners, with misinformation
+spreading further than the rest. Each post gets the hate and misinformation
+analyses the model API would return, and alerts are raised by the same rule as
+monitoring.analysis.
+
+Everything is drawn from one random.Random(seed), so a seed, count, window and
+end time always give the same rows. Rows are written with bulk_create in
+chunks; the dashboard rollups of the window are rebuilt afterwards, since bulk
+writes bypass the rollup signals.
+"""
+import logging
+import math
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import rollups
+from .analysis import ALERT_CONFIDENCE_THRESHOLD
+from .models import Alert, ContentModelAnalysis, FacebookPost, normalize_platform
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Seeds are part of the post ids (10 digits), so each seed gets its own ids
+SEED_SPACE = 10 ** 10
+
+CITIES = (
+    "Douala", "Yaoundé", "Bamenda", "Bafoussam", "Garoua", "Maroua", "Ngaoundéré",
+    "Kumba", "Buea", "Limbe", "Edea", "Kribi", "Bertoua", "Ebolowa", "Dschang",
+)
+GROUPS = ("Anglophones", "Francophones", "Bamileke", "separatists")
+DISEASES = ("paludisme", "choléra", "COVID", "Ebola")
+TOPICS_FR = ("l'éducation", "la santé", "les routes", "l'emploi des jeunes", "l'agriculture", "la sécurité")
+TOPICS_EN = ("education", "healthcare", "road works", "youth employment", "farming", "security")
+HASHTAGS = ("#Cameroun", "#Cameroon", "#237", "#Actu237", "#LionsIndomptables", "#Kamer", "#CMR")
+
+# Post categories: content of the template, drives the analyses
+NEUTRAL = 'neutral'
+HATE = 'hate'
+MISINFORMATION = 'misinformation'
+CATEGORY_WEIGHTS = {NEUTRAL: 0.80, MISINFORMATION: 0.12, HATE: 0.08}
+
+LANGUAGE_WEIGHTS = {'fr': 0.55, 'en': 0.38, 'pcm': 0.07}
+
+# (category, language) -> templates
+TEMPLATES = {
+    (NEUTRAL, 'fr'): (
+        "Grosse affluence au marché central de {city} ce matin.",
+        "Coupure d'électricité à {city} depuis {number} heures, quand est-ce que ça va finir ?",
+        "Félicitations aux nouveaux bacheliers de {city} ! Vous faites notre fierté.",
+        "Les travaux de la route {city}–{city2} avancent enfin, bravo aux équipes.",
+        "Ce soir les Lions Indomptables jouent, tout {city} sera devant les écrans !",
+        "Réunion publique à {city} sur {topic} samedi prochain, venez nombreux.",
+        "Le prix du plantain a encore augmenté au marché de {city}, {number}00 FCFA le régime.",
+    ),
+    (NEUTRAL, 'en'): (
+        "Heavy rain in {city} today, roads near the market are flooded.",
+        "Proud of the young entrepreneurs at the {city} tech hub this weekend!",
+        "Traffic is terrible on the way into {city} again this morning.",
+        "Our Indomitable Lions play tonight, who is watching from {city}?",
+        "Town hall meeting in {city} about {topic} next Saturday, please share.",
+        "Beautiful sunset over Mount Cameroon from {city} this evening.",
+    ),
+    (NEUTRAL, 'pcm'): (
+        "Na wa for this {city} traffic oh!",
+        "Wuna don hear say light don come back for {city}?",
+        "Dis rain for {city} no di gree person waka today.",
+    ),
+    (MISINFORMATION, 'fr'): (
+        "URGENT : le gouvernement va couper internet dans tout le pays demain. Partagez avant qu'il ne soit trop tard !",
+        "Un remède miracle contre le {disease} découvert à {city}, les médecins le cachent !",
+        "On nous ment : les résultats des élections sont déjà décidés, voici le document secret.",
+        "Attention ! L'eau du robinet à {city} est empoisonnée, ne la buvez surtout pas.",
+    ),
+    (MISINFORMATION, 'en'): (
+        "BREAKING: the vaccines distributed in {city} contain microchips. Share this!",
+        "Leaked document proves the election results were decided months ago.",
+        "Doctors won't tell you this: drinking hot water with lemon cures {disease} in 3 days.",
+        "The army is closing all roads out of {city} tonight, stock food now!",
+    ),
+    (MISINFORMATION, 'pcm'): (
+        "Dem don poison water for {city}, no drink am oh! Share am make people know.",
+    ),
+    (HATE, 'fr'): (
+        "Les {group} détruisent notre nation, il faut agir avant qu'il ne soit trop tard !",
+        "Ces {group} n'ont rien à faire à {city}, qu'ils rentrent chez eux.",
+    ),
+    (HATE, 'en'): (
+        "{group} are destroying our nation with their agenda.",
+        "{group} don't belong in {city}, they should all leave!",
+    ),
+    (HATE, 'pcm'): (
+        "Dis {group} dem no get place for {city}!",
+    ),
+}
+REPOST_COMMENTS = ("", "", "Voyez ça 👇 ", "Is this true? ", "Partagez ! ", "Wuna see dis? ", "Incroyable... ")
+
+POST_TYPE_WEIGHTS = {'status': 0.45, 'photo': 0.35, 'video': 0.12, 'link': 0.08}
+
+# Share of posts that repost or duplicate a recent post
+REPOST_RATE = 0.12
+DUPLICATE_RATE = 0.06
+# Recent originals that can be reposted; misinformation is entered more often
+RECENT_POSTS = 2000
+
+# Posting activity per local (UTC+1) hour, evening-heavy
+HOUR_WEIGHTS = (
+    1, 0.6, 0.4, 0.3, 0.3, 0.6, 1.5, 3, 4, 4, 4, 4.5,
+    5, 5, 4.5, 4.5, 5, 5.5, 6.5, 8, 8.5, 7.5, 5, 2.5,
+)
+UTC_OFFSET_HOURS = 1
+
+# reaction -> share of reactions, per post category
+REACTION_SHARES = {
+    NEUTRAL: {'like': 0.62, 'love': 0.16, 'haha': 0.05, 'wow': 0.04, 'sad': 0.03, 'angry': 0.02, 'support': 0.08},
+    MISINFORMATION: {'like': 0.40, 'love': 0.04, 'haha': 0.08, 'wow': 0.20, 'sad': 0.10, 'angry': 0.15, 'support': 0.03},
+    HATE: {'like': 0.45, 'love': 0.03, 'haha': 0.12, 'wow': 0.05, 'sad': 0.05, 'angry': 0.28, 'support': 0.02},
+}
+# (log-normal mu, sigma) of the reaction total and the shares/reactions ratio, per category
+REACTION_TOTAL = {NEUTRAL: (2.5, 1.5), MISINFORMATION: (3.5, 1.7), HATE: (3.0, 1.5)}
+SHARE_RATIO = {NEUTRAL: (-2.5, 1.0), MISINFORMATION: (-0.8, 1.0), HATE: (-1.5, 1.0)}
+
+FIRST_NAMES = (
+    "Jean", "Marie", "Paul", "Aïcha", "Ibrahim", "Brenda", "Emmanuel", "Fatima", "Joseph",
+    "Nadège", "Samuel", "Christelle", "Hamadou", "Grace", "Boris", "Clarisse", "Ousmane", "Linda",
+)
+LAST_NAMES = (
+    "Mbarga", "Nkoulou", "Fotso", "Tchoumi", "Ndongo", "Ewane", "Abena", "Bello", "Njoya",
+    "Atangana", "Kamga", "Mballa", "Tabi", "Ngassa", "Fouda", "Essomba", "Ayuk", "Manga",
+)
+PAGE_NAMES = ("Infos", "Actu", "Buzz", "News", "Direct", "TV", "Le Quotidien")
+
+SEVERITY_WEIGHTS = {'low': 0.2, 'medium': 0.4, 'high': 0.4}
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create keep the auto_now/auto_now_add values set on the objects
+    of ``models``, which are otherwise overwritten with the current time. The
+    fields are changed process-wide: only use it in management commands.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _distribution(weights):
+    """(values, cumulative weights) of a value -> weight mapping, for _draw()."""
+    return tuple(weights), tuple(accumulate(weights.values()))
+
+
+def _draw(rng, distribution):
+    values, cum_weights = distribution
+    return rng.choices(values, cum_weights=cum_weights)[0]
+
+
+_HOURS = _distribution(dict(enumerate(HOUR_WEIGHTS)))
+_CATEGORIES = _distribution(CATEGORY_WEIGHTS)
+_LANGUAGES = _distribution(LANGUAGE_WEIGHTS)
+_POST_TYPES = _distribution(POST_TYPE_WEIGHTS)
+_SEVERITIES = _distribution(SEVERITY_WEIGHTS)
+
+
+def _lognormal_int(rng, mu, sigma, cap=5_000_000):
+    return min(int(rng.lognormvariate(mu, sigma)), cap)
+
+
+def id_prefix(seed):
+    return f"9{seed:010d}"
+
+
+def unused_seed(rng=random):
+    """A random seed whose posts are not in the database yet."""
+    while True:
+        seed = rng.randrange(SEED_SPACE)
+        if not FacebookPost.objects.filter(post_id__startswith=id_prefix(seed)).exists():
+            return seed
+
+
+class PostGenerator:
+    """
+    Draws synthetic posts, with their analyses and alerts, from one seeded random.Random.
+    Args:
+        seed (int): Random seed in [0, SEED_SPACE); also part of the post ids.
+        start (datetime): Posts are dated from ``start``...
+        end (datetime): ...to ``end``.
+        owners (int): Number of distinct post owners.
+    """
+
+    def __init__(self, seed, start, end, owners):
+        if not 0 <= seed < SEED_SPACE:
+            raise ValueError(f"Seed {seed} is not in [0, {SEED_SPACE})")
+        self.rng = random.Random(seed)
+        self.id_prefix = id_prefix(seed)
+        self.start_ts = int(start.timestamp())
+        self.end_ts = int(end.timestamp())
+        self.owners = [self._owner(number) for number in range(owners)]
+        self.groups = [f"{self.rng.randrange(10 ** 14, 10 ** 15)}" for _ in range(20)]
+        self.recent = deque(maxlen=RECENT_POSTS)
+        self.index = 0
+
+    def post_id(self, index):
+        return f"{self.id_prefix}{index:012d}"
+
+    def _owner(self, number):
+        rng = self.rng
+        if rng.random() < 0.15:
+            name = f"{rng.choice(CITIES)} {rng.choice(PAGE_NAMES)}"
+        else:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        username = ''.join(character for character in name.lower() if character.isalnum()) + str(number)
+        return str(rng.randrange(10 ** 14, 10 ** 15)), username, name
+
+    def _pick_owner(self):
+        # A few owners post most of the content
+        return self.owners[int(len(self.owners) * self.rng.random() ** 3)]
+
+    def _timestamp(self):
+        rng = self.rng
+        days = max((self.end_ts - self.start_ts) // 86400, 1)
+        midnight = self.start_ts - self.start_ts % 86400 + rng.randrange(days + 1) * 86400
+        hour = _draw(rng, _HOURS)
+        timestamp = midnight + (hour - UTC_OFFSET_HOURS) * 3600 + rng.randrange(3600)
+        return min(max(timestamp, self.start_ts), self.end_ts)
+
+    def _text(self, category, language):
+        rng = self.rng
+        city = rng.choice(CITIES)
+        template = rng.choice(TEMPLATES[(category, language)])
+        text = template.format(
+            city=city,
+            city2=rng.choice(CITIES),
+            group=rng.choice(GROUPS),
+            disease=rng.choice(DISEASES),
+            topic=rng.choice(TOPICS_FR if language == 'fr' else TOPICS_EN),
+            number=rng.randint(2, 12),
+        )
+        tags = rng.sample(HASHTAGS, rng.randint(0, 3))
+        if tags:
+            text = f"{text} {' '.join(tags)}"
+        return text, [tag.lstrip('#').lower() for tag in tags], city if '{city}' in template else ''
+
+    def _engagement(self, category, post_type):
+        rng = self.rng
+        total = _lognormal_int(rng, *REACTION_TOTAL[category])
+        reactions = {
+            name: int(total * share * rng.uniform(0.6, 1.4))
+            for name, share in REACTION_SHARES[category].items()
+        }
+        total = sum(reactions.values())
+        counts = {f'reactions_{name}_count': count for name, count in reactions.items()}
+        counts['reactions_total_count'] = total
+        counts['comments_count'] = int(total * rng.uniform(0.05, 0.5))
+        counts['shares_count'] = int(total * rng.lognormvariate(*SHARE_RATIO[category]))
+        if post_type == 'video':
+            counts['video_view_count'] = int((total + 1) * rng.lognormvariate(2.0, 1.0))
+            counts['video_duration'] = rng.randint(10, 600)
+        return counts
+
+    def _attachments(self, post_id, post_type, language):
+        rng = self.rng
+        if post_type == 'photo':
+            count = rng.randint(1, 3)
+            media_ids = [str(rng.randrange(10 ** 15, 10 ** 16)) for _ in range(count)]
+            return {
+                'attached_image_url': f"https://example.com/synthetic/{post_id}.jpg",
+                'attached_image_url_s3': f"https://s3.amazonaws.com/media/synthetic/{post_id}.jpg",
+                'attached_medias_id': media_ids,
+                'attached_medias_preview_url': [f"https://example.com/synthetic/{media}.jpg" for media in media_ids],
+                'attached_medias_preview_url_s3': [
+                    f"https://s3.amazonaws.com/media/synthetic/{media}.jpg" for media in media_ids
+                ],
+            }
+        if post_type == 'video':
+            return {
+                'attached_video_url': f"https://example.com/synthetic/{post_id}.mp4",
+                'attached_video_preview_url': f"https://example.com/synthetic/{post_id}_preview.jpg",
+            }
+        if post_type == 'link':
+            return {
+                'attached_link': f"https://example.com/articles/{post_id}",
+                'attached_link_description': (
+                    "Lire l'article complet" if language == 'fr' else "Read the full article"
+                ),
+            }
+        return {}
+
+    def _original(self):
+        rng = self.rng
+        category = _draw(rng, _CATEGORIES)
+        language = _draw(rng, _LANGUAGES)
+        text, tags, city = self._text(category, language)
+        return {
+            'category': category, 'language': language, 'text': text, 'tags': tags, 'city': city,
+            'post_type': _draw(rng, _POST_TYPES), 'timestamp': self._timestamp(),
+        }
+
+    def _copy_of(self, original, repost):
+        rng = self.rng
+        # Reposts and duplicates follow the original within hours, sometimes days
+        delay = int(rng.lognormvariate(8.5, 1.3))
+        copy = dict(original, timestamp=min(original['timestamp'] + delay, self.end_ts))
+        if repost:
+            copy.update(
+                post_type='share',
+                text=rng.choice(REPOST_COMMENTS) + original['text'],
+                attached_post_id=original['post_id'],
+            )
+        return copy
+
+    def next_post(self):
+        """The next FacebookPost (unsaved) and its post category and city."""
+        rng = self.rng
+        post_id = self.post_id(self.index)
+        self.index += 1
+        draw = rng.random()
+        if self.recent and draw < REPOST_RATE + DUPLICATE_RATE:
+            post = self._copy_of(rng.choice(self.recent), repost=draw < REPOST_RATE)
+        else:
+            post = self._original()
+            post['post_id'] = post_id
+            self.recent.append(post)
+            if post['category'] == MISINFORMATION:
+                self.recent.append(post)
+
+        owner_id, username, full_name = self._pick_owner()
+        timestamp = post['timestamp']
+        posted = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+        ingested = posted + timedelta(seconds=rng.randint(30, 900))
+        fields = {
+            'post_id': post_id,
+            'created_time': posted.strftime('%Y-%m-%dT%H:%M:%S'),
+            'timestamp': timestamp,
+            'post_type': post['post_type'],
+            'text': post['text'],
+            'text_lang': post['language'],
+            'text_tags': post['tags'],
+            'attached_post_id': post.get('attached_post_id', ''),
+            'owner_id': owner_id,
+            'owner_username': username,
+            'owner_full_name': full_name,
+            'group_id': rng.choice(self.groups) if rng.random() < 0.1 else '',
+            'recommends': rng.random() < 0.3,
+            'tagged_location_id': f"1100723957{CITIES.index(post['city']):05d}" if post['city'] else '',
+            'platform': 'facebook',
+            'created_at': ingested,
+            'updated_at': ingested,
+        }
+        fields.update(self._engagement(post['category'], post['post_type']))
+        if post['post_type'] != 'share':
+            fields.update(self._attachments(post_id, post['post_type'], post['language']))
+        return FacebookPost(**fields), post['category'], post['city']
+
+    def _confidence(self, harmful):
+        return round(self.rng.uniform(0.7, 0.99) if harmful else self.rng.uniform(0.5, 0.9), 4)
+
+    def _severity(self, harmful):
+        return _draw(self.rng, _SEVERITIES) if harmful else 'low'
+
+    def analyses(self, post, category):
+        """The hate and misinformation ContentModelAnalysis of a saved post, as the model API would return them."""
+        rng = self.rng
+        created_at = post.created_at + timedelta(seconds=rng.randint(1, 120))
+
+        is_hate = rng.random() < (0.85 if category == HATE else 0.02)
+        hate_category = rng.choice(('ethnic', 'political', 'regional')) if is_hate else None
+        hate = {
+            'is_hate_speech': is_hate,
+            'confidence': self._confidence(is_hate),
+            'severity': self._severity(is_hate),
+            'category': hate_category,
+            'explanation': f"Contains {hate_category} hate speech." if is_hate else "No hate speech detected.",
+            'detected_keywords': [group.lower() for group in GROUPS if group in post.text] if is_hate else [],
+        }
+        is_misinformation = rng.random() < (0.85 if category == MISINFORMATION else 0.03)
+        misinformation = {
+            'label': 'misinformation' if is_misinformation else 'reliable',
+            'confidence': self._confidence(is_misinformation),
+            'severity': self._severity(is_misinformation),
+            'explanation': (
+                "Claim contradicts verified sources." if is_misinformation else "No false claims detected."
+            ),
+        }
+        return [
+            ContentModelAnalysis(
+                post=post, analysis_type='hate', is_harmful=is_hate, confidence=hate['confidence'],
+                severity=hate['severity'], category=hate_category, explanation=hate['explanation'],
+                detected_keywords=hate['detected_keywords'], raw_response=hate, created_at=created_at,
+            ),
+            ContentModelAnalysis(
+                post=post, analysis_type='misinformation', is_harmful=is_misinformation,
+                confidence=misinformation['confidence'], severity=misinformation['severity'],
+                explanation=misinformation['explanation'], raw_response=misinformation, created_at=created_at,
+            ),
+        ]
+
+    def alert(self, post, analysis, city):
+        """The Alert monitoring.analysis raises for ``analysis``, or None; older alerts are more often resolved."""
+        if not (analysis.is_harmful and analysis.confidence > ALERT_CONFIDENCE_THRESHOLD):
+            return None
+        rng = self.rng
+        if analysis.analysis_type == 'hate':
+            title, kind, source = "Hate Speech Detected", "Hate speech", 'Model API - Hate Speech'
+        else:
+            title, kind, source = "Misinformation Detected", "Misinformation", 'Model API - Misinformation'
+        age_days = max(self.end_ts - post.timestamp, 0) / 86400
+        still_open = math.exp(-age_days / 3)
+        draw = rng.random()
+        if draw < still_open * 0.6:
+            status = 'new'
+        elif draw < still_open:
+            status = 'in_progress'
+        else:
+            status = 'resolved' if rng.random() < 0.8 else 'closed'
+        updated_at = analysis.created_at
+        if status != 'new':
+            updated_at += timedelta(minutes=rng.randint(10, 60 * 48))
+        return Alert(
+            title=f"{title} in Post {post.post_id}",
+            description=f"{kind} detected with {analysis.confidence:.2f} confidence. Severity: {analysis.severity}.",
+            severity='high' if analysis.severity == 'high' else 'medium',
+            status=status,
+            source=source,
+            platform_key=normalize_platform(source),  # bulk_create skips Alert.save()
+            location=city,
+            created_at=analysis.created_at,
+            updated_at=updated_at,
+        )
+
+
+def generate_posts(count, days=30, seed=0, end=None, owners=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   analyses=True, progress=None):
+    """
+    Write ``count`` synthetic posts dated over the ``days`` days before ``end``.
+    Args:
+        count (int): Number of posts.
+        days (int, optional): Length of the posting window.
+        seed (int, optional): Random seed in [0, SEED_SPACE).
+        end (datetime, optional): End of the window (default: now).
+        owners (int, optional): Distinct post owners (default: one per 200 posts, at least 50).
+        chunk_size (int, optional): Posts written per transaction.
+        analyses (bool, optional): Also write the model analyses and their alerts.
+        progress (callable, optional): Called as progress(posts_written, count, elapsed_seconds) after each chunk.
+    Returns:
+        dict: Number of 'posts', 'analyses' and 'alerts' written.
+    Raises:
+        ValueError: The seed is out of range, or its posts were already generated.
+    """
+    end = end or timezone.now()
+    start = end - timedelta(days=days)
+    generator = PostGenerator(seed, start, end, owners or max(50, count // 200))
+    if count and FacebookPost.objects.filter(
+        post_id__in=[generator.post_id(0), generator.post_id(count - 1)]
+    ).exists():
+        raise ValueError(f"Posts of seed {seed} already exist, use another seed")
+
+    summary = {'posts': 0, 'analyses': 0, 'alerts': 0}
+    started = time.monotonic()
+    with explicit_timestamps(FacebookPost, ContentModelAnalysis, Alert):
+        while summary['posts'] < count:
+            size = min(chunk_size, count - summary['posts'])
+            drawn = [generator.next_post() for _ in range(size)]
+            with transaction.atomic():
+                posts = FacebookPost.objects.bulk_create([post for post, _, _ in drawn], batch_size=1000)
+                if analyses:
+                    model_analyses = []
+                    alerts = []
+                    for post, (_, category, city) in zip(posts, drawn):
+                        for analysis in generator.analyses(post, category):
+                            model_analyses.append(analysis)
+                            alert = generator.alert(post, analysis, city)
+                            if alert:
+                                alerts.append(alert)
+                    ContentModelAnalysis.objects.bulk_create(model_analyses, batch_size=1000)
+                    Alert.objects.bulk_create(alerts, batch_size=1000)
+                    summary['analyses'] += len(model_analyses)
+                    summary['alerts'] += len(alerts)
+            summary['posts'] += size
+            if progress:
+                progress(summary['posts'], count, time.monotonic() - started)
+
+    if summary['posts']:
+        # bulk_create() does not send post_save: recompute the rollups of the window
+        rollups.rebuild(since=start)
+    return summary
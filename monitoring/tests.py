@@ -1,3 +1,474 @@
-from django.test import TestCase
+import asyncio
+import base64
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from importlib import import_module
 
-# Create your tests here.
+import requests
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reportsuspeciouscontent.models import SuspiciousContentReport
+
+from . import model_client, rollups, search
+from .analysis import store_hate_result
+from .analysis_queue import claim_jobs, enqueue_posts, pending_analysis_types, run_once
+from .circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from .data365 import FixtureFeedClient, RateLimiter, TokenBucket, sync_feed
+from .ingestion import build_facebook_post
+from .model_api_stub import ModelAPIStub
+from .post_data import Data365PostSource, NDJSONPostFile
+from .models import Alert, AnalysisJob, ContentModelAnalysis, FacebookPost, FeedCursor, MetricRollup
+from .pagination import FacebookPostPagination
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            'model-api', failure_threshold=2, recovery_timeout=30, half_open_max_calls=1, clock=self.clock,
+        )
+
+    def fail_call(self, exc=None):
+        with self.assertRaises(type(exc or requests.ConnectionError())):
+            with self.breaker.guard():
+                raise exc or requests.ConnectionError()
+
+    def test_closed_open_half_open_closed(self):
+        self.fail_call()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail_call()
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            with self.breaker.guard():
+                pass
+
+        self.clock.now += 30
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.breaker.guard():
+            # Only one trial call at a time
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_failed_trial_call_opens_again(self):
+        self.fail_call()
+        self.fail_call()
+        self.clock.now += 30
+        self.fail_call()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_after(), 30)
+
+    def test_rejected_request_is_not_a_failure(self):
+        response = requests.Response()
+        response.status_code = 400
+        for _ in range(3):
+            self.fail_call(requests.HTTPError(response=response))
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_cancelled_trial_call_frees_its_slot(self):
+        self.fail_call()
+        self.fail_call()
+        self.clock.now += 30
+
+        async def trial():
+            async with self.breaker.aguard():
+                await asyncio.sleep(10)
+
+        async def cancel_trial():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(trial(), 0.01)
+
+        asyncio.run(cancel_trial())
+        # The cancellation counts as a failure of the trial call
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now += 30
+        with self.breaker.guard():
+            pass
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+def create_post(post_id, text="Les anglophones sont des ennemis, partagez avant qu'on supprime", timestamp=0):
+    post = build_facebook_post({'id': post_id, 'text': text, 'timestamp': timestamp})
+    post.save()
+    return post
+
+
+class AnalysisQueueTests(TestCase):
+    def setUp(self):
+        self.stub = ModelAPIStub(latency=0).start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(
+            MODEL_API_BASE_URL=self.stub.url,
+            MODEL_RESULT_CACHE_ENABLED=False,
+            ANALYSIS_QUEUE_RETRY_DELAY_SECONDS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        model_client.reset()
+        self.addCleanup(model_client.reset)
+
+    def test_claim_takes_due_jobs_once(self):
+        due, later = create_post('due'), create_post('later')
+        enqueue_posts([due.pk])
+        enqueue_posts([later.pk], available_at=timezone.now() + timedelta(minutes=5))
+
+        claimed = claim_jobs(10)
+        self.assertEqual([job.post_id for job in claimed], [due.pk])
+        self.assertEqual(claimed[0].status, 'running')
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_expired_lease_is_claimed_again(self):
+        post = create_post('lease')
+        enqueue_posts([post.pk])
+        claim_jobs(10)
+        with override_settings(ANALYSIS_QUEUE_LEASE_SECONDS=60):
+            self.assertEqual(claim_jobs(10), [])
+            AnalysisJob.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+            self.assertEqual(len(claim_jobs(10)), 1)
+
+    def test_failed_jobs_back_off_then_fail(self):
+        post = create_post('flaky')
+        enqueue_posts([post.pk])
+        with ModelAPIStub(latency=0, error_rate=1.0) as failing, override_settings(
+            MODEL_API_BASE_URL=failing.url, MODEL_API_MAX_RETRIES=0,
+            ANALYSIS_QUEUE_RETRY_DELAY_SECONDS=30, ANALYSIS_QUEUE_MAX_ATTEMPTS=2,
+        ):
+            model_client.reset()
+            self.assertEqual(run_once(10), 1)
+            job = AnalysisJob.objects.get()
+            self.assertEqual((job.status, job.attempts), ('pending', 1))
+            self.assertAlmostEqual(
+                (job.available_at - timezone.now()).total_seconds(), 30, delta=5,
+            )
+            # Not due before its backoff
+            self.assertEqual(run_once(10), 0)
+
+            AnalysisJob.objects.update(available_at=timezone.now())
+            self.assertEqual(run_once(10), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertFalse(ContentModelAnalysis.objects.exists())
+
+    def test_retries_only_run_missing_analyses(self):
+        post = create_post('partial')
+        store_hate_result(post, {'is_hate_speech': False, 'confidence': 0.6})
+        enqueue_posts([post.pk])
+        self.assertEqual(pending_analysis_types(AnalysisJob.objects.get()), ['misinformation'])
+
+        run_once(10)
+        self.assertEqual(self.stub.stats()['requests'], 1)
+        self.assertEqual(ContentModelAnalysis.objects.filter(post=post).count(), 2)
+
+    def test_jobs_of_the_same_post_store_one_analysis_per_type(self):
+        post = create_post('1')
+        # Queued concurrently, e.g. by two ingestion runs
+        AnalysisJob.objects.bulk_create([AnalysisJob(post=post), AnalysisJob(post=post)])
+
+        self.assertEqual(run_once(10), 2)
+        self.assertCountEqual(
+            ContentModelAnalysis.objects.filter(post=post).values_list('analysis_type', flat=True),
+            ['hate', 'misinformation'],
+        )
+        self.assertEqual(Alert.objects.count(), 2)
+        self.assertEqual(self.stub.stats()['requests'], 2)
+        self.assertEqual(set(AnalysisJob.objects.values_list('status', flat=True)), {'done'})
+
+    def test_queued_posts_are_not_queued_again(self):
+        post = create_post('3')
+        self.assertEqual(enqueue_posts([post.pk, post.pk]), 1)
+        self.assertEqual(enqueue_posts([post.pk]), 0)
+        AnalysisJob.objects.update(status='failed')
+        self.assertEqual(enqueue_posts([post.pk]), 1)
+        self.assertEqual(AnalysisJob.objects.count(), 2)
+
+    def test_storing_a_result_twice_keeps_the_first(self):
+        post = create_post('2')
+        result = {'is_hate_speech': True, 'confidence': 0.9, 'severity': 'high'}
+        first = store_hate_result(post, result)
+        second = store_hate_result(post, {**result, 'confidence': 0.8})
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(second.confidence, 0.9)
+        self.assertEqual(Alert.objects.count(), 1)
+
+
+def rollup_rows():
+    return sorted(MetricRollup.objects.filter(value__gt=0).values_list('hour', 'platform', 'region', 'metric', 'value'))
+
+
+class RollupTests(TestCase):
+    def create_posts(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                post = create_post(f'rollup-{i}')
+                store_hate_result(post, {'is_hate_speech': True, 'confidence': 0.9, 'severity': 'high'})
+                store_hate_result(post, {'is_hate_speech': False, 'confidence': 0.9})
+
+    def test_signals_match_rebuild(self):
+        self.create_posts(3)
+        maintained = rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(maintained, rollup_rows())
+        self.assertTrue(maintained)
+
+    def test_deleting_posts_batches_rollup_updates(self):
+        self.create_posts(20)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                FacebookPost.objects.all().delete()
+        # Alerts are not tied to posts and stay
+        self.assertEqual({row[3] for row in rollup_rows()}, {'alerts', 'active_alerts'})
+        # No post re-fetched per analysis, one UPDATE per rollup row
+        self.assertLess(len(queries), 20)
+
+    def test_rolled_back_contributions_are_dropped(self):
+        self.create_posts(1)
+        before = rollup_rows()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    create_post('rolled-back')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            create_post('kept')
+        self.assertEqual(sum(row[-1] for row in rollup_rows()), sum(row[-1] for row in before) + 1)
+
+    def test_migration_backfill_matches_rebuild(self):
+        self.create_posts(3)
+        Alert.objects.create(title="Alert", description="", severity='high', source=' Facebook', location='Douala')
+        backfill_rollups = import_module('monitoring.migrations.0010_metricrollup').backfill_rollups
+        MetricRollup.objects.all().delete()
+        backfill_rollups(apps, None)
+        backfilled = rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(backfilled, rollup_rows())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        for i, text in enumerate(("Fake news about the elections in Douala", "Elections results in Yaoundé")):
+            create_post(f'search-{i}', text)
+        SuspiciousContentReport.objects.create(
+            content_type='misinformation', platform='facebook', url='https://facebook.com/posts/1',
+            urgency_level='high', description="Rumours about the elections spread on Facebook",
+        )
+
+    def test_migration_indexes_the_search_targets(self):
+        migration = import_module('monitoring.migrations.0013_search_indexes')
+        self.assertEqual(
+            migration.SEARCH_TABLES,
+            {model._meta.db_table: target for model, target in search.SEARCH_TARGETS.items()},
+        )
+        self.assertEqual(len(search.search(FacebookPost, 'elections', 10)), 2)
+
+    def test_relative_ranks(self):
+        self.assertEqual(search.relative_ranks([('a', 4.0), ('b', 1.0)]), [('a', 1.0), ('b', 0.25)])
+        self.assertEqual(search.relative_ranks([('a', 0.0)]), [('a', 0.0)])
+
+    def test_all_types_interleave_by_relative_rank(self):
+        staff = User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.force_login(staff)
+        results = self.client.get(reverse('full_text_search'), {'q': 'elections'}).json()['results']
+        self.assertEqual(sorted(result['type'] for result in results), ['post', 'post', 'report'])
+        self.assertEqual(sorted(result['rank'] for result in results)[-2:], [1.0, 1.0])
+
+
+class StalledClient:
+    timeout = 0.1
+
+    def __init__(self):
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def fetch_page(self, cursor=None):
+        self.fetching.set()
+        self.release.wait(5)
+        return [{'id': '1', 'text': "Post"}], None
+
+
+class Data365PostSourceTests(SimpleTestCase):
+    def test_stalled_first_fetch_serves_an_empty_page(self):
+        client = StalledClient()
+        source = Data365PostSource(client, ttl=60)
+        fetcher = threading.Thread(target=len, args=(source,))
+        fetcher.start()
+        client.fetching.wait(5)
+        try:
+            started = time.monotonic()
+            self.assertIsNone(source.get('1'))
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            client.release.set()
+            fetcher.join()
+        self.assertEqual(source.get('1')['text'], "Post")
+
+
+class NDJSONPostFileTests(SimpleTestCase):
+    def test_ids_with_escapes_are_found(self):
+        lines = [
+            '{"id": "page\\/123", "text": "Slash"}',
+            '{"id": "caf\\u00e9_1", "text": "Accent"}',
+            '{"id": 42, "text": "Number", "author": {"id": "7"}}',
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            file.write('\n'.join(lines) + '\n')
+        self.addCleanup(os.remove, file.name)
+        posts = NDJSONPostFile(file.name)
+        self.addCleanup(posts.close)
+
+        self.assertEqual(posts.get('page/123')['text'], "Slash")
+        self.assertEqual(posts.get('café_1')['text'], "Accent")
+        self.assertEqual(posts.get(42)['text'], "Number")
+        self.assertIsNone(posts.get('7'))
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Timestamps with ties, which the id breaks
+        self.posts = [create_post(f'page-{i}', timestamp=timestamp) for i, timestamp in enumerate([3, 3, 3, 2, 2, 1, 1])]
+
+    def paginate(self, **params):
+        request = Request(APIRequestFactory().get('/posts/', params))
+        paginator = FacebookPostPagination()
+        return paginator, paginator.paginate_queryset(FacebookPost.objects.all(), request)
+
+    def test_pages_visit_every_row_once_in_order(self):
+        seen = []
+        params = {'limit': 2}
+        while True:
+            paginator, rows = self.paginate(**params)
+            seen.extend(post.pk for post in rows)
+            if not paginator.next_cursor:
+                break
+            params['cursor'] = paginator.next_cursor
+        expected = [post.pk for post in sorted(self.posts, key=lambda post: (-post.timestamp, -post.pk))]
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursors_are_not_found(self):
+        def encode(position):
+            return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+        for cursor in ('not base64!', encode({'timestamp': 1}), encode([1]), encode(['soon', 1]),
+                       encode([None, 1]), encode([[1], 2]), encode([1, 10 ** 30])):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                self.paginate(cursor=cursor)
+
+
+    def test_saved_posts_still_accept_offset(self):
+        self.client.force_login(User.objects.create_user('analyst', password='secret'))
+        url = reverse('facebook_saved_posts')
+        ordered = [post.post_id for post in sorted(self.posts, key=lambda post: (-post.timestamp, -post.pk))]
+
+        page = self.client.get(url, {'limit': 2, 'offset': 2}).json()
+        self.assertEqual([post['post_id'] for post in page['data']], ordered[2:4])
+        following = self.client.get(url, {'limit': 2, 'cursor': page['next_cursor']}).json()
+        self.assertEqual([post['post_id'] for post in following['data']], ordered[4:6])
+
+        self.assertEqual(self.client.get(url, {'offset': 'ten'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'offset': -1}).status_code, 400)
+
+
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=1, capacity=2, clock=self.clock)
+        bucket.take()
+        bucket.take()
+        self.assertEqual(bucket.wait_time(), 1.0)
+        self.clock.now += 0.5
+        self.assertEqual(bucket.wait_time(), 0.5)
+        self.clock.now += 10
+        self.assertEqual(bucket.wait_time(2), 0.0)
+        bucket.drain(5)
+        self.assertEqual(bucket.wait_time(), 6.0)
+
+    def test_rate_limiter_queues_callers_behind_reservations(self):
+        sleeps = []
+        limiter = RateLimiter.from_config(per_minute=60, per_hour=3600, burst=1, clock=self.clock, sleep=sleeps.append)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(sleeps, [1.0, 2.0])
+        limiter.throttled(30)
+        limiter.acquire()
+        self.assertGreaterEqual(sleeps[-1], 30)
+
+
+class SyncFeedTests(TestCase):
+    def feed(self, posts, page_size=2):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump({'cameroon_posts': posts}, file)
+        self.addCleanup(os.remove, file.name)
+        return FixtureFeedClient(file.name, page_size=page_size)
+
+    def test_interrupted_sync_resumes_from_its_cursor(self):
+        posts = [{'id': str(i), 'text': f"Post {i}", 'timestamp': 100 - i} for i in range(6)]
+        client = self.feed(posts)
+
+        first = sync_feed(client, batch_size=1, max_pages=1, analyze=False)
+        self.assertFalse(first['completed'])
+        self.assertEqual(FeedCursor.objects.get().cursor, '1')
+
+        second = sync_feed(client, batch_size=1, analyze=False)
+        self.assertTrue(second['completed'])
+        self.assertEqual(second['pages'], 2)
+        self.assertEqual(first['created'] + second['created'], 6)
+        self.assertEqual(FacebookPost.objects.count(), 6)
+        state = FeedCursor.objects.get()
+        self.assertEqual((state.cursor, state.high_water_mark), ('', 100))
+
+    def test_next_run_stops_at_posts_already_seen(self):
+        sync_feed(self.feed([{'id': '1', 'timestamp': 10}, {'id': '2', 'timestamp': 9}]), analyze=False)
+        newer = self.feed([{'id': '3', 'timestamp': 11}, {'id': '1', 'timestamp': 10},
+                           {'id': '2', 'timestamp': 9}, {'id': '0', 'timestamp': 8}])
+        summary = sync_feed(newer, analyze=False, force=True)
+        self.assertEqual(summary['pages'], 2)
+        self.assertEqual(summary['created'], 1)
+        self.assertTrue(summary['completed'])
+        self.assertFalse(sync_feed(newer, analyze=False)['pages'])
+
+
+class ModelAPIStubTests(SimpleTestCase):
+    def setUp(self):
+        self.stub = ModelAPIStub(latency=0).start()
+        self.addCleanup(self.stub.stop)
+
+    def post(self, body, headers):
+        connection = http.client.HTTPConnection(*self.stub.server.server_address[:2], timeout=5)
+        self.addCleanup(connection.close)
+        connection.putrequest('POST', '/hate/analyze')
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_bad_requests_get_an_error_response(self):
+        self.assertEqual(self.post(b'{}', {'Content-Length': 'two'}), (400, {'detail': 'Invalid Content-Length'}))
+        self.assertEqual(self.post(b'{', {'Content-Length': '1'})[0], 400)
+        with self.assertLogs('monitoring.model_api_stub', 'ERROR'):
+            self.assertEqual(self.post(b'[]', {'Content-Length': '2'})[0], 500)
+        self.assertEqual(self.post(b'{"text": "ok"}', {'Content-Length': '14'})[0], 200)
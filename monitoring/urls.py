@@ -61,6 +61,11 @@ urlpatterns = [
     # Content Model Analysis endpoints
     path('model-analysis/by-post/<str:post_id>/', views.get_analysis_by_post, name='get_analysis_by_post'),
     path('model-analysis/harmful-content/', views.get_harmful_content, name='get_harmful_content'),
+    path('model-cache/stats/', views.model_result_cache_stats, name='model_result_cache_stats'),
+    path('health/', views.health, name='health'),
+
+    # Full-text search over posts and reports
+    path('search/', views.full_text_search, name='full_text_search'),
 
     # Dashboard KPIs
     path('dashboard/kpis', DashboardKPIView.as_view(), name='dashboard_kpis'),
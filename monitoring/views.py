@@ -4,178 +4,41 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
+import math
 import random
-import json
-import os
 from datetime import datetime, timedelta
 from django.conf import settings
-from .data365_config import USE_JSON_DATA_SOURCE, JSON_DATA_FILE
+from django.db.models import Count
+from .ingestion import ingest_posts
+from .pagination import FacebookPostPagination, SavedPostsPagination
+from .post_data import post_source
+from . import search
+from reportsuspeciouscontent.models import SuspiciousContentReport
+from reportsuspeciouscontent.serializers import SuspiciousContentReportSerializer
+from .analysis_cache import result_cache
+from .async_views import async_api_view
+from . import llm
+from .circuit_breaker import CircuitOpenError, breaker_for_url, breaker_states, get_breaker
+from .model_client import (
+    analyze_text, async_analyze_text, model_url, HATE_SPEECH_ANALYZE_ENDPOINT, MISINFORMATION_ANALYZE_ENDPOINT
+)
 from .models import (
     Alert, Report, ContentAnalysis, GeographicData,
     PlatformAnalytics, ChatMessage, UserSettings, FacebookPost,
-    ContentModelAnalysis
+    ContentModelAnalysis, AnalysisJob
 )
 from .serializers import (
     UserSerializer, AlertSerializer, ReportSerializer,
     ContentAnalysisSerializer, GeographicDataSerializer,
     PlatformAnalyticsSerializer, ChatMessageSerializer,
-    UserSettingsSerializer, FacebookPostSerializer, FacebookAPIResponseSerializer,
+    UserSettingsSerializer, FacebookPostSerializer, FacebookPostListSerializer, FacebookAPIResponseSerializer,
     ContentModelAnalysisSerializer, ContentModelAnalysisSummarySerializer
 )
-import google.generativeai as genai
-import openai
+import httpx
 import requests
 
 # Create your views here.
 
-def load_facebook_data():
-    """
-    Load Facebook data from JSON file (temporary - will be replaced with Data365 API calls)
-    """
-    json_file_path = os.path.join(
-        os.path.dirname(__file__), 
-        'data', 
-        JSON_DATA_FILE
-    )
-    
-    try:
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data['cameroon_posts']
-    except FileNotFoundError:
-        # Fallback if JSON file not found
-        return []
-    except Exception as e:
-        print(f"Error loading Facebook data: {e}")
-        return []
-
-def save_post_to_database(post_data):
-    """
-    Save a Facebook post to the database
-    This simulates the behavior when receiving data from Data365 API
-    After saving, send relevant fields to the model API for analysis.
-    """
-    post_id = post_data.get('id')
-
-    # Check if post already exists
-    if FacebookPost.objects.filter(post_id=post_id).exists():
-        return FacebookPost.objects.get(post_id=post_id)
-
-    # Create new post
-    facebook_post = FacebookPost.objects.create(
-        post_id=post_data.get('id', ''),
-        created_time=post_data.get('created_time', ''),
-        timestamp=post_data.get('timestamp', 0),
-        post_type=post_data.get('post_type', ''),
-        text=post_data.get('text', ''),
-        text_lang=post_data.get('text_lang', ''),
-        text_tagged_users=post_data.get('text_tagged_users', []),
-        text_tags=post_data.get('text_tags', []),
-        attached_link=post_data.get('attached_link', ''),
-        attached_link_description=post_data.get('attached_link_description', ''),
-        attached_image_url=post_data.get('attached_image_url', ''),
-        attached_image_url_s3=post_data.get('attached_image_url_s3', ''),
-        attached_image_content=post_data.get('attached_image_content', ''),
-        attached_medias_id=post_data.get('attached_medias_id', []),
-        attached_medias_preview_url=post_data.get('attached_medias_preview_url', []),
-        attached_medias_preview_url_s3=post_data.get('attached_medias_preview_url_s3', ''),
-        attached_medias_preview_content=post_data.get('attached_medias_preview_content', []),
-        attached_post_id=post_data.get('attached_post_id', ''),
-        attached_video_preview_url=post_data.get('attached_video_preview_url', ''),
-        attached_video_preview_url_s3=post_data.get('attached_video_preview_url_s3', ''),
-        attached_video_url=post_data.get('attached_video_url', ''),
-        post_screenshot=post_data.get('post_screenshot', ''),
-        reactions_like_count=post_data.get('reactions_like_count', 0),
-        reactions_love_count=post_data.get('reactions_love_count', 0),
-        reactions_haha_count=post_data.get('reactions_haha_count', 0),
-        reactions_wow_count=post_data.get('reactions_wow_count', 0),
-        reactions_sad_count=post_data.get('reactions_sad_count', 0),
-        reactions_angry_count=post_data.get('reactions_angry_count', 0),
-        reactions_support_count=post_data.get('reactions_support_count', 0),
-        reactions_total_count=post_data.get('reactions_total_count', 0),
-        comments_count=post_data.get('comments_count', 0),
-        shares_count=post_data.get('shares_count', 0),
-        video_view_count=post_data.get('video_view_count', 0),
-        video_duration=post_data.get('video_duration', 0),
-        overlay_text=post_data.get('overlay_text', ''),
-        fact_checks=post_data.get('fact_checks', []),
-        owner_id=post_data.get('owner_id', ''),
-        owner_username=post_data.get('owner_username', ''),
-        owner_full_name=post_data.get('owner_full_name', ''),
-        group_id=post_data.get('group_id', ''),
-        recommends=post_data.get('recommends', False),
-        tagged_location_id=post_data.get('tagged_location_id', ''),
-        post_location_id=post_data.get('post_location_id', ''),
-    )
-
-    # --- Send to model API for analysis ---
-    try:
-        from monitoring.model_client import analyze_hate, analyze_misinformation
-        from .models import ContentModelAnalysis, Alert
-        
-        content = post_data.get('text', '')
-        # Only send if content is not empty
-        if content.strip():
-            # Send content to hate speech analysis endpoint
-            hate_result = analyze_hate(content)
-            print(f"Analysis for post {post_id}:\n  Hate: {hate_result}")
-            
-            # Save hate speech analysis result
-            if 'error' not in hate_result:
-                # Create ContentModelAnalysis record for hate speech
-                hate_analysis = ContentModelAnalysis.objects.create(
-                    post=facebook_post,
-                    analysis_type='hate',
-                    is_harmful=hate_result.get('is_hate_speech', False),
-                    confidence=hate_result.get('confidence'),
-                    severity=hate_result.get('severity'),
-                    category=hate_result.get('category'),
-                    explanation=hate_result.get('explanation', ''),
-                    detected_keywords=hate_result.get('detected_keywords', []),
-                    raw_response=hate_result
-                )
-                
-                # If harmful content detected with high confidence, create an alert
-                if hate_analysis.is_harmful and hate_analysis.confidence and hate_analysis.confidence > 0.7:
-                    Alert.objects.create(
-                        title=f"Hate Speech Detected in Post {post_id}",
-                        description=f"Hate speech detected with {hate_analysis.confidence:.2f} confidence. Severity: {hate_analysis.severity}.",
-                        severity='high' if hate_analysis.severity == 'high' else 'medium',
-                        source='Model API - Hate Speech',
-                        status='new'
-                    )
-            
-            # Send content to misinformation analysis endpoint
-            misinformation_result = analyze_misinformation(content)
-            print(f"Analysis for post {post_id}:\n  Misinformation: {misinformation_result}")
-            
-            # Save misinformation analysis result
-            if 'error' not in misinformation_result:
-                # Create ContentModelAnalysis record for misinformation
-                misinfo_analysis = ContentModelAnalysis.objects.create(
-                    post=facebook_post,
-                    analysis_type='misinformation',
-                    is_harmful=misinformation_result.get('label') == 'misinformation',
-                    confidence=misinformation_result.get('confidence'),
-                    severity=misinformation_result.get('severity'),
-                    explanation=misinformation_result.get('explanation', ''),
-                    raw_response=misinformation_result
-                )
-                
-                # If misinformation detected with high confidence, create an alert
-                if misinfo_analysis.is_harmful and misinfo_analysis.confidence and misinfo_analysis.confidence > 0.7:
-                    Alert.objects.create(
-                        title=f"Misinformation Detected in Post {post_id}",
-                        description=f"Misinformation detected with {misinfo_analysis.confidence:.2f} confidence. Severity: {misinfo_analysis.severity}.",
-                        severity='high' if misinfo_analysis.severity == 'high' else 'medium',
-                        source='Model API - Misinformation',
-                        status='new'
-                    )
-    except Exception as e:
-        print(f"Error processing model analysis for post {post_id}: {e}")
-
-    return facebook_post
-
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing users.
@@ -517,6 +380,30 @@ class FacebookPostViewSet(viewsets.ModelViewSet):
     queryset = FacebookPost.objects.all()
     serializer_class = FacebookPostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FacebookPostPagination
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return FacebookPostListSerializer
+        return FacebookPostSerializer
+
+    def get_fieldset(self):
+        if self.request.method != 'GET':
+            return None
+        return self.get_serializer_class().fieldset_from_request(self.request)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_fieldset()
+        if fields is not None:
+            queryset = self.get_serializer_class().restrict_queryset(queryset, fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -570,8 +457,8 @@ def facebook_api_data(request):
     
     # Save to database (simulating external API call behavior)
     try:
-        facebook_post = save_post_to_database(selected_post_data)
-        print(f"Saved Facebook post {facebook_post.post_id} to database")
+        ingest_posts([selected_post_data])
+        print(f"Saved Facebook post {selected_post_data['id']} to database")
     except Exception as e:
         print(f"Error saving post to database: {e}")
     
@@ -660,15 +547,15 @@ def facebook_api_posts_list(request):
         )
         post_copy['reactions_total_count'] = total_reactions
         
-        # Save to database (simulating external API call behavior)
-        try:
-            facebook_post = save_post_to_database(post_copy)
-            print(f"Saved Facebook post {facebook_post.post_id} to database")
-        except Exception as e:
-            print(f"Error saving post {post_copy['id']} to database: {e}")
-        
         processed_posts.append(post_copy)
     
+    # Save all posts to database in one batch (simulating external API call behavior)
+    try:
+        summary = ingest_posts(processed_posts)
+        print(f"Saved {summary['created']} new and updated {summary['updated']} Facebook posts in database")
+    except Exception as e:
+        print(f"Error saving posts to database: {e}")
+    
     response_data = {
         "data": processed_posts,
         "error": None,
@@ -685,24 +572,25 @@ def facebook_saved_posts(request):
     Get Facebook posts that have been saved to the database
     """
     
-    # Get query parameters
-    limit = min(int(request.GET.get('limit', 10)), 50)  # Max 50 posts
-    offset = int(request.GET.get('offset', 0))
-    
-    # Get posts from database
-    posts = FacebookPost.objects.all()[offset:offset+limit]
-    total_count = FacebookPost.objects.count()
+    # Keyset pagination: ?limit= (max 50) and ?cursor= from the previous page's next_cursor.
+    # The old ?offset= still works (without a cursor) and also returns next_cursor.
+    paginator = SavedPostsPagination()
+    # Compact fields by default; ?fields= / ?exclude= trim both the SQL and the payload
+    fields = FacebookPostListSerializer.fieldset_from_request(request)
+    queryset = FacebookPostListSerializer.restrict_queryset(FacebookPost.objects.all(), fields)
+    posts = paginator.paginate_queryset(queryset, request)
     
     # Serialize the posts
-    serializer = FacebookPostSerializer(posts, many=True)
+    serializer = FacebookPostListSerializer(posts, many=True, fields=fields)
     
     response_data = {
         "data": serializer.data,
         "error": None,
         "status": "ok",
         "count": len(serializer.data),
-        "total_count": total_count,
-        "has_next": (offset + limit) < total_count
+        "total_count": paginator.total_count,
+        "has_next": paginator.has_next,
+        "next_cursor": paginator.next_cursor
     }
     
     return Response(response_data, status=status.HTTP_200_OK)
@@ -729,7 +617,7 @@ def facebook_clear_saved_posts(request):
 def fetch_facebook_data_from_api(post_id=None, limit=5):
     """
     Fetch Facebook data from Data365 API
-    Currently loads from JSON file, will be replaced with actual API calls
+    Loads from the JSON file while USE_JSON_DATA_SOURCE is set
     
     Args:
         post_id (str, optional): Specific post ID to fetch
@@ -738,26 +626,19 @@ def fetch_facebook_data_from_api(post_id=None, limit=5):
     Returns:
         dict or list: Facebook post data in Data365 format
     """
-    # TODO: Replace with actual Data365 API integration
-    # For now, load from JSON file
-    posts_data = load_facebook_data()
-    
+    # Indexed lookup and sampling, whichever backend is active (see monitoring.post_data)
+    source = post_source()
     if post_id:
-        # Return specific post if post_id provided
-        for post in posts_data:
-            if post['id'] == post_id:
-                return post
-        return None
-    else:
-        # Return list of posts
-        if len(posts_data) <= limit:
-            return posts_data
-        else:
-            return random.sample(posts_data, limit)
+        return source.get(post_id)
+    return source.sample(limit)
 
-@api_view(['POST'])
-@permission_classes([permissions.AllowAny])
-def gemini_ask(request):
+def service_unavailable(message, error):
+    """503 response for a failed upstream call, with Retry-After while its circuit is open."""
+    headers = {'Retry-After': str(math.ceil(error.retry_after))} if isinstance(error, CircuitOpenError) else None
+    return Response({"error": message, "details": str(error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers=headers)
+
+@async_api_view(['POST'], permission_classes=[permissions.AllowAny])
+async def gemini_ask(request):
     """
     Send a question to Google Gemini and return the response.
     Gemini is strictly instructed to only answer with information related to Cameroon.
@@ -785,27 +666,15 @@ def gemini_ask(request):
         return Response({'error': 'Gemini API key not configured'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     try:
-        genai.configure(api_key=api_key)
-        # Use a supported Gemini model for text generation
-        # 'gemini-1.5-pro-latest' is generally available for text tasks
-        model = genai.GenerativeModel('gemini-1.5-pro-latest')
-        cameroon_instruction = (
-            "You are an assistant that only provides information related to Cameroon. "
-            "If the question is not about Cameroon, politely refuse to answer. "
-            "If the question is ambiguous, ask the user to clarify how it relates to Cameroon. "
-            "Never provide information about other countries, regions, or topics unless it is directly connected to Cameroon. "
-            "Always keep answers concise, factual, and relevant to Cameroon."
-        )
-        full_prompt = f"{cameroon_instruction}\n\nUser question: {question}"
-        response = model.generate_content(full_prompt)
-        answer = response.text if hasattr(response, 'text') else str(response)
+        answer = await llm.ask_gemini(question)
         return Response({'question': question, 'answer': answer}, status=status.HTTP_200_OK)
+    except CircuitOpenError as e:
+        return service_unavailable('Gemini is unavailable', e)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['POST'])
-@permission_classes([permissions.AllowAny])
-def openai_ask(request):
+@async_api_view(['POST'], permission_classes=[permissions.AllowAny])
+async def openai_ask(request):
     """
     Send a question to OpenAI GPT and return the response.
     Only provides information related to Cameroon.
@@ -820,40 +689,19 @@ def openai_ask(request):
         return Response({'error': 'No question provided'}, status=status.HTTP_400_BAD_REQUEST)
 
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
-    model = getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')
-    
     if not api_key:
         return Response({'error': 'OpenAI configuration missing'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     try:
-        # Use OpenAI client for chat completions
-        client = openai.OpenAI(api_key=api_key)
-        
-        system_prompt = (
-            "You are an assistant that only provides information related to Cameroon. "
-            "If the question is not about Cameroon, politely refuse to answer. "
-            "If the question is ambiguous, ask the user to clarify how it relates to Cameroon. "
-            "Never provide information about other countries, regions, or topics unless it is directly connected to Cameroon. "
-            "Always keep answers concise, factual, and relevant to Cameroon."
-        )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": question}
-        ]
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=512
-        )
-        answer = response.choices[0].message.content
+        answer = await llm.ask_openai(question)
         return Response({'question': question, 'answer': answer}, status=status.HTTP_200_OK)
+    except CircuitOpenError as e:
+        return service_unavailable('OpenAI is unavailable', e)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['POST'])
-@permission_classes([permissions.AllowAny])
-def azure_openai_ask(request):
+@async_api_view(['POST'], permission_classes=[permissions.AllowAny])
+async def azure_openai_ask(request):
     """
     Send a question to Azure OpenAI and return the response.
     Only provides information related to Cameroon.
@@ -870,42 +718,19 @@ def azure_openai_ask(request):
     api_key = getattr(settings, 'AZURE_OPENAI_API_KEY', None)
     endpoint = getattr(settings, 'AZURE_OPENAI_ENDPOINT', None)
     deployment = getattr(settings, 'AZURE_OPENAI_DEPLOYMENT', None)
-    api_version = getattr(settings, 'AZURE_OPENAI_API_VERSION', '2024-02-15-preview')
     if not api_key or not endpoint or not deployment:
         return Response({'error': 'Azure OpenAI configuration missing'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     try:
-        # Use the new OpenAI v1 API for chat completions
-        client = openai.AzureOpenAI(
-            api_key=api_key,
-            api_version=api_version,
-            azure_endpoint=endpoint
-        )
-        system_prompt = (
-            "You are an assistant that only provides information related to Cameroon. "
-            "If the question is not about Cameroon, politely refuse to answer. "
-            "If the question is ambiguous, ask the user to clarify how it relates to Cameroon. "
-            "Never provide information about other countries, regions, or topics unless it is directly connected to Cameroon. "
-            "Always keep answers concise, factual, and relevant to Cameroon."
-        )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": question}
-        ]
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=512
-        )
-        answer = response.choices[0].message.content
+        answer = await llm.ask_azure_openai(question)
         return Response({'question': question, 'answer': answer}, status=status.HTTP_200_OK)
+    except CircuitOpenError as e:
+        return service_unavailable('Azure OpenAI is unavailable', e)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def hate_speech_analyze(request):
+@async_api_view(['POST'], permission_classes=[permissions.IsAuthenticated])
+async def hate_speech_analyze(request):
     """
     Analyze text for hate speech using external FastAPI model.
     Expects JSON: {"text": "..."}
@@ -915,12 +740,9 @@ def hate_speech_analyze(request):
     if not text:
         return Response({"error": "No text provided."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        api_url = "https://model.sui-ru.com/hate-speech/analyze"
-        resp = requests.post(api_url, json={"text": text}, timeout=10)
-        resp.raise_for_status()
-        result = resp.json()
-    except requests.RequestException as e:
-        return Response({"error": "Model service unavailable.", "details": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        result = await async_analyze_text(model_url(HATE_SPEECH_ANALYZE_ENDPOINT), {"text": text})
+    except (httpx.HTTPError, requests.RequestException) as e:
+        return service_unavailable("Model service unavailable.", e)
     return Response(result, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -929,25 +751,21 @@ def hate_speech_analyze_random_facebook_post(request):
     """
     Select a random Facebook post from facebook_data.json, send its text to the hate speech model, and return the result.
     """
-    posts = load_facebook_data()
+    posts = post_source().sample(1)
     if not posts:
         return Response({"error": "No Facebook data available."}, status=status.HTTP_404_NOT_FOUND)
-    post = random.choice(posts)
+    post = posts[0]
     text = post.get("text", "")
     if not text:
         return Response({"error": "Selected post has no text."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        api_url = "https://model.sui-ru.com/hate-speech/analyze"
-        resp = requests.post(api_url, json={"text": text}, timeout=10)
-        resp.raise_for_status()
-        result = resp.json()
+        result = analyze_text(model_url(HATE_SPEECH_ANALYZE_ENDPOINT), {"text": text})
     except requests.RequestException as e:
-        return Response({"error": "Model service unavailable.", "details": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return service_unavailable("Model service unavailable.", e)
     return Response({"post_id": post.get("id"), "text": text, "hate_speech_result": result}, status=status.HTTP_200_OK)
 
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def misinformation_analyze(request):
+@async_api_view(['POST'], permission_classes=[permissions.IsAuthenticated])
+async def misinformation_analyze(request):
     """
     Analyze text for misinformation using external FastAPI model.
     Expects JSON: {"text": "..."}
@@ -957,12 +775,9 @@ def misinformation_analyze(request):
     if not text:
         return Response({"error": "No text provided."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        api_url = "https://model.sui-ru.com/misinformation/analyze"
-        resp = requests.post(api_url, json={"text": text}, timeout=10)
-        resp.raise_for_status()
-        result = resp.json()
-    except requests.RequestException as e:
-        return Response({"error": "Model service unavailable.", "details": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        result = await async_analyze_text(model_url(MISINFORMATION_ANALYZE_ENDPOINT), {"text": text})
+    except (httpx.HTTPError, requests.RequestException) as e:
+        return service_unavailable("Model service unavailable.", e)
     return Response(result, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -971,20 +786,17 @@ def misinformation_analyze_random_facebook_post(request):
     """
     Select a random Facebook post from facebook_data.json, send its text to the misinformation model, and return the result.
     """
-    posts = load_facebook_data()
+    posts = post_source().sample(1)
     if not posts:
         return Response({"error": "No Facebook data available."}, status=status.HTTP_404_NOT_FOUND)
-    post = random.choice(posts)
+    post = posts[0]
     text = post.get("text", "")
     if not text:
         return Response({"error": "Selected post has no text."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        api_url = "https://model.sui-ru.com/misinformation/analyze"
-        resp = requests.post(api_url, json={"text": text}, timeout=10)
-        resp.raise_for_status()
-        result = resp.json()
+        result = analyze_text(model_url(MISINFORMATION_ANALYZE_ENDPOINT), {"text": text})
     except requests.RequestException as e:
-        return Response({"error": "Model service unavailable.", "details": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return service_unavailable("Model service unavailable.", e)
     return Response({"post_id": post.get("id"), "text": text, "misinformation_result": result}, status=status.HTTP_200_OK)
 
 class ContentModelAnalysisViewSet(viewsets.ModelViewSet):
@@ -1077,3 +889,103 @@ def get_harmful_content(request):
         )
     
     return Response(list(post_map.values()))
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def model_result_cache_stats(request):
+    """
+    Hit/miss counters of the model analysis result cache for this server process
+    """
+    return Response(result_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def health(request):
+    """
+    Health of this server process: circuit breaker state of every upstream
+    (model API hosts, LLM providers) and the analysis queue backlog.
+    Status is "degraded" while any circuit is not closed; the response is always 200.
+    """
+    # Register the known upstreams so they are listed before their first call
+    for url in (model_url(HATE_SPEECH_ANALYZE_ENDPOINT), model_url(HATE_SPEECH_ANALYZE_ENDPOINT, settings.UNIFIED_MODEL_API_BASE_URL)):
+        breaker_for_url(url)
+    for name in ('openai', 'azure-openai', 'gemini'):
+        get_breaker(name)
+    circuits = breaker_states()
+    queue = dict(
+        AnalysisJob.objects.filter(status__in=['pending', 'running'])
+        .values_list('status').annotate(total=Count('id'))
+    )
+    return Response({
+        "status": "ok" if all(c['state'] == 'closed' for c in circuits.values()) else "degraded",
+        "circuits": circuits,
+        "analysis_queue": {"pending": queue.get('pending', 0), "running": queue.get('running', 0)},
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def full_text_search(request):
+    """
+    Ranked full-text search over Facebook post content (text, overlay text, image content)
+    and, for staff users, suspicious content report descriptions.
+
+    Query parameters:
+    - q (string, required): Search terms
+    - type (string, optional): posts, reports or all (default: all)
+    - page (int, optional): Page number, starting at 1 (default: 1)
+    - limit (int, optional): Results per page, max 50 (default: 20)
+
+    A result's rank is its relevance relative to the best match of its type
+    (1.0): scores of posts and reports are not comparable, so with type=all
+    the two are interleaved by relative relevance.
+    """
+    query = request.GET.get('q', '').strip()
+    search_type = request.GET.get('type', 'all')
+    if not query:
+        return Response({"error": "Query parameter 'q' is required", "status": "error"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if search_type not in ('posts', 'reports', 'all'):
+        return Response({"error": "type must be one of: posts, reports, all", "status": "error"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if search_type == 'reports' and not request.user.is_staff:
+        return Response({"error": "Only staff users can search reports", "status": "error"},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        return Response({"error": "page and limit must be integers", "status": "error"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    offset = (page - 1) * limit
+    if offset + limit > search.MAX_RESULTS:
+        return Response({"error": f"Only the best {search.MAX_RESULTS} results can be paged through; refine the query",
+                         "status": "error"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Each source returns its best offset + limit + 1 matches; merging them by rank gives the page
+    window = offset + limit + 1
+    hits = []
+    if search_type in ('posts', 'all'):
+        fields = FacebookPostListSerializer.default_fields
+        for post, rank in search.relative_ranks(search.search(FacebookPost, query, window, only=fields)):
+            hits.append((rank, 'post', post.pk, lambda post=post: FacebookPostListSerializer(post).data))
+    if search_type in ('reports', 'all') and request.user.is_staff:
+        for report, rank in search.relative_ranks(search.search(SuspiciousContentReport, query, window)):
+            hits.append((rank, 'report', report.pk, lambda report=report: SuspiciousContentReportSerializer(report).data))
+    hits.sort(key=lambda hit: (-hit[0], hit[1], -hit[2]))
+
+    results = [
+        {"type": hit_type, "id": pk, "rank": round(rank, 6), "data": serialize()}
+        for rank, hit_type, pk, serialize in hits[offset:offset + limit]
+    ]
+    return Response({
+        "query": query,
+        "type": search_type,
+        "backend": search.backend(FacebookPost),
+        "page": page,
+        "limit": limit,
+        "count": len(results),
+        "has_next": len(hits) > offset + limit,
+        "results": results,
+        "error": None,
+        "status": "ok"
+    }, status=status.HTTP_200_OK)
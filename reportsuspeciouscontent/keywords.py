@@ -0,0 +1,175 @@
+"""
+Incremental keyword index for the dashboard reports.
+
+Report descriptions are tokenized once, when a SuspiciousContentReport is
+written, into KeywordCount rows of (term, day, platform, content_type,
+urgency_level) -> occurrences. Top keywords for a date range and filter
+combination are then a grouped SUM over the index instead of a re-tokenization
+of every description. Content is bilingual, so both English and French
+stopwords are dropped.
+"""
+import re
+from collections import Counter
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import KeywordCount, SuspiciousContentReport
+
+MIN_TERM_LENGTH = 3
+MAX_TERM_LENGTH = 100  # KeywordCount.term max_length
+
+# Letters only (accented letters included), so "l'état" gives "état"
+_TERM_RE = re.compile(r"[^\W\d_]{%d,}" % MIN_TERM_LENGTH)
+
+STOPWORDS_EN = frozenset("""
+    about above after again against all also and any are because been before being below
+    between both but can cannot could did does doing down during each few for from further had has
+    have having her here hers herself him himself his how into its itself just let more most must
+    not now off once only other ought our ours ourselves out over own same she should some such
+    than that the their theirs them themselves then there these they this those through too under
+    until very was were what when where which while who whom why will with would you your yours
+    yourself yourselves
+""".split())
+
+STOPWORDS_FR = frozenset("""
+    alors au aucun aussi autre aux avec avoir avait bon car ce ceci cela celle celles celui ces cet
+    cette ceux chaque chez comme comment dans des donc dont du elle elles en encore est et etaient
+    etait été être eux fait faire fois font hors ici ils je juste la le les leur leurs lui mais
+    mes même moi mon ne ni nos notre nous on ont ou où par parce pas peu peut plus pour pourquoi
+    quand que quel quelle quelles quels qui sans ses seulement si sien son sont sous soyez sur ta
+    tandis tellement tels tes toi ton tous tout toute toutes très trop tu une vos votre vous vu ça
+    était étaient étions été être avons avez sera seront sont fut
+""".split())
+
+STOPWORDS = STOPWORDS_EN | STOPWORDS_FR
+
+
+def tokenize(text):
+    """Lowercased terms of ``text``, without stopwords."""
+    return [term[:MAX_TERM_LENGTH] for term in _TERM_RE.findall((text or '').casefold()) if term not in STOPWORDS]
+
+
+def report_day(date_reported):
+    """The UTC day a report is indexed under."""
+    if timezone.is_naive(date_reported):
+        date_reported = timezone.make_aware(date_reported)
+    return date_reported.astimezone(dt_timezone.utc).date()
+
+
+def report_contributions(description, date_reported, platform, content_type, urgency_level):
+    """Counter of index keys -> occurrences for one report."""
+    day = report_day(date_reported)
+    return Counter(
+        (term, day, platform, content_type, urgency_level)
+        for term in tokenize(description)
+    )
+
+
+def apply_counts(counts):
+    """
+    Add a Counter of (term, day, platform, content_type, urgency_level) -> amount
+    (amounts may be negative) to the index. Counts never go below zero: reports
+    written in bulk without indexing (see rebuild()) may hold terms the index lacks.
+    """
+    emptied = []
+    for (term, day, platform, content_type, urgency_level), amount in counts.items():
+        if not amount:
+            continue
+        key = {'term': term, 'day': day, 'platform': platform,
+               'content_type': content_type, 'urgency_level': urgency_level}
+        if amount < 0:
+            if KeywordCount.objects.filter(**key).update(count=Greatest(F('count') + amount, 0)):
+                emptied.append(key)
+            continue
+        if KeywordCount.objects.filter(**key).update(count=F('count') + amount):
+            continue
+        try:
+            with transaction.atomic():
+                KeywordCount.objects.create(count=amount, **key)
+        except IntegrityError:
+            # Created concurrently by another writer
+            KeywordCount.objects.filter(**key).update(count=F('count') + amount)
+    for key in emptied:
+        KeywordCount.objects.filter(count__lte=0, **key).delete()
+
+
+def record_reports(reports, sign=1):
+    """Add (or with sign=-1, remove) the terms of ``reports`` to the index."""
+    counts = Counter()
+    for report in reports:
+        for key, amount in report_contributions(
+            report.description, report.date_reported, report.platform,
+            report.content_type, report.urgency_level,
+        ).items():
+            counts[key] += sign * amount
+    apply_counts(counts)
+
+
+def rebuild(since=None, chunk_size=2000):
+    """
+    Recompute the index from the reports dated >= ``since`` (all reports if None).
+    Returns the number of index rows written.
+    """
+    reports = SuspiciousContentReport.objects.all()
+    stale = KeywordCount.objects.all()
+    if since:
+        # The index is per day: recount from the start of the first day
+        first_day = report_day(since)
+        reports = reports.filter(date_reported__gte=datetime.combine(first_day, time.min, tzinfo=dt_timezone.utc))
+        stale = stale.filter(day__gte=first_day)
+
+    written = 0
+    with transaction.atomic():
+        stale.delete()
+        counts = Counter()
+        current_day = None
+        rows = (
+            reports.order_by('date_reported')
+            .values_list('description', 'date_reported', 'platform', 'content_type', 'urgency_level')
+            .iterator(chunk_size=chunk_size)
+        )
+        for description, date_reported, platform, content_type, urgency_level in rows:
+            day = report_day(date_reported)
+            if day != current_day and counts:
+                # Reports are ordered by date, so the previous day is complete
+                written += _bulk_insert(counts)
+                counts = Counter()
+            current_day = day
+            counts.update(report_contributions(description, date_reported, platform, content_type, urgency_level))
+        written += _bulk_insert(counts)
+    return written
+
+
+def _bulk_insert(counts):
+    rows = [
+        KeywordCount(term=term, day=day, platform=platform, content_type=content_type,
+                     urgency_level=urgency_level, count=amount)
+        for (term, day, platform, content_type, urgency_level), amount in counts.items()
+        if amount > 0
+    ]
+    KeywordCount.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def top_keywords(start_date, end_date, platforms=None, content_types=None, urgency_levels=None, limit=10):
+    """
+    The ``limit`` most frequent terms of the reports between the UTC days of
+    ``start_date`` and ``end_date``, as (term, frequency) pairs.
+    """
+    index = KeywordCount.objects.filter(day__range=(report_day(start_date), report_day(end_date)))
+    if platforms:
+        index = index.filter(platform__in=platforms)
+    if content_types:
+        index = index.filter(content_type__in=content_types)
+    if urgency_levels:
+        index = index.filter(urgency_level__in=urgency_levels)
+    return list(
+        index.values('term')
+        .annotate(frequency=Sum('count'))
+        .order_by('-frequency', 'term')
+        .values_list('term', 'frequency')[:limit]
+    )
@@ -0,0 +1,33 @@
+# This management command recomputes the keyword index (KeywordCount) behind the top
+# keywords of the dashboard reports from the suspicious content report descriptions.
+# Use it for backfills and after bulk imports that bypass the index signals.
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from reportsuspeciouscontent.keywords import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the keyword index of suspicious content reports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days from this ISO 8601 date/time onwards (default: rebuild everything)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.fromisoformat(options['since'].replace('Z', '+00:00'))
+            except ValueError:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        self.stdout.write(f"Rebuilding keyword index{f' since {since.isoformat()}' if since else ''}...")
+        count = rebuild(since)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} keyword index rows."))
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.3 on 2026-10-17 18:49
+
+import re
+from collections import Counter
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copy of reportsuspeciouscontent.keywords as of this migration, so that
+# later changes to the tokenizer or stopwords do not change what it does
+# (`manage.py rebuild_keyword_index` reindexes with the current ones)
+MIN_TERM_LENGTH = 3
+MAX_TERM_LENGTH = 100
+
+TERM_RE = re.compile(r"[^\W\d_]{%d,}" % MIN_TERM_LENGTH)
+
+STOPWORDS_EN = frozenset("""
+    about above after again against all also and any are because been before being below
+    between both but can cannot could did does doing down during each few for from further had has
+    have having her here hers herself him himself his how into its itself just let more most must
+    not now off once only other ought our ours ourselves out over own same she should some such
+    than that the their theirs them themselves then there these they this those through too under
+    until very was were what when where which while who whom why will with would you your yours
+    yourself yourselves
+""".split())
+
+STOPWORDS_FR = frozenset("""
+    alors au aucun aussi autre aux avec avoir avait bon car ce ceci cela celle celles celui ces cet
+    cette ceux chaque chez comme comment dans des donc dont du elle elles en encore est et etaient
+    etait été être eux fait faire fois font hors ici ils je juste la le les leur leurs lui mais
+    mes même moi mon ne ni nos notre nous on ont ou où par parce pas peu peut plus pour pourquoi
+    quand que quel quelle quelles quels qui sans ses seulement si sien son sont sous soyez sur ta
+    tandis tellement tels tes toi ton tous tout toute toutes très trop tu une vos votre vous vu ça
+    était étaient étions été être avons avez sera seront sont fut
+""".split())
+
+STOPWORDS = STOPWORDS_EN | STOPWORDS_FR
+
+
+def tokenize(text):
+    return [term[:MAX_TERM_LENGTH] for term in TERM_RE.findall((text or '').casefold()) if term not in STOPWORDS]
+
+
+def report_day(date_reported):
+    if timezone.is_naive(date_reported):
+        date_reported = timezone.make_aware(date_reported)
+    return date_reported.astimezone(dt_timezone.utc).date()
+
+
+def backfill_keyword_index(apps, schema_editor):
+    """Index the existing reports (same as `manage.py rebuild_keyword_index`)."""
+    SuspiciousContentReport = apps.get_model('reportsuspeciouscontent', 'SuspiciousContentReport')
+    KeywordCount = apps.get_model('reportsuspeciouscontent', 'KeywordCount')
+    counts = Counter()
+    rows = SuspiciousContentReport.objects.values_list(
+        'description', 'date_reported', 'platform', 'content_type', 'urgency_level'
+    ).iterator(chunk_size=2000)
+    for description, date_reported, platform, content_type, urgency_level in rows:
+        day = report_day(date_reported)
+        for term in tokenize(description):
+            counts[(term, day, platform, content_type, urgency_level)] += 1
+    KeywordCount.objects.bulk_create(
+        [
+            KeywordCount(term=term, day=day, platform=platform, content_type=content_type,
+                         urgency_level=urgency_level, count=count)
+            for (term, day, platform, content_type, urgency_level), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportsuspeciouscontent', '0002_alter_suspiciouscontentreport_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('platform', models.CharField(max_length=100)),
+                ('content_type', models.CharField(max_length=20)),
+                ('urgency_level', models.CharField(max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'report_keyword_counts',
+                'indexes': [models.Index(fields=['day', 'platform', 'content_type', 'urgency_level'], name='report_keyw_day_3c0f1f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('term', 'day', 'platform', 'content_type', 'urgency_level'), name='unique_keyword_count')],
+            },
+        ),
+        migrations.RunPython(backfill_keyword_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,351 @@
+"""
+Mock SuspiciousContentReport data for development and load tests (see the loaddata command).
+
+Reports are generated column-wise in chunks: with NumPy installed each column
+of a chunk is drawn in one vectorized call (the random module is the
+fallback), and descriptions are picked from the precomputed template variants
+instead of being formatted per report. Chunks are written with bulk_create, or
+with COPY on PostgreSQL, optionally by several worker processes with a
+database connection each. A chunk only depends on the seed and its number,
+so a seeded run writes the same reports whatever the number of workers (but
+NumPy and the random module draw different values).
+
+Bulk writes bypass the report signals: generate_reports() invalidates the
+cached dashboard reports of the days written and rebuilds their keyword index.
+"""
+import csv
+import io
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from . import keywords, report_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+CONTENT_TYPES = ('hatespeech', 'misinformation', 'harassment', 'spam', 'fake')
+CONTENT_TYPE_WEIGHTS = (0.35, 0.25, 0.20, 0.15, 0.05)
+# More high/critical reports for the first SERIOUS_CONTENT_TYPES content types
+SERIOUS_CONTENT_TYPES = 2
+
+URGENCY_LEVELS = ('low', 'medium', 'high', 'critical')
+SERIOUS_URGENCY_WEIGHTS = (0.1, 0.2, 0.4, 0.3)
+URGENCY_WEIGHTS = (0.3, 0.4, 0.2, 0.1)
+# Urgency levels from this index on are high urgency
+HIGH_URGENCY = 2
+
+PLATFORMS = ('facebook', 'twitter', 'instagram', 'youtube', 'tiktok', 'whatsapp', 'other')
+PLATFORM_WEIGHTS = (0.3, 0.25, 0.2, 0.15, 0.05, 0.04, 0.01)
+
+CAMEROON_CITIES = (
+    "Douala", "Yaoundé", "Bamenda", "Bafoussam", "Garoua",
+    "Maroua", "Ngaoundéré", "Kumba", "Buea", "Limbe",
+    "Edea", "Kousséri", "Nkongsamba", "Bertoua", "Ebolowa",
+)
+LOCATION_RATE = 0.8
+
+TEMPLATES = {
+    'hatespeech': (
+        (
+            "All {topic} should leave our country immediately!",
+            "{topic} are destroying our nation with their agenda",
+            "We need to take action against these {topic} before it's too late",
+            "{topic} don't belong here and should be removed by force if necessary",
+        ),
+        ("Anglophones", "Francophones", "Bamileke", "separatists", "government", "tribal"),
+    ),
+    'misinformation': (
+        (
+            "Secret {topic} that the government doesn't want you to know",
+            "{topic} are actually designed to control our minds",
+            "The truth about {topic} that mainstream media won't tell you",
+            "{topic} are causing health problems that doctors won't admit",
+        ),
+        ("vaccines", "5G", "government conspiracy", "elections", "COVID", "cures"),
+    ),
+    'harassment': (
+        (
+            "You're worthless and should disappear",
+            "No one will miss you if you're gone",
+            "I know where you live and I'm coming for you",
+            "You should be ashamed of yourself for existing",
+        ),
+        (),
+    ),
+    'spam': (
+        (
+            "Make money fast with this one weird trick",
+            "You've won a free iPhone! Click here to claim",
+            "Lose 10kg in one week with this miracle supplement",
+            "Earn $5000 monthly working from home",
+        ),
+        (),
+    ),
+    'fake': (
+        (
+            "Celebrity dies in tragic accident",
+            "Government announces free money for everyone",
+            "Military coup happening right now",
+            "Breaking: Major disaster strikes capital city",
+        ),
+        (),
+    ),
+}
+INTENSIFIERS = ("URGENT: ", "ALERT: ", "WARNING: ", "CRITICAL: ")
+
+COLUMNS = (
+    'description', 'content_type', 'urgency_level', 'platform', 'date_reported',
+    'confidence_score', 'location', 'post_id', 'user_id',
+)
+
+
+def _description_variants(content_type, high_urgency):
+    """Every description of a content type, equally likely, as the templates would pick them."""
+    templates, topics = TEMPLATES[content_type]
+    variants = [
+        template.format(topic=topic)
+        for template in templates
+        for topic in (topics if '{topic}' in template else ('',))
+    ]
+    if high_urgency:
+        variants = [intensifier + variant for intensifier in INTENSIFIERS for variant in variants]
+    return variants
+
+
+# Variants of (content type index, high urgency) are DESCRIPTIONS[offset:offset + count]
+# with (offset, count) = DESCRIPTION_SLICES[content type index * 2 + high urgency]
+DESCRIPTIONS = []
+DESCRIPTION_SLICES = []
+for _content_type in CONTENT_TYPES:
+    for _high_urgency in (False, True):
+        _variants = _description_variants(_content_type, _high_urgency)
+        DESCRIPTION_SLICES.append((len(DESCRIPTIONS), len(_variants)))
+        DESCRIPTIONS.extend(_variants)
+
+
+def _numpy_columns(size, days, seed, number):
+    rng = np.random.default_rng([seed, number])
+    content_type = rng.choice(len(CONTENT_TYPES), size=size, p=CONTENT_TYPE_WEIGHTS)
+    serious = content_type < SERIOUS_CONTENT_TYPES
+    urgency = np.where(
+        serious,
+        rng.choice(len(URGENCY_LEVELS), size=size, p=SERIOUS_URGENCY_WEIGHTS),
+        rng.choice(len(URGENCY_LEVELS), size=size, p=URGENCY_WEIGHTS),
+    )
+    high = urgency >= HIGH_URGENCY
+    confidence = np.where(serious & high, rng.uniform(0.85, 0.99, size), rng.uniform(0.6, 0.9, size))
+    location = np.array(CAMEROON_CITIES + (None,), dtype=object)[
+        np.where(rng.random(size) < LOCATION_RATE, rng.integers(0, len(CAMEROON_CITIES), size), len(CAMEROON_CITIES))
+    ]
+    seconds_ago = (
+        rng.integers(0, days + 1, size) * 86400
+        + rng.integers(0, 24, size) * 3600
+        + rng.integers(0, 60, size) * 60
+    )
+    slices = np.array(DESCRIPTION_SLICES)[content_type * 2 + high]
+    description = np.array(DESCRIPTIONS, dtype=object)[
+        slices[:, 0] + (rng.random(size) * slices[:, 1]).astype(np.int64)
+    ]
+    return {
+        'description': description.tolist(),
+        'content_type': np.array(CONTENT_TYPES, dtype=object)[content_type].tolist(),
+        'urgency_level': np.array(URGENCY_LEVELS, dtype=object)[urgency].tolist(),
+        'platform': np.array(PLATFORMS, dtype=object)[
+            rng.choice(len(PLATFORMS), size=size, p=PLATFORM_WEIGHTS)
+        ].tolist(),
+        'seconds_ago': seconds_ago.tolist(),
+        'confidence_score': confidence.tolist(),
+        'location': location.tolist(),
+        'post_id': np.char.add('post_', rng.integers(100000, 1000000, size).astype(str)).tolist(),
+        'user_id': np.char.add('user_', rng.integers(1000, 10000, size).astype(str)).tolist(),
+    }
+
+
+def _stdlib_columns(size, days, seed, number):
+    rng = random.Random(f'{seed}-{number}')
+    content_type = rng.choices(range(len(CONTENT_TYPES)), weights=CONTENT_TYPE_WEIGHTS, k=size)
+    urgency = [
+        serious if kind < SERIOUS_CONTENT_TYPES else other
+        for kind, serious, other in zip(
+            content_type,
+            rng.choices(range(len(URGENCY_LEVELS)), weights=SERIOUS_URGENCY_WEIGHTS, k=size),
+            rng.choices(range(len(URGENCY_LEVELS)), weights=URGENCY_WEIGHTS, k=size),
+        )
+    ]
+    uniform = rng.random
+    description = []
+    confidence = []
+    for kind, level in zip(content_type, urgency):
+        high = level >= HIGH_URGENCY
+        offset, count = DESCRIPTION_SLICES[kind * 2 + high]
+        description.append(DESCRIPTIONS[offset + int(uniform() * count)])
+        if high and kind < SERIOUS_CONTENT_TYPES:
+            confidence.append(0.85 + 0.14 * uniform())
+        else:
+            confidence.append(0.6 + 0.3 * uniform())
+    return {
+        'description': description,
+        'content_type': [CONTENT_TYPES[kind] for kind in content_type],
+        'urgency_level': [URGENCY_LEVELS[level] for level in urgency],
+        'platform': rng.choices(PLATFORMS, weights=PLATFORM_WEIGHTS, k=size),
+        'seconds_ago': [
+            int(uniform() * (days + 1)) * 86400 + int(uniform() * 24) * 3600 + int(uniform() * 60) * 60
+            for _ in range(size)
+        ],
+        'confidence_score': confidence,
+        'location': [
+            CAMEROON_CITIES[int(uniform() * len(CAMEROON_CITIES))] if uniform() < LOCATION_RATE else None
+            for _ in range(size)
+        ],
+        'post_id': [f"post_{100000 + int(uniform() * 900000)}" for _ in range(size)],
+        'user_id': [f"user_{1000 + int(uniform() * 9000)}" for _ in range(size)],
+    }
+
+
+def report_rows(size, days, seed, number, now):
+    """
+    Rows (tuples of COLUMNS values) of chunk ``number``, dated up to ``days`` days before ``now``.
+    """
+    columns = (_numpy_columns if np is not None else _stdlib_columns)(size, days, seed, number)
+    columns['date_reported'] = [now - timedelta(seconds=seconds) for seconds in columns['seconds_ago']]
+    return list(zip(*(columns[name] for name in COLUMNS)))
+
+
+def _report_model():
+    return apps.get_model('reportsuspeciouscontent', 'SuspiciousContentReport')
+
+
+def _bulk_create(rows):
+    Report = _report_model()
+    Report.objects.bulk_create(
+        [Report(**dict(zip(COLUMNS, row))) for row in rows],
+        batch_size=2000,
+    )
+
+
+def _copy(rows, now):
+    """COPY ``rows`` into the report table (PostgreSQL, psycopg2 or psycopg 3)."""
+    Report = _report_model()
+    meta = Report._meta
+    fields = COLUMNS + ('url', 'created_at', 'updated_at')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row + ('', now, now))
+    quote = connection.ops.quote_name
+    url_column = quote(meta.get_field('url').column)
+    sql = (
+        f"COPY {quote(meta.db_table)} ({', '.join(quote(meta.get_field(name).column) for name in fields)}) "
+        f"FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({url_column}))"
+    )
+    with connection.cursor() as cursor:
+        if hasattr(cursor, 'copy_expert'):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def write_chunk(number, size, days, seed, now, method):
+    """Generate and write chunk ``number``; returns the number of reports written."""
+    rows = report_rows(size, days, seed, number, now)
+    with transaction.atomic():
+        if method == 'copy':
+            _copy(rows, now)
+        else:
+            _bulk_create(rows)
+    return size
+
+
+def _write_chunk_task(task):
+    return write_chunk(*task)
+
+
+def _init_worker():
+    # Spawned workers (macOS, Windows) start without configured apps
+    if not apps.ready:
+        django.setup()
+
+
+def resolve_method(method='auto'):
+    """'copy' on PostgreSQL and 'bulk' elsewhere for 'auto'."""
+    if method == 'auto':
+        return 'copy' if connection.vendor == 'postgresql' else 'bulk'
+    if method == 'copy' and connection.vendor != 'postgresql':
+        raise ValueError("COPY is only supported on PostgreSQL")
+    return method
+
+
+def generate_reports(count, days=90, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+                     method='auto', update_indexes=True, progress=None):
+    """
+    Write ``count`` mock reports dated over the last ``days`` days.
+    Args:
+        count (int): Number of reports.
+        days (int, optional): Reports are dated up to this many days ago.
+        seed (int, optional): Random seed (default: a random one).
+        chunk_size (int, optional): Reports generated and written per transaction.
+        workers (int, optional): Worker processes generating and writing chunks.
+            SQLite only has one writer, so it always uses one.
+        method (str, optional): 'copy' (PostgreSQL only), 'bulk' (bulk_create) or 'auto'.
+        update_indexes (bool, optional): Rebuild the keyword index of the days written.
+        progress (callable, optional): Called as progress(written, count, elapsed_seconds) after each chunk.
+    Returns:
+        int: Number of reports written.
+    Raises:
+        ValueError: COPY was requested on another database than PostgreSQL.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    method = resolve_method(method)
+    if workers > 1 and connection.vendor == 'sqlite':
+        logger.warning("SQLite has a single writer, generating with one worker")
+        workers = 1
+
+    now = timezone.now()
+    tasks = [
+        (number, min(chunk_size, count - start), days, seed, now, method)
+        for number, start in enumerate(range(0, count, chunk_size))
+    ]
+    started = time.monotonic()
+    written = 0
+    if workers > 1:
+        # Workers open their own connections; never share the parent's
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for size in pool.map(_write_chunk_task, tasks):
+                written += size
+                if progress:
+                    progress(written, count, time.monotonic() - started)
+    else:
+        for task in tasks:
+            written += write_chunk(*task)
+            if progress:
+                progress(written, count, time.monotonic() - started)
+
+    if written:
+        # Reports are dated within [now - days - 1 day, now]
+        first = now - timedelta(days=days + 1)
+        day = first
+        while day <= now:
+            report_cache.invalidate_day(day)
+            day += timedelta(days=1)
+        report_cache.invalidate_day(now)
+        if update_indexes:
+            keywords.rebuild(since=first)
+    return written
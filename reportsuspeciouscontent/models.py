@@ -82,3 +82,31 @@ class SuspiciousContentReport(models.Model):
     def __str__(self):
         return f"{self.content_type} - {self.urgency_level} - {self.platform}"
 
+
+
+class KeywordCount(models.Model):
+    """
+    Term frequencies of report descriptions per day and report dimensions,
+    maintained by reportsuspeciouscontent.keywords.
+    """
+    term = models.CharField(max_length=100)
+    day = models.DateField()
+    platform = models.CharField(max_length=100)
+    content_type = models.CharField(max_length=20)
+    urgency_level = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'report_keyword_counts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'day', 'platform', 'content_type', 'urgency_level'],
+                name='unique_keyword_count',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'platform', 'content_type', 'urgency_level']),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.day}): {self.count}"
@@ -0,0 +1,99 @@
+"""
+Cache of generated dashboard reports.
+
+Reports are keyed by the normalized request (report type, date range rounded to
+the minute, sorted filters) plus a version counter for every UTC day the range
+covers. Saving or deleting a SuspiciousContentReport bumps the version of its
+day, so any cached report whose range includes that day is no longer found.
+A cached report may have been generated for another range rounding to the
+same minutes: the view gives it this request's header (see with_header()).
+
+The versions must be seen by every worker process, so reports are only cached
+in a shared cache backend (e.g. Redis or Memcached, see CACHE_BACKEND); with a
+per-process LocMemCache caching is off.
+"""
+import hashlib
+import json
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DAY_VERSION_PREFIX = 'report-day-version'
+
+
+def _cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def enabled():
+    return getattr(settings, 'REPORT_CACHE_ENABLED', True) and not isinstance(_cache(), LocMemCache)
+
+
+def _utc_day(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value.astimezone(dt_timezone.utc).date()
+
+
+def _day_keys(start_date, end_date):
+    day, last = _utc_day(start_date), _utc_day(end_date)
+    keys = []
+    while day <= last:
+        keys.append(f'{DAY_VERSION_PREFIX}:{day.isoformat()}')
+        day += timedelta(days=1)
+    return keys
+
+
+def _normalize_filters(filters):
+    return {
+        name: sorted(str(value) for value in values)
+        for name, values in sorted((filters or {}).items())
+        if isinstance(values, (list, tuple)) and values
+    }
+
+
+def make_key(report_type, start_date, end_date, filters):
+    """
+    Cache key of a report request; changes whenever a report in the range is written.
+    """
+    day_keys = _day_keys(start_date, end_date)
+    versions = _cache().get_many(day_keys)
+    request_key = json.dumps({
+        'report_type': report_type,
+        'start': start_date.replace(second=0, microsecond=0).isoformat(),
+        'end': end_date.replace(second=0, microsecond=0).isoformat(),
+        'filters': _normalize_filters(filters),
+        'versions': [versions.get(key, 0) for key in day_keys],
+    }, sort_keys=True)
+    return 'dashboard-report:' + hashlib.sha256(request_key.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    return _cache().get(key)
+
+
+def with_header(report, header):
+    """``report`` with the request-specific fields of ``header`` (report_id, generated_at, date_range)."""
+    return {**report, **header}
+
+
+def store(key, report):
+    _cache().set(key, report, timeout=getattr(settings, 'REPORT_CACHE_TTL', 300))
+
+
+def invalidate_day(when):
+    """Invalidate every cached report whose date range includes the day of ``when``."""
+    key = f'{DAY_VERSION_PREFIX}:{_utc_day(when).isoformat()}'
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
@@ -18,6 +18,7 @@ class AnalysisSerializer(serializers.Serializer):
     ANALYSIS_CHOICES = [
         ('hate_speech', 'Hate Speech Only'),
         ('misinformation', 'Misinformation Only'),
+        ('both', 'Hate Speech and Misinformation'),
     ]
 
     text = serializers.CharField(required=True, allow_blank=False)
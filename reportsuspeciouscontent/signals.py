@@ -0,0 +1,71 @@
+"""
+Signal handlers invalidating cached dashboard reports and maintaining the
+keyword index when reports are written.
+"""
+import logging
+from collections import Counter
+
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import keywords, report_cache
+from .models import SuspiciousContentReport
+
+logger = logging.getLogger(__name__)
+
+
+def _update_keyword_index(update, *args):
+    """
+    Run ``update(*args)`` on the keyword index in a savepoint: a failure is logged
+    and leaves the index stale (keywords.rebuild() recounts it) instead of failing
+    the report write.
+    """
+    try:
+        with transaction.atomic():
+            update(*args)
+    except DatabaseError:
+        logger.exception("Could not update the keyword index")
+
+
+@receiver(pre_save, sender=SuspiciousContentReport)
+def remember_previous_report(sender, instance, raw=False, **kwargs):
+    """
+    An update can move a report to another day or change its indexed terms;
+    keep the stored values to invalidate both days and move its keyword counts.
+    """
+    instance._previous_report = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_report = SuspiciousContentReport.objects.filter(pk=instance.pk).only(
+        'description', 'date_reported', 'platform', 'content_type', 'urgency_level'
+    ).first()
+
+
+@receiver(post_save, sender=SuspiciousContentReport)
+def update_report_indexes_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    report_cache.invalidate_day(instance.date_reported)
+    if isinstance(instance.date_reported, str):
+        # Assigned as a string; reload the parsed value to index it
+        instance.refresh_from_db(fields=['date_reported'])
+    counts = Counter()
+    previous = getattr(instance, '_previous_report', None)
+    if previous:
+        report_cache.invalidate_day(previous.date_reported)
+        counts.subtract(keywords.report_contributions(
+            previous.description, previous.date_reported, previous.platform,
+            previous.content_type, previous.urgency_level,
+        ))
+    counts.update(keywords.report_contributions(
+        instance.description, instance.date_reported, instance.platform,
+        instance.content_type, instance.urgency_level,
+    ))
+    _update_keyword_index(keywords.apply_counts, counts)
+
+
+@receiver(post_delete, sender=SuspiciousContentReport)
+def update_report_indexes_on_delete(sender, instance, **kwargs):
+    report_cache.invalidate_day(instance.date_reported)
+    _update_keyword_index(keywords.record_reports, [instance], -1)
@@ -1,3 +1,88 @@
-from django.test import TestCase
+import json
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import report_cache
+from .models import SuspiciousContentReport
+
+
+def create_reports(count):
+    return [
+        SuspiciousContentReport.objects.create(
+            content_type='misinformation', platform='facebook', url='https://facebook.com/posts/1',
+            urgency_level='high', description=f"Report {i}",
+        )
+        for i in range(count)
+    ]
+
+
+class ReportExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.url = reverse('suspicious_content_report_list')
+        create_reports(5)
+
+    def test_wsgi_export_streams_every_report(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['description'] for row in rows], [f"Report {i}" for i in range(4, -1, -1)])
+
+    async def test_asgi_export_streams_an_async_iterator(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response]).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith('reporter_name,'))
+
+
+class DashboardReportCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('analyst', password='secret')
+        self.client.force_login(self.user)
+        create_reports(3)
+        self.end = timezone.now().replace(second=30)
+
+    def request_report(self, end):
+        return self.client.post(reverse('dashboard-reports'), {
+            'report_type': 'custom',
+            'date_range': {'start_date': (end - timezone.timedelta(days=1)).isoformat(), 'end_date': end.isoformat()},
+        }, content_type='application/json').json()['data']
+
+    def test_not_cached_in_a_per_process_cache(self):
+        self.assertFalse(report_cache.enabled())
+
+    def test_cached_report_gets_the_header_of_the_request(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertTrue(report_cache.enabled())
+            start = self.end - timezone.timedelta(days=1)
+            self.assertEqual(
+                report_cache.make_key('custom', start, self.end, {}),
+                report_cache.make_key('custom', start, self.end + timezone.timedelta(seconds=10), {}),
+            )
+            first = self.request_report(self.end)
+            second = self.request_report(self.end + timezone.timedelta(seconds=10))
+
+        self.assertEqual(second['summary'], first['summary'])
+        self.assertEqual(second['date_range']['end_date'], (self.end + timezone.timedelta(seconds=10)).isoformat())
+        self.assertNotEqual(second['report_id'], first['report_id'])
+
+
+class AsyncViewSchemaTests(TestCase):
+    def test_async_views_stay_in_the_swagger_schema(self):
+        paths = self.client.get(reverse('schema-json', kwargs={'format': '.json'})).json()['paths']
+        operation = paths['/report/unified-analyze/']['post']
+        self.assertEqual(operation['summary'], "Analyze text for hate speech and/or misinformation")
+        self.assertEqual(operation['parameters'][0]['schema'], {'$ref': '#/definitions/Analysis'})
+        for path in ('/hate-speech/analyze/', '/misinformation/analyze/', '/openai/ask/'):
+            self.assertIn('post', paths[path])
@@ -1,24 +1,30 @@
 import logging
 import random
 import uuid
-from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+import httpx
 import requests
+from django.conf import settings
 from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import status, views, permissions
+from rest_framework import status, permissions
 # Create your views here.
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, renderer_classes
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from django.db.models import Count, Avg, Q, F, When, Case, FloatField
 from django.db.models.functions import TruncDate
-from collections import Counter
-import re
+from monitoring.async_views import AsyncAPIView, gather_with_timeout
+from monitoring.pagination import ReportPagination
+from monitoring.model_client import (
+    async_analyze_text, model_url, HATE_ANALYZE_ENDPOINT, MISINFORMATION_ANALYZE_ENDPOINT
+)
+from . import export, keywords, report_cache
 from .models import SuspiciousContentReport
 from .serializers import SuspiciousContentReportSerializer, AnalysisSerializer
 
@@ -51,13 +57,47 @@ def suspicious_content_report(request):
                     status=status.HTTP_400_BAD_REQUEST)
 
 
-@swagger_auto_schema(method='get', responses={200: SuspiciousContentReportSerializer(many=True)})
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description=f"Reports per page (default {ReportPagination.page_size}, max {ReportPagination.max_page_size})"),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="next_cursor of the previous page"),
+        openapi.Parameter('count', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['exact', 'estimated'],
+                          description="Include the total number of reports"),
+        openapi.Parameter('format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(export.EXPORT_FORMATS),
+                          description="Stream every report as an NDJSON or CSV download instead"),
+    ],
+    responses={200: SuspiciousContentReportSerializer(many=True)},
+)
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, *export.EXPORT_RENDERERS])
 def suspicious_content_report_list(request):
-    reports = SuspiciousContentReport.objects.all().order_by('-date_reported')
-    serializer = SuspiciousContentReportSerializer(reports, many=True)
-    return Response(serializer.data)
+    """
+    Suspicious content reports, newest first, in keyset-paginated pages
+    ({"next", "next_cursor", "results"}). With ?format=ndjson or ?format=csv,
+    every report is streamed as a download instead.
+    """
+    reports = SuspiciousContentReport.objects.only(
+        'id', *(name for name in SuspiciousContentReportSerializer().fields if name != 'id')
+    )
+    serializer_context = {'request': request}
+    export_format = request.query_params.get(api_settings.URL_FORMAT_OVERRIDE)
+    if export_format in export.EXPORT_FORMATS:
+        return export.stream_queryset(
+            reports.order_by(*ReportPagination.ordering),
+            SuspiciousContentReportSerializer(context=serializer_context),
+            export_format,
+            'suspicious-content-reports',
+            asynchronous=export.is_asgi_request(request),
+        )
+
+    paginator = ReportPagination()
+    page = paginator.paginate_queryset(reports, request)
+    serializer = SuspiciousContentReportSerializer(page, many=True, context=serializer_context)
+    return paginator.get_paginated_response(serializer.data)
 
 
 class DashboardReportsView(APIView):
@@ -66,6 +106,15 @@ class DashboardReportsView(APIView):
     POST /api/dashboard/reports
     """
 
+    # API content type -> SuspiciousContentReport.content_type
+    CONTENT_TYPES = {
+        'hate_speech': 'hatespeech',
+        'misinformation': 'misinformation',
+        'harassment': 'harassment',
+        'spam': 'spam',
+        'fake': 'fake'
+    }
+
     @swagger_auto_schema(
         operation_summary="Generate dashboard reports",
         operation_description="Generate dashboard reports for suspicious content within a given date range and filters.",
@@ -151,8 +200,18 @@ class DashboardReportsView(APIView):
             # Apply filters
             queryset = self._apply_filters(queryset, filters)
 
-            # Generate report data
-            report_data = self._generate_report_data(queryset, start_date, end_date)
+            # Generate report data, reusing a cached report until a report in the range changes
+            cache_key = None
+            report_data = None
+            if report_cache.enabled():
+                cache_key = report_cache.make_key(report_type, start_date, end_date, filters)
+                report_data = report_cache.get(cache_key)
+            if report_data is None:
+                report_data = self._generate_report_data(queryset, start_date, end_date, filters)
+                if cache_key:
+                    report_cache.store(cache_key, report_data)
+            else:
+                report_data = report_cache.with_header(report_data, self._report_header(start_date, end_date))
 
             return Response({
                 "success": True,
@@ -199,48 +258,47 @@ class DashboardReportsView(APIView):
 
         if filters.get('content_types'):
             # Map API content types to model content types
-            content_type_mapping = {
-                'hate_speech': 'hatespeech',
-                'misinformation': 'misinformation',
-                'harassment': 'harassment',
-                'spam': 'spam',
-                'fake': 'fake'
-            }
-
             model_content_types = []
             for ct in filters['content_types']:
-                if ct in content_type_mapping:
-                    model_content_types.append(content_type_mapping[ct])
+                if ct in self.CONTENT_TYPES:
+                    model_content_types.append(self.CONTENT_TYPES[ct])
 
             if model_content_types:
                 queryset = queryset.filter(content_type__in=model_content_types)
 
         return queryset
 
-    def _generate_report_data(self, queryset, start_date, end_date):
+    def _report_header(self, start_date, end_date):
+        """Fields identifying one report request"""
+        return {
+            "report_id": f"report_{datetime.now().strftime('%Y_%m_%d')}_{str(uuid.uuid4())[:8]}",
+            "generated_at": timezone.now().isoformat(),
+            "date_range": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat()
+            },
+        }
+
+    def _generate_report_data(self, queryset, start_date, end_date, filters):
         """Generate comprehensive report data from actual database content"""
 
-        # Basic counts
-        total_posts = queryset.count()
-        hate_speech_count = queryset.filter(content_type='hatespeech').count()
-        misinformation_count = queryset.filter(content_type='misinformation').count()
-        harassment_count = queryset.filter(content_type='harassment').count()
-        spam_count = queryset.filter(content_type='spam').count()
-        fake_count = queryset.filter(content_type='fake').count()
+        type_counts = {
+            name: Count('id', filter=Q(content_type=content_type))
+            for name, content_type in self.CONTENT_TYPES.items()
+        }
 
-        # Average confidence score
-        avg_confidence = queryset.aggregate(avg_confidence=Avg('confidence_score'))['avg_confidence'] or 0
+        # Counts per content type and average confidence in one pass
+        summary = queryset.aggregate(
+            total=Count('id'),
+            avg_confidence=Avg('confidence_score'),
+            **type_counts
+        )
+        total_posts = summary['total']
+        avg_confidence = summary['avg_confidence'] or 0
 
         # Platform breakdown - using actual data
         platform_data = []
-        platform_stats = queryset.values('platform').annotate(
-            total=Count('id'),
-            hate_speech=Count('id', filter=Q(content_type='hatespeech')),
-            misinformation=Count('id', filter=Q(content_type='misinformation')),
-            harassment=Count('id', filter=Q(content_type='harassment')),
-            spam=Count('id', filter=Q(content_type='spam')),
-            fake=Count('id', filter=Q(content_type='fake'))
-        )
+        platform_stats = queryset.values('platform').annotate(total=Count('id'), **type_counts).order_by()
 
         for platform in platform_stats:
             platform_data.append({
@@ -255,9 +313,7 @@ class DashboardReportsView(APIView):
 
         # Severity distribution
         severity_data = []
-        severity_stats = queryset.values('urgency_level').annotate(
-            count=Count('id')
-        )
+        severity_stats = queryset.values('urgency_level').annotate(count=Count('id')).order_by()
 
         for severity in severity_stats:
             percentage = (severity['count'] / total_posts * 100) if total_posts > 0 else 0
@@ -268,7 +324,7 @@ class DashboardReportsView(APIView):
             })
 
 
-        top_keywords = self._generate_top_keywords(queryset)
+        top_keywords = self._generate_top_keywords(start_date, end_date, filters)
 
 
         location_insights = self._generate_location_insights(queryset)
@@ -277,19 +333,14 @@ class DashboardReportsView(APIView):
         trends = self._generate_trends_data(queryset, start_date, end_date)
 
         return {
-            "report_id": f"report_{datetime.now().strftime('%Y_%m_%d')}_{str(uuid.uuid4())[:8]}",
-            "generated_at": timezone.now().isoformat(),
-            "date_range": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
-            },
+            **self._report_header(start_date, end_date),
             "summary": {
                 "total_posts_analyzed": total_posts,
-                "hate_speech_count": hate_speech_count,
-                "misinformation_count": misinformation_count,
-                "harassment_count": harassment_count,
-                "spam_count": spam_count,
-                "fake_count": fake_count,
+                "hate_speech_count": summary['hate_speech'],
+                "misinformation_count": summary['misinformation'],
+                "harassment_count": summary['harassment'],
+                "spam_count": summary['spam'],
+                "fake_count": summary['fake'],
                 "average_confidence": round(avg_confidence, 2),
                 "average_processing_time_ms": 1200  # Fixed value since we don't have this data
             },
@@ -300,25 +351,19 @@ class DashboardReportsView(APIView):
             "trends": trends
         }
 
-    def _generate_top_keywords(self, queryset):
-        """Generate top keywords by analyzing actual content"""
-        # Common words to exclude
-        stop_words = {'the', 'and', 'is', 'in', 'to', 'of', 'a', 'an', 'on', 'for', 'by', 'with', 'at', 'from'}
-
-        # Extract content from queryset
-        contents = queryset.values_list('description', flat=True)
-
-        # Count words across all content
-        word_counter = Counter()
-        for content in contents:
-            if content:
-                # Simple word extraction (improve with better NLP if needed)
-                words = re.findall(r'\b[a-zA-Z]{3,}\b', content.lower())
-                filtered_words = [word for word in words if word not in stop_words]
-                word_counter.update(filtered_words)
+    def _generate_top_keywords(self, start_date, end_date, filters):
+        """Top keywords from the incremental keyword index (see reportsuspeciouscontent.keywords)"""
+        content_types = [self.CONTENT_TYPES[ct] for ct in filters.get('content_types') or [] if ct in self.CONTENT_TYPES]
 
         # Get top 10 words
-        top_words = word_counter.most_common(10)
+        top_words = keywords.top_keywords(
+            start_date,
+            end_date,
+            platforms=filters.get('platforms'),
+            content_types=content_types,
+            urgency_levels=filters.get('severity_levels'),
+            limit=10,
+        )
 
         # Convert to the required format
         keywords_data = []
@@ -349,7 +394,7 @@ class DashboardReportsView(APIView):
             hate_speech=Count('id', filter=Q(content_type='hatespeech')),
             misinformation=Count('id', filter=Q(content_type='misinformation')),
             high_severity=Count('id', filter=Q(urgency_level__in=['high', 'critical']))
-        )
+        ).order_by()
 
         # Cameroon locations with risk assessment templates
         cameroon_risk_assessment = {
@@ -431,26 +476,19 @@ class DashboardReportsView(APIView):
 
         return trends
 
-class UnifiedAnalysisAPIView(views.APIView):
-    """Analyze text for hate speech and/or misinformation detection"""
+class UnifiedAnalysisAPIView(AsyncAPIView):
+    """Analyze text for hate speech and/or misinformation detection (async: see monitoring.async_views)"""
     permission_classes = [permissions.AllowAny]
 
-    HATE_SPEECH_URL = "http://84.247.168.4:8001/hate/analyze"
-    MISINFORMATION_URL = "http://84.247.168.4:8001/misinformation/analyze"
+    HATE_SPEECH_URL = model_url(HATE_ANALYZE_ENDPOINT, settings.UNIFIED_MODEL_API_BASE_URL)
+    MISINFORMATION_URL = model_url(MISINFORMATION_ANALYZE_ENDPOINT, settings.UNIFIED_MODEL_API_BASE_URL)
     TIMEOUT = 30
     serializer_class = AnalysisSerializer
 
-    def call_api(self, url, payload):
+    async def call_api(self, url, payload):
         """Helper method to call external APIs"""
         try:
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=self.TIMEOUT,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            return {"success": True, "data": response.json()}
+            return {"success": True, "data": await async_analyze_text(url, payload, timeout=self.TIMEOUT)}
         except Exception as e:
             logger.error(f"Error calling {url}: {e}")
             return {"success": False, "error": str(e)}
@@ -490,7 +528,7 @@ class UnifiedAnalysisAPIView(views.APIView):
             503: "Service unavailable"
         }
     )
-    def post(self, request):
+    async def post(self, request):
         """Analyze text for hate speech and/or misinformation"""
         try:
             serializer = self.serializer_class(data=request.data)
@@ -502,32 +540,29 @@ class UnifiedAnalysisAPIView(views.APIView):
 
             calls_to_make = []
 
-            if analysis_type in ['hate_speech']:
+            if analysis_type in ['hate_speech', 'both']:
                 calls_to_make.append(('hate_speech', self.HATE_SPEECH_URL))
 
-            if analysis_type in ['misinformation']:
+            if analysis_type in ['misinformation', 'both']:
                 calls_to_make.append(('misinformation', self.MISINFORMATION_URL))
 
             results = {}
             errors = {}
 
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                future_to_type = {
-                    executor.submit(self.call_api, url, payload): analysis_name
-                    for analysis_name, url in calls_to_make
-                }
+            # Both calls are in flight at the same time
+            outcomes = await gather_with_timeout(
+                {analysis_name: self.call_api(url, payload) for analysis_name, url in calls_to_make},
+                self.TIMEOUT,
+            )
 
-                for future in future_to_type:
-                    analysis_name = future_to_type[future]
-                    try:
-                        result = future.result(timeout=self.TIMEOUT)
-                        if result["success"]:
-                            results[f"{analysis_name}_analysis"] = result["data"]
-                        else:
-                            errors[f"{analysis_name}_error"] = result["error"]
-                    except Exception as e:
-                        logger.error(f"Error in {analysis_name} analysis: {e}")
-                        errors[f"{analysis_name}_error"] = str(e)
+            for analysis_name, result in outcomes.items():
+                if isinstance(result, Exception):
+                    logger.error(f"Error in {analysis_name} analysis: {result!r}")
+                    errors[f"{analysis_name}_error"] = str(result) or type(result).__name__
+                elif result["success"]:
+                    results[f"{analysis_name}_analysis"] = result["data"]
+                else:
+                    errors[f"{analysis_name}_error"] = result["error"]
 
             response_data = {"text": text}
 
@@ -572,7 +607,7 @@ class UnifiedAnalysisAPIView(views.APIView):
                     status=status.HTTP_502_BAD_GATEWAY
                 )
 
-        except requests.exceptions.Timeout:
+        except (requests.exceptions.Timeout, httpx.TimeoutException):
             logger.error("Timeout error when calling analysis models")
             return Response(
                 {"error": "Analysis services are taking too long to respond. Please try again."},
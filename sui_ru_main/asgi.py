@@ -3,6 +3,12 @@ ASGI config for sui_ru_main project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The model-proxy and LLM endpoints are async views (monitoring.async_views), so
+serve the project through ASGI to keep many upstream calls in flight per worker:
+
+    gunicorn sui_ru_main.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+    uvicorn sui_ru_main.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +19,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sui_ru_main.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from monitoring.model_client import mark_long_lived_loop  # noqa: E402 (needs the app registry)
+
+
+async def application(scope, receive, send):
+    # The server's event loop outlives the request: keep pooled async clients on it
+    mark_long_lived_loop()
+    await django_application(scope, receive, send)
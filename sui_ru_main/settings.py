@@ -68,6 +68,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "sui_ru_main.wsgi.application"
+ASGI_APPLICATION = "sui_ru_main.asgi.application"
 
 
 # Database
@@ -292,3 +293,54 @@ AZURE_OPENAI_API_KEY = config('AZURE_OPENAI_API_KEY', default=None)
 AZURE_OPENAI_ENDPOINT = config('AZURE_OPENAI_ENDPOINT', default=None)
 AZURE_OPENAI_DEPLOYMENT = config('AZURE_OPENAI_DEPLOYMENT', default=None)
 AZURE_OPENAI_API_VERSION = config('AZURE_OPENAI_API_VERSION', default='2024-02-15-preview')
+
+# LLM providers (gemini_ask / openai_ask / azure_openai_ask)
+LLM_API_TIMEOUT = config('LLM_API_TIMEOUT', default=30, cast=float)
+LLM_RESPONSE_CACHE_ENABLED = config('LLM_RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+LLM_RESPONSE_CACHE_SIZE = config('LLM_RESPONSE_CACHE_SIZE', default=1000, cast=int)  # answers kept per process
+LLM_RESPONSE_CACHE_TTL = config('LLM_RESPONSE_CACHE_TTL', default=3600, cast=int)
+
+# Circuit breakers around the model API and LLM providers (monitoring.circuit_breaker)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = config('CIRCUIT_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = config('CIRCUIT_BREAKER_RECOVERY_TIMEOUT', default=30, cast=float)
+CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS = config('CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS', default=1, cast=int)
+
+# Model analysis queue (drained by `python manage.py run_analysis_workers`)
+ANALYSIS_QUEUE_MAX_ATTEMPTS = config('ANALYSIS_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+ANALYSIS_QUEUE_RETRY_DELAY_SECONDS = config('ANALYSIS_QUEUE_RETRY_DELAY_SECONDS', default=30, cast=int)
+ANALYSIS_QUEUE_LEASE_SECONDS = config('ANALYSIS_QUEUE_LEASE_SECONDS', default=300, cast=int)
+
+# Model API client (shared keep-alive session in monitoring.model_client)
+MODEL_API_BASE_URL = config('MODEL_API_BASE_URL', default='https://model.sui-ru.com')
+UNIFIED_MODEL_API_BASE_URL = config('UNIFIED_MODEL_API_BASE_URL', default='http://84.247.168.4:8001')
+MODEL_API_CONNECT_TIMEOUT = config('MODEL_API_CONNECT_TIMEOUT', default=3.05, cast=float)
+MODEL_API_READ_TIMEOUT = config('MODEL_API_READ_TIMEOUT', default=10, cast=float)
+MODEL_API_POOL_SIZE = config('MODEL_API_POOL_SIZE', default=20, cast=int)
+MODEL_API_MAX_RETRIES = config('MODEL_API_MAX_RETRIES', default=3, cast=int)
+MODEL_API_BACKOFF_FACTOR = config('MODEL_API_BACKOFF_FACTOR', default=0.5, cast=float)
+MODEL_API_BATCH_SIZE = config('MODEL_API_BATCH_SIZE', default=32, cast=int)
+MODEL_API_BATCH_CONCURRENCY = config('MODEL_API_BATCH_CONCURRENCY', default=8, cast=int)
+MODEL_API_MAX_CONCURRENCY = config('MODEL_API_MAX_CONCURRENCY', default=16, cast=int)  # shared executor threads
+MODEL_API_ENDPOINT_CONCURRENCY = config('MODEL_API_ENDPOINT_CONCURRENCY', default=8, cast=int)  # calls in flight per endpoint
+MODEL_API_ASYNC_MAX_CONNECTIONS = config('MODEL_API_ASYNC_MAX_CONNECTIONS', default=200, cast=int)  # per ASGI worker
+
+# Cache (the shared tier of the model result cache lives here)
+CACHES = {
+    "default": {
+        "BACKEND": config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": config('CACHE_LOCATION', default='sui-ru-default'),
+    }
+}
+
+# Model analysis result cache (monitoring.analysis_cache)
+MODEL_RESULT_CACHE_ENABLED = config('MODEL_RESULT_CACHE_ENABLED', default=True, cast=bool)
+MODEL_RESULT_CACHE_ALIAS = config('MODEL_RESULT_CACHE_ALIAS', default='default')
+MODEL_RESULT_CACHE_LRU_SIZE = config('MODEL_RESULT_CACHE_LRU_SIZE', default=10000, cast=int)
+MODEL_RESULT_CACHE_TTL = config('MODEL_RESULT_CACHE_TTL', default=86400, cast=int)
+MODEL_VERSION = config('MODEL_VERSION', default='v1')
+
+# Dashboard report cache (reportsuspeciouscontent.report_cache); needs a cache
+# backend shared by the worker processes, it is off with LocMemCache
+REPORT_CACHE_ENABLED = config('REPORT_CACHE_ENABLED', default=True, cast=bool)
+REPORT_CACHE_ALIAS = config('REPORT_CACHE_ALIAS', default='default')
+REPORT_CACHE_TTL = config('REPORT_CACHE_TTL', default=300, cast=int)